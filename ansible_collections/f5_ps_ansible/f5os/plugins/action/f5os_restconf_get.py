@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.modules import f5os_restconf_get
+from ansible_collections.f5_ps_ansible.f5os.plugins.plugin_utils.action import (
+    InProcessActionBase,
+)
+
+
+class ActionModule(InProcessActionBase):
+    """Runs f5os_restconf_get in the controller worker process."""
+
+    module = f5os_restconf_get
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+name: f5os_timings
+type: aggregate
+short_description: Report the F5OS API performance of a playbook run.
+description:
+  - Aggregates the 'timings' returned by the modules of this collection (see the timings option of f5os_restconf_config) and displays a report at the end of the playbook run.
+  - The report contains the API requests, bytes, time, retries and throttling waits (see rate_limit and retries of f5os_restconf_config) per host, latency percentiles per endpoint, the slowest endpoints and the redundant GET requests (the same URI fetched from the API repeatedly for the same host).
+  - Enable the timings option of all tasks with module_defaults for the action group 'group/f5_ps_ansible.f5os.timings'.
+author:
+  - Simon Kowallik (@simonkowallik)
+version_added: "1.4.0"
+requirements:
+  - enable in configuration, e.g. 'callbacks_enabled = f5_ps_ansible.f5os.f5os_timings' in the defaults section of ansible.cfg
+options:
+  output_path:
+    description: Write the report as JSON to this file, e.g. to compare runs across collection versions.
+    type: path
+    env:
+      - name: F5OS_TIMINGS_OUTPUT_PATH
+    ini:
+      - section: callback_f5os_timings
+        key: output_path
+  top:
+    description: The number of slowest endpoints and redundant GET requests to display.
+    type: int
+    default: 10
+    env:
+      - name: F5OS_TIMINGS_TOP
+    ini:
+      - section: callback_f5os_timings
+        key: top
+"""
+
+import json
+import math
+
+from ansible.plugins.callback import CallbackBase
+
+
+def percentile(values: list, pct: float) -> float:
+    """Returns the `pct` percentile of `values` (nearest-rank method), 0 for no values."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class TimingsReport:
+    """Aggregates the timings of module results per host and endpoint."""
+
+    def __init__(self):
+        """Initialize an empty report."""
+        self.calls = []
+        self.throttling = {}
+
+    def add(self, host: str, result: dict) -> None:
+        """Add the timings of the module `result` of `host`, including the results of loop items."""
+        if not isinstance(result, dict):
+            return
+        timings = result.get("timings")
+        if isinstance(timings, dict):
+            for call in timings.get("api_calls") or []:
+                self.calls.append(dict(call, host=host))
+            throttling = self.throttling.setdefault(host, {})
+            for name, value in (timings.get("throttling") or {}).items():
+                throttling[name] = throttling.get(name, 0) + value
+        for item_result in result.get("results") or []:
+            self.add(host, item_result)
+
+    def report(self) -> dict:
+        """Returns the aggregated report."""
+        hosts = {}
+        endpoints = {}
+        gets = {}
+        for call in self.calls:
+            host = hosts.setdefault(
+                call["host"],
+                {"requests": 0, "local": 0, "bytes": 0, "ms": 0.0, "redundant_gets": 0},
+            )
+            if call.get("source", "api") != "api":
+                host["local"] += 1
+                continue
+            host["requests"] += 1
+            host["bytes"] += call.get("bytes", 0)
+            host["ms"] += call.get("ms", 0)
+
+            key = (call["method"], call["uri"].split("?", 1)[0])
+            endpoint = endpoints.setdefault(key, {"latencies": [], "bytes": 0})
+            endpoint["latencies"].append(call.get("ms", 0))
+            endpoint["bytes"] += call.get("bytes", 0)
+
+            if call["method"] == "GET" and call.get("status") == 200:
+                uri_key = (call["host"], call["uri"])
+                gets[uri_key] = gets.get(uri_key, 0) + 1
+
+        redundant = []
+        for (host, uri), count in gets.items():
+            if count > 1:
+                hosts[host]["redundant_gets"] += count - 1
+                redundant.append({"host": host, "uri": uri, "count": count})
+
+        endpoint_report = [
+            {
+                "method": method,
+                "uri": uri,
+                "count": len(endpoint["latencies"]),
+                "bytes": endpoint["bytes"],
+                "ms": round(sum(endpoint["latencies"]), 3),
+                "p50": percentile(endpoint["latencies"], 50),
+                "p90": percentile(endpoint["latencies"], 90),
+                "p99": percentile(endpoint["latencies"], 99),
+                "max": max(endpoint["latencies"]),
+            }
+            for (method, uri), endpoint in endpoints.items()
+        ]
+        endpoint_report.sort(key=lambda e: e["ms"], reverse=True)
+        redundant.sort(key=lambda r: r["count"], reverse=True)
+        latencies = [
+            c.get("ms", 0) for c in self.calls if c.get("source", "api") == "api"
+        ]
+        for name, host in hosts.items():
+            host["ms"] = round(host["ms"], 3)
+            throttling = self.throttling.get(name, {})
+            host["retries"] = throttling.get("retries", 0)
+            host["throttled_ms"] = round(
+                throttling.get("rate_limit_ms", 0) + throttling.get("retry_ms", 0), 3
+            )
+
+        return {
+            "totals": {
+                "requests": len(latencies),
+                "local": len(self.calls) - len(latencies),
+                "bytes": sum(h["bytes"] for h in hosts.values()),
+                "ms": round(sum(latencies), 3),
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+                "redundant_gets": sum(h["redundant_gets"] for h in hosts.values()),
+                "retries": sum(h["retries"] for h in hosts.values()),
+                "throttled_ms": round(
+                    sum(h["throttled_ms"] for h in hosts.values()), 3
+                ),
+            },
+            "hosts": hosts,
+            "endpoints": endpoint_report,
+            "redundant_gets": redundant,
+        }
+
+
+def format_report(report: dict, top: int = 10) -> list:
+    """Returns the lines of the human readable `report`."""
+    totals = report["totals"]
+    lines = [
+        f"requests: {totals['requests']}, answered locally: {totals['local']}, bytes: {totals['bytes']}, time: {totals['ms']:.1f} ms, "
+        f"p50/p90/p99: {totals['p50']:.1f}/{totals['p90']:.1f}/{totals['p99']:.1f} ms, redundant GETs: {totals['redundant_gets']}, "
+        f"retries: {totals['retries']}, throttled: {totals['throttled_ms']:.1f} ms",
+        "",
+        "per host:",
+    ]
+    for name, host in sorted(report["hosts"].items()):
+        lines.append(
+            f"  {name}: requests: {host['requests']}, answered locally: {host['local']}, bytes: {host['bytes']}, "
+            f"time: {host['ms']:.1f} ms, redundant GETs: {host['redundant_gets']}, "
+            f"retries: {host['retries']}, throttled: {host['throttled_ms']:.1f} ms"
+        )
+    lines += ["", f"slowest endpoints (top {top} by total time):"]
+    for endpoint in report["endpoints"][:top]:
+        lines.append(
+            f"  {endpoint['method']} {endpoint['uri']}: count: {endpoint['count']}, time: {endpoint['ms']:.1f} ms, "
+            f"p50/p90/p99/max: {endpoint['p50']:.1f}/{endpoint['p90']:.1f}/{endpoint['p99']:.1f}/{endpoint['max']:.1f} ms, bytes: {endpoint['bytes']}"
+        )
+    if report["redundant_gets"]:
+        lines += ["", f"redundant GETs (top {top}):"]
+        for redundant in report["redundant_gets"][:top]:
+            lines.append(
+                f"  {redundant['host']}: GET {redundant['uri']} fetched {redundant['count']} times"
+            )
+    return lines
+
+
+class CallbackModule(CallbackBase):
+    """Reports the F5OS API performance of a playbook run."""
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "f5_ps_ansible.f5os.f5os_timings"
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self.timings_report = TimingsReport()
+
+    def _add(self, result):
+        self.timings_report.add(result._host.get_name(), result._result)
+
+    def v2_runner_on_ok(self, result):
+        self._add(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._add(result)
+
+    def v2_playbook_on_stats(self, stats):
+        if not self.timings_report.calls:
+            return
+        report = self.timings_report.report()
+        self._display.banner("F5OS API TIMINGS")
+        for line in format_report(report, self.get_option("top")):
+            self._display.display(line)
+
+        output_path = self.get_option("output_path")
+        if output_path:
+            with open(output_path, "w") as f:
+                json.dump(report, f, indent=2)
@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+import time
+from contextlib import contextmanager
+
+# below the local temporary directory of ansible of the user, not the shared system temporary directory
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".ansible", "tmp", "f5_ps_ansible.f5os"
+)
+VALIDATOR_TTL = 7 * 24 * 3600
+SNAPSHOT_TTL = 3600
+
+
+def uri_path(uri: str) -> str:
+    """Returns the path of `uri` without query and trailing slash."""
+    return uri.split("?", 1)[0].rstrip("/")
+
+
+def _segment_name(segment: str) -> str:
+    return segment.split("=", 1)[0]
+
+
+def uris_overlap(uri1: str, uri2: str) -> bool:
+    """Returns True if one of the URIs addresses the resource of the other or a child of it. A list entry segment (e.g. 'vlan=20') overlaps with its list segment ('vlan')."""
+    segments1 = uri_path(uri1).split("/")
+    segments2 = uri_path(uri2).split("/")
+    for s1, s2 in zip(segments1, segments2):
+        if s1 == s2:
+            continue
+        if ("=" in s1) != ("=" in s2) and _segment_name(s1) == _segment_name(s2):
+            continue
+        return False
+    return True
+
+
+def uri_is_parent(parent: str, uri: str) -> bool:
+    """Returns True if `uri` is a child resource of `parent`."""
+    return uri_path(uri).startswith(uri_path(parent) + "/")
+
+
+def device_dir(socket_path: str, cache_dir=None) -> str:
+    """Returns the cache directory of the device behind the persistent connection `socket_path` or another device identifier, below `cache_dir` (DEFAULT_CACHE_DIR if not set)."""
+    device = hashlib.sha256(str(socket_path).encode()).hexdigest()[:32]
+    return os.path.join(cache_dir or DEFAULT_CACHE_DIR, device)
+
+
+def private_dir(path: str) -> bool:
+    """Returns True if `path` is a directory (not a symlink) owned by the user and not accessible by others."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.geteuid()
+        and not st.st_mode & 0o077
+    )
+
+
+def open_private(path: str, flags=os.O_WRONLY | os.O_CREAT) -> int:
+    """Returns the file descriptor of `path` opened with `flags`, a new file is only accessible by the user. Symlinks are not followed, so a planted link cannot redirect a write."""
+    return os.open(path, flags | os.O_NOFOLLOW, 0o600)
+
+
+def make_dir(path: str, socket_path=None) -> bool:
+    """Create the cache directory `path` and its parent, only accessible by the user as the caches hold the unredacted configuration. Returns False if one of them is not private to the user (see private_dir), e.g. created by another user, it must not be used then. A directory scoped to the persistent connection `socket_path` records it, see remove_stale_dirs."""
+    parent = os.path.dirname(path)
+    try:
+        os.makedirs(parent, mode=0o700, exist_ok=True)
+        created = not os.path.lexists(path)
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        for _path in (parent, path):
+            st = os.lstat(_path)
+            if stat.S_ISDIR(st.st_mode) and st.st_uid == os.geteuid():
+                # the mode of makedirs is subject to the umask and not applied to existing directories
+                os.chmod(_path, 0o700)
+    except OSError:
+        return False
+    if not (private_dir(parent) and private_dir(path)):
+        return False
+    if socket_path and created:
+        with os.fdopen(open_private(os.path.join(path, "socket")), "w") as f:
+            f.write(str(socket_path))
+    return True
+
+
+def remove_stale_dirs(cache_dir=None) -> None:
+    """Remove the cache directories below `cache_dir` (DEFAULT_CACHE_DIR if not set) of persistent connections whose socket is gone, i.e. of previous playbook runs."""
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    if not private_dir(cache_dir):
+        return
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(cache_dir, name)
+        try:
+            with open(os.path.join(path, "socket"), "r") as f:
+                socket_path = f.read()
+        except OSError:
+            # not scoped to a persistent connection
+            continue
+        if not os.path.exists(socket_path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def connection_scope(module, device: str):
+    """Returns the socket path of the persistent connection of `module` if `device` is identified by it, None if `device` is identified across connections."""
+    return module._socket_path if device == module._socket_path else None
+
+
+@contextmanager
+def locked(path: str):
+    """Context manager holding an exclusive lock on `path`.lock, used to serialize access across forks."""
+    with os.fdopen(open_private(f"{path}.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_json(path: str, default=None):
+    """Returns the JSON content of `path` or `default` if the file is missing or invalid."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json(path: str, data) -> None:
+    """Atomically replaces `path` with the JSON serialized `data`."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+class ResponseCache:
+    """File backed API response cache of a single device. Entries expire after `ttl` seconds, the least recently used entries are evicted when `max_entries` or `max_bytes` is exceeded.
+
+    Every entry is a file named by the hash of its URI, its modification time is the time of the last access. Reads open the entry file only, writes update the entry file, the list of cached URIs and the counters of the cache. Expired entries are ignored by reads. The eviction runs when a limit is exceeded, it removes the entries not accessed within `ttl` and the least recently used entries down to 90% of the limits.
+
+    A disabled cache does not read or store responses, but still invalidates existing entries so that writes of tasks without caching are not missed by tasks with caching.
+
+    Writes to child resources of a cached response do not drop it, they are recorded as `dirty` on the entry instead. Such an entry is not returned by `get` anymore, but `get_partial` can be used to answer reads of its other children.
+
+    Entries can store the validators of a response (the conditional request headers derived from ETag and Last-Modified), `get_validated` returns them to revalidate the entry with the API. `name` separates caches sharing a directory.
+
+    With `compress`, entries are stored gzip compressed, e.g. for large datastore snapshots.
+
+    A cache scoped to the persistent connection `socket_path` is removed with its directory by remove_stale_dirs once the socket is gone. The cache is not used if its directory is not private to the user, see make_dir.
+    """
+
+    max_dirty = 256
+
+    def __init__(
+        self,
+        path,
+        enabled=True,
+        ttl=300,
+        max_entries=512,
+        max_bytes=64 * 1024 * 1024,
+        name="response",
+        compress=False,
+        socket_path=None,
+    ):
+        """Initialize the cache in directory `path`."""
+        self.path = path
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.name = name
+        self.compress = compress
+        self.socket_path = socket_path
+        # the cached URIs, one per line, and the number and size of the entries
+        self.uris_path = os.path.join(path, f"{name}s.uris")
+        self.stats_path = os.path.join(path, f"{name}s.json")
+        self._private = False
+
+    def _usable(self, create=False) -> bool:
+        """Returns True if the directory of the cache is private to the user, it is created if `create` is set."""
+        if not self._private:
+            if create:
+                self._private = make_dir(self.path, self.socket_path)
+            else:
+                self._private = private_dir(os.path.dirname(self.path)) and private_dir(
+                    self.path
+                )
+        return self._private
+
+    def _entry_path(self, uri: str) -> str:
+        return os.path.join(
+            self.path,
+            f"{self.name}-{hashlib.sha256(uri.encode()).hexdigest()}.json{'.gz' if self.compress else ''}",
+        )
+
+    def _dirty_path(self, uri: str) -> str:
+        return f"{self._entry_path(uri)}.dirty"
+
+    def _size(self, uri: str):
+        try:
+            return os.path.getsize(self._entry_path(uri))
+        except OSError:
+            return None
+
+    def _remove(self, uri: str) -> int:
+        """Remove the entry of `uri`, returns its size."""
+        size = self._size(uri) or 0
+        for path in (self._entry_path(uri), self._dirty_path(uri)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return size
+
+    def _uris(self) -> list:
+        """Returns the URIs recorded in the list of cached URIs, entries may have been removed since."""
+        try:
+            with open(self.uris_path, "r") as f:
+                return list(dict.fromkeys(f.read().splitlines()))
+        except OSError:
+            return []
+
+    def get(self, uri: str):
+        """Returns the cached response of `uri` or None."""
+        response, dirty = self.get_partial(uri)
+        if dirty:
+            return None
+        return response
+
+    def _get_entry(self, uri: str) -> tuple:
+        """Returns the cached response of `uri` and its entry, or (None, {}) if not cached."""
+        if not self.enabled or not self._usable():
+            return None, {}
+        path = self._entry_path(uri)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            entry = json.loads(gzip.decompress(data) if self.compress else data)
+        except (OSError, EOFError, ValueError):
+            return None, {}
+        if entry.get("uri") != uri or time.time() - entry["time"] > self.ttl:
+            return None, {}
+        try:
+            # the modification time is the time of the last access, set precisely as the file system clock may be coarse
+            now = time.time_ns()
+            os.utime(path, ns=(now, now))
+        except OSError:
+            pass
+        entry["dirty"] = read_json(self._dirty_path(uri), [])
+        return entry.pop("response"), entry
+
+    def get_partial(self, uri: str) -> tuple:
+        """Returns the cached response of `uri` and the list of child resources written since, or (None, []) if not cached."""
+        response, entry = self._get_entry(uri)
+        return response, entry.get("dirty", [])
+
+    def get_validated(self, uri: str) -> tuple:
+        """Returns the cached response of `uri` and its validators, or (None, {}) if not cached or stored without validators."""
+        response, entry = self._get_entry(uri)
+        if entry.get("dirty") or not entry.get("validators"):
+            return None, {}
+        return response, entry["validators"]
+
+    def set(self, uri: str, response: dict, validators=None) -> None:
+        """Store `response` of `uri` with its `validators`, expired and least recently used entries are evicted if a limit is exceeded."""
+        if not self.enabled or not self._usable(create=True):
+            return
+        entry = {"uri": uri, "time": time.time(), "response": response}
+        if validators:
+            entry["validators"] = validators
+        data = json.dumps(entry, separators=(",", ":")).encode()
+        if self.compress:
+            data = gzip.compress(data, compresslevel=6)
+        with locked(self.uris_path):
+            size = self._size(uri)
+            # overwritten in place and truncated afterwards, replacing or emptying an existing file flushes it on some file systems (e.g. ext4). A read of a partially written entry fails to decode and is a miss.
+            try:
+                fd = open_private(self._entry_path(uri))
+            except OSError:
+                return
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.truncate()
+                now = time.time_ns()
+                os.utime(f.fileno(), ns=(now, now))
+            try:
+                # a new response has no dirty children
+                os.remove(self._dirty_path(uri))
+            except OSError:
+                pass
+            if size is None:
+                with os.fdopen(
+                    open_private(
+                        self.uris_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND
+                    ),
+                    "w",
+                ) as f:
+                    f.write(uri + "\n")
+            stats = read_json(self.stats_path, {"entries": 0, "bytes": 0})
+            stats["entries"] += size is None
+            stats["bytes"] += len(data) - (size or 0)
+            if stats["entries"] > self.max_entries or stats["bytes"] > self.max_bytes:
+                stats = self._evict()
+            self._write_stats(stats)
+
+    def _write_stats(self, stats: dict) -> None:
+        """Overwrite the counters of the cache in place, they are only accessed with the lock held."""
+        fd = open_private(self.stats_path)
+        try:
+            # fixed length, so a shorter content does not leave a stale tail
+            os.pwrite(fd, json.dumps(stats).ljust(64).encode(), 0)
+        finally:
+            os.close(fd)
+
+    def _evict(self) -> dict:
+        """Remove expired and least recently used entries down to the low watermark of the limits and compact the list of cached URIs. Returns the counters of the remaining entries."""
+        now = time.time()
+        entries = []
+        for uri in self._uris():
+            try:
+                stat = os.stat(self._entry_path(uri))
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                # not accessed within the ttl, hence expired
+                self._remove(uri)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, uri))
+        entries.sort()
+        # evict 10% of the limits, so the eviction does not run on every write
+        max_entries = self.max_entries - self.max_entries // 10
+        max_bytes = self.max_bytes - self.max_bytes // 10
+        size = sum(entry[1] for entry in entries)
+        while entries and (len(entries) > max_entries or size > max_bytes):
+            size -= self._remove(entries.pop(0)[2])
+        with os.fdopen(
+            open_private(self.uris_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC), "w"
+        ) as f:
+            f.writelines(uri + "\n" for _, _, uri in entries)
+        return {"entries": len(entries), "bytes": size}
+
+    def invalidate(self, uri: str) -> None:
+        """Remove all entries overlapping with `uri`, entries of parent resources record `uri` as dirty."""
+        if not self._usable() or not os.path.exists(self.uris_path):
+            return
+        with locked(self.uris_path):
+            uris = self._uris()
+            removed = []
+            for _uri in uris:
+                if not uris_overlap(_uri, uri) or self._size(_uri) is None:
+                    continue
+                if uri_is_parent(_uri, uri):
+                    dirty = read_json(self._dirty_path(_uri), [])
+                    if len(dirty) < self.max_dirty:
+                        write_json(self._dirty_path(_uri), dirty + [uri_path(uri)])
+                        continue
+                removed.append(self._remove(_uri))
+            if not removed:
+                return
+            stats = read_json(self.stats_path, {"entries": 0, "bytes": 0})
+            stats["entries"] = max(0, stats["entries"] - len(removed))
+            stats["bytes"] = max(0, stats["bytes"] - sum(removed))
+            if len(uris) > 2 * stats["entries"] + 64:
+                # compact the list of cached URIs
+                stats = self._evict()
+            self._write_stats(stats)
+
+
+def response_cache(module):
+    """Returns the ResponseCache for the device of `module`, it is enabled by the 'cache' parameter and scoped to the persistent connection."""
+    return ResponseCache(
+        device_dir(module._socket_path),
+        enabled=bool(module.params.get("cache")),
+        ttl=module.params.get("cache_ttl") or 300,
+        socket_path=module._socket_path,
+    )
+
+
+def validator_cache(module, device: str):
+    """Returns the validator cache of `device`, it is enabled by the 'conditional_get' parameter of `module` and holds up to 'conditional_get_max_entries' responses. Unlike the response cache it is kept across playbook runs, entries are revalidated with the API instead of trusted."""
+    return ResponseCache(
+        device_dir(device),
+        enabled=bool(module.params.get("conditional_get")),
+        ttl=VALIDATOR_TTL,
+        max_entries=module.params.get("conditional_get_max_entries") or 4096,
+        name="validator",
+        socket_path=connection_scope(module, device),
+    )
+
+
+def snapshot_cache(module, enabled=None):
+    """Returns the datastore snapshot cache for the device of `module`, it is enabled by `enabled` or if not set by the 'snapshot' parameter. Like the response cache it is scoped to the persistent connection."""
+    if enabled is None:
+        enabled = module.params.get("snapshot")
+    return ResponseCache(
+        device_dir(module._socket_path),
+        enabled=bool(enabled),
+        ttl=SNAPSHOT_TTL,
+        max_entries=8,
+        max_bytes=256 * 1024 * 1024,
+        name="snapshot",
+        compress=True,
+        socket_path=module._socket_path,
+    )
+
+
+def fingerprint_cache(module, device: str):
+    """Returns the last-applied fingerprint store of `device`, it is enabled by the 'fingerprint' parameter of `module`. Entries hold the fingerprint of the desired configuration last applied to or found on a resource with the validators of the resource, they are kept across playbook runs."""
+    return ResponseCache(
+        device_dir(device),
+        enabled=bool(module.params.get("fingerprint")),
+        ttl=VALIDATOR_TTL,
+        max_entries=4096,
+        name="fingerprint",
+        socket_path=connection_scope(module, device),
+    )
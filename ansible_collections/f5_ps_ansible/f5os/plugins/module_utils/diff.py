@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# comparison and diffs of configuration, kept out of utils so that the modules which do not compare configuration do not ship it.
+
+from collections import Counter
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.key_matcher import (
+    key_matcher,
+    prune,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.subtree import (
+    list_keys_lookup,
+)
+
+
+def canonical(data, remove_keys=None, memo=None):
+    """
+    Returns a hashable, order independent representation of `data` for comparisons.
+
+    Dicts and lists are represented by frozensets, lists as multiset (element, count). Scalar values are represented by their string value, hence the type is ignored.
+    Keys matching `remove_keys` (key names or path patterns, see KeyMatcher) are left out, subtrees without possible matches are not checked.
+    `memo` is a dict of the representations of dicts and lists by id(). Shared by the comparisons of the same data (e.g. dicts_equal and deep_diff of a resource), every subtree is represented once. Subtrees with keys to remove are not memoized; the data must not be mutated while `memo` is in use.
+    """
+    matcher = key_matcher(remove_keys)
+
+    def _canonical(value, state):
+        if isinstance(value, dict):
+            if not state:
+                if memo is not None:
+                    return _memoized(value)
+                return (
+                    "d",
+                    frozenset((k, _canonical(v, state)) for k, v in value.items()),
+                )
+            items = []
+            for k, v in value.items():
+                child_state, matched = matcher.step(state, k)
+                if not matched:
+                    items.append((k, _canonical(v, child_state)))
+            return ("d", frozenset(items))
+        elif isinstance(value, list):
+            if not state:
+                if memo is not None:
+                    return _memoized(value)
+                return (
+                    "l",
+                    frozenset(Counter(_canonical(v, state) for v in value).items()),
+                )
+            entries = []
+            for i, v in enumerate(value):
+                child_state, matched = matcher.step(state, i)
+                if not matched:
+                    entries.append(_canonical(v, child_state))
+            return ("l", frozenset(Counter(entries).items()))
+        return ("s", str(value))
+
+    def _memoized(value):
+        entry = memo.get(id(value))
+        if entry is None:
+            if isinstance(value, dict):
+                representation = (
+                    "d",
+                    frozenset((k, _canonical(v, None)) for k, v in value.items()),
+                )
+            else:
+                representation = (
+                    "l",
+                    frozenset(Counter(_canonical(v, None) for v in value).items()),
+                )
+            # the value is kept with its representation, so its id() is not reused
+            entry = memo[id(value)] = (value, representation)
+        return entry[1]
+
+    return _canonical(data, matcher.start)
+
+
+def dicts_equal(d1, d2, remove_keys=[], memo=None) -> bool:
+    """
+    Compare two dictionaries recursively, return True if they are equal, False otherwise.
+
+    d1, d2: dictionaries to compare
+    remove_keys: list of key names or path patterns (see KeyMatcher) to ignore in the comparison
+    memo: dict of the representations of subtrees, see canonical
+
+    Lists with different order but same content are considered equal.
+    Values with integers and floats are compared as strings, hence the type is ignored.
+
+    d1 and d2 are not mutated by this function.
+    """
+    # simplest case: if the dictionaries are the same object, they are the same
+    if d1 == d2:
+        return True
+
+    # If the types are different, the dictionaries are different
+    if type(d1) != type(d2):
+        return False
+
+    matcher = key_matcher(remove_keys)
+    return canonical(d1, matcher, memo) == canonical(d2, matcher, memo)
+
+
+def index_list(entries: list, keys: list):
+    """Returns a dict of list `entries` indexed by the tuple of their `keys` values, None if any entry has no or a duplicate key."""
+    index = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or any(key not in entry for key in keys):
+            return None
+        entry_key = tuple(str(entry[key]) for key in keys)
+        if entry_key in index:
+            return None
+        index[entry_key] = entry
+    return index
+
+
+def list_changes(before, after, list_keys=None, remove_keys=None, memo=None) -> dict:
+    """
+    Returns the changes of all lists between `before` and `after`, by path of the list.
+
+    Entries of keyed lists (see list_keys_lookup) are matched by their keys and reported as 'added', 'removed' or 'changed' (with 'before' and 'after').
+    Changed entries are searched for list changes as well, their path contains the keys of the entry, e.g. 'interfaces/interface=lag1/trunk-vlans'.
+    Entries of other lists are compared as multiset and reported as 'added' or 'removed'.
+    Keys matching `remove_keys` (key names or path patterns, see KeyMatcher) are ignored.
+    `memo` is a dict of the representations of subtrees, e.g. of the dicts_equal comparison of `before` and `after`, see canonical.
+    """
+    if remove_keys:
+        before = prune(before, remove_keys)
+        after = prune(after, remove_keys)
+    changes = {}
+
+    def _walk(_before, _after, path, name):
+        if isinstance(_before, dict) and isinstance(_after, dict):
+            for key in _before:
+                if key in _after:
+                    _walk(_before[key], _after[key], path + [str(key)], key)
+        elif isinstance(_before, list) and isinstance(_after, list):
+            list_path = "/".join(path)
+            keys = list_keys_lookup(name, list_keys)
+            before_index = index_list(_before, keys) if keys else None
+            after_index = index_list(_after, keys) if keys else None
+            result = {}
+            if before_index is not None and after_index is not None:
+                result["added"] = [
+                    after_index[k] for k in after_index if k not in before_index
+                ]
+                result["removed"] = [
+                    before_index[k] for k in before_index if k not in after_index
+                ]
+                result["changed"] = []
+                for k, entry in before_index.items():
+                    if k in after_index and canonical(entry, memo=memo) != canonical(
+                        after_index[k], memo=memo
+                    ):
+                        result["changed"].append(
+                            {"before": entry, "after": after_index[k]}
+                        )
+                        _walk(
+                            entry,
+                            after_index[k],
+                            path[:-1] + [f"{path[-1]}={','.join(k)}"],
+                            None,
+                        )
+            else:
+                before_canonical = [canonical(e, memo=memo) for e in _before]
+                after_canonical = [canonical(e, memo=memo) for e in _after]
+                added = Counter(after_canonical) - Counter(before_canonical)
+                removed = Counter(before_canonical) - Counter(after_canonical)
+                result["added"] = [
+                    e for e, c in zip(_after, after_canonical) if _take(added, c)
+                ]
+                result["removed"] = [
+                    e for e, c in zip(_before, before_canonical) if _take(removed, c)
+                ]
+            result = {k: v for k, v in result.items() if v}
+            if result:
+                changes[list_path] = result
+
+    def _take(counter, key):
+        if counter[key] > 0:
+            counter[key] -= 1
+            return True
+        return False
+
+    _walk(before, after, [], None)
+    return changes
+
+
+def changes_add_list_changes(changes, list_keys=None, remove_keys=None, memo=None):
+    """Updates `changes` dict with `list_changes` of the lists which differ between the 'before' and 'after' keys of `changes`."""
+    if changes:
+        _list_changes = list_changes(
+            changes.get("before", {}),
+            changes.get("after", {}),
+            list_keys=list_keys,
+            remove_keys=remove_keys,
+            memo=memo,
+        )
+        if _list_changes:
+            changes.update({"list_changes": _list_changes})
+
+
+def deep_diff(before, after, list_keys=None, memo=None) -> dict:
+    """
+    Returns the structural differences between `before` and `after`, in the shape of DeepDiff(before, after, ignore_order=True, verbose_level=2).to_dict().
+
+    Supported report types are 'values_changed', 'type_changes', 'dictionary_item_added', 'dictionary_item_removed', 'iterable_item_added' and 'iterable_item_removed'. Type names are reported as strings.
+    Entries of keyed lists (see list_keys_lookup) are matched by their keys and compared recursively, entries of other lists are compared as multiset.
+    Identical subtrees are skipped without traversing them. `memo` is a dict of the representations of subtrees, e.g. of the dicts_equal comparison of `before` and `after`, see canonical.
+    """
+    diff = {}
+
+    def _report(report_type, path, value):
+        diff.setdefault(report_type, {})[path] = value
+
+    def _walk(_before, _after, path, name):
+        if _before == _after and type(_before) is type(_after):
+            return
+        if isinstance(_before, dict) and isinstance(_after, dict):
+            for key, value in _before.items():
+                key_path = f"{path}[{key!r}]"
+                if key not in _after:
+                    _report("dictionary_item_removed", key_path, value)
+                else:
+                    _walk(value, _after[key], key_path, key)
+            for key, value in _after.items():
+                if key not in _before:
+                    _report("dictionary_item_added", f"{path}[{key!r}]", value)
+        elif isinstance(_before, list) and isinstance(_after, list):
+            _walk_list(_before, _after, path, name)
+        elif type(_before) is not type(_after):
+            _report(
+                "type_changes",
+                path,
+                {
+                    "old_type": type(_before).__name__,
+                    "new_type": type(_after).__name__,
+                    "old_value": _before,
+                    "new_value": _after,
+                },
+            )
+        else:
+            _report("values_changed", path, {"new_value": _after, "old_value": _before})
+
+    def _walk_list(_before, _after, path, name):
+        keys = list_keys_lookup(name, list_keys)
+        before_index = index_list(_before, keys) if keys else None
+        after_index = index_list(_after, keys) if keys else None
+        if before_index is not None and after_index is not None:
+            after_position = {k: i for i, k in enumerate(after_index)}
+            for i, (k, entry) in enumerate(before_index.items()):
+                if k not in after_index:
+                    _report("iterable_item_removed", f"{path}[{i}]", entry)
+                else:
+                    _walk(entry, after_index[k], f"{path}[{after_position[k]}]", None)
+            for k, entry in after_index.items():
+                if k not in before_index:
+                    _report(
+                        "iterable_item_added", f"{path}[{after_position[k]}]", entry
+                    )
+            return
+
+        before_canonical = [canonical(entry, memo=memo) for entry in _before]
+        after_canonical = [canonical(entry, memo=memo) for entry in _after]
+        added = Counter(after_canonical)
+        added.subtract(before_canonical)
+        removed = Counter(before_canonical)
+        removed.subtract(after_canonical)
+        for i, entry in enumerate(_before):
+            if removed[before_canonical[i]] > 0:
+                removed[before_canonical[i]] -= 1
+                _report("iterable_item_removed", f"{path}[{i}]", entry)
+        for i, entry in enumerate(_after):
+            if added[after_canonical[i]] > 0:
+                added[after_canonical[i]] -= 1
+                _report("iterable_item_added", f"{path}[{i}]", entry)
+
+    _walk(before, after, "root", None)
+    return diff
+
+
+def changes_add_deep_diff(changes, list_keys=None, memo=None):
+    """Updates `changes` dict with `diff`, created by deep_diff based on 'before' and 'after' keys of `changes`."""
+    diff = None
+    if changes:
+        diff = deep_diff(
+            changes.get("before", {}),
+            changes.get("after", {}),
+            list_keys=list_keys,
+            memo=memo,
+        )
+    if diff:
+        changes.update({"diff": diff})
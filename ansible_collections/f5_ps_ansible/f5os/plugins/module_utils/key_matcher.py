@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from fnmatch import fnmatchcase
+from functools import lru_cache
+
+GLOB_CHARS = set("*?[")
+
+
+class _Node:
+    """A node of the KeyMatcher trie, `recursive` nodes represent a '**' segment."""
+
+    __slots__ = ("children", "globs", "recursive", "terminal")
+
+    def __init__(self, recursive=False):
+        self.children = {}
+        self.globs = []
+        self.recursive = recursive
+        self.terminal = False
+
+    def child(self, segment):
+        if segment == "**":
+            node = self.children.get(segment)
+            if node is None:
+                node = self.children[segment] = _Node(recursive=True)
+            return node
+        if GLOB_CHARS & set(segment):
+            for glob, node in self.globs:
+                if glob == segment:
+                    return node
+            node = _Node()
+            self.globs.append((segment, node))
+            return node
+        return self.children.setdefault(segment, _Node())
+
+
+class KeyMatcher:
+    """
+    Matches keys of a data structure against a list of key names and path patterns, compiled into a trie.
+
+    - a key name without '/', e.g. 'members' or 'f5-*:state', matches the key at any depth (same as '**/members')
+    - a path pattern, e.g. '/openconfig-vlan:vlans/vlan/*/members', matches from the root of the data structure. List entries are addressed by their index, usually with '*'.
+    - '*', '?' and '[...]' match within a single segment, '**' matches any number of segments
+
+    Walking the data structure, `step` returns the state for a child key and whether the child matched. The empty state (`EMPTY`) never matches.
+    """
+
+    EMPTY = frozenset()
+
+    def __init__(self, patterns):
+        """Compile `patterns` into the trie."""
+        self.root = _Node()
+        for pattern in patterns or []:
+            pattern = str(pattern)
+            if "/" not in pattern:
+                pattern = f"**/{pattern}"
+            node = self.root
+            for segment in pattern.strip("/").split("/"):
+                if segment:
+                    node = node.child(segment)
+            node.terminal = True
+        self.start = self._closure({self.root}) if patterns else self.EMPTY
+        self._steps = {}
+
+    @staticmethod
+    def _closure(nodes):
+        """Returns `nodes` including the '**' nodes reachable without consuming a segment."""
+        nodes = set(nodes)
+        pending = list(nodes)
+        while pending:
+            recursive = pending.pop().children.get("**")
+            if recursive is not None and recursive not in nodes:
+                nodes.add(recursive)
+                pending.append(recursive)
+        return frozenset(nodes)
+
+    def step(self, state, key) -> tuple:
+        """Returns the state of child `key` of a node with `state` and True if `key` matches a pattern."""
+        if not state:
+            return self.EMPTY, False
+        cache_key = (state, key)
+        result = self._steps.get(cache_key)
+        if result is None:
+            segment = str(key)
+            nodes = set()
+            for node in state:
+                child = node.children.get(segment)
+                if child is not None:
+                    nodes.add(child)
+                for glob, child in node.globs:
+                    if fnmatchcase(segment, glob):
+                        nodes.add(child)
+                if node.recursive:
+                    nodes.add(node)
+            new_state = self._closure(nodes)
+            result = (new_state, any(node.terminal for node in new_state))
+            self._steps[cache_key] = result
+        return result
+
+
+@lru_cache(maxsize=64)
+def _compile(patterns: tuple) -> KeyMatcher:
+    return KeyMatcher(patterns)
+
+
+def key_matcher(keys) -> KeyMatcher:
+    """Returns the compiled KeyMatcher for the list of key names and path patterns `keys`."""
+    if isinstance(keys, KeyMatcher):
+        return keys
+    return _compile(tuple(str(key) for key in keys or []))
+
+
+def prune(data, keys):
+    """Returns a copy of `data` without the keys matching `keys` (see KeyMatcher), `data` is not mutated."""
+    matcher = key_matcher(keys)
+
+    def _prune(value, state):
+        if not state:
+            return value
+        if isinstance(value, dict):
+            pruned = {}
+            for k, v in value.items():
+                child_state, matched = matcher.step(state, k)
+                if not matched:
+                    pruned[k] = _prune(v, child_state)
+            return pruned
+        elif isinstance(value, list):
+            pruned = []
+            for i, v in enumerate(value):
+                child_state, matched = matcher.step(state, i)
+                if not matched:
+                    pruned.append(_prune(v, child_state))
+            return pruned
+        return value
+
+    return _prune(data, matcher.start)
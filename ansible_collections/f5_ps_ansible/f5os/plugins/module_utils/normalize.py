@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.key_matcher import (
+    key_matcher,
+)
+
+
+def _state_keys(data: dict) -> list:
+    """Returns the 'state' keys of `data` which have a 'config' counterpart, e.g. 'state' next to 'config' or 'f5-x:state' next to 'f5-x:config'."""
+    state_keys = []
+    for key in data:
+        if key == "state" or str(key).endswith(":state"):
+            base_key_name = str(key)[: -len(":state")] if key != "state" else key
+            if "config" in data or any(
+                str(k).endswith(f"{base_key_name}:config") for k in data
+            ):
+                state_keys.append(key)
+    return state_keys
+
+
+def normalize(data, remove_state=False, remove_keys=None):
+    """
+    Returns a normalized copy of `data` created by a single traversal, `data` is not mutated.
+
+    - numeric values (int, float) are converted to strings
+    - 'true' and 'false' strings (case insensitive) are converted to booleans
+    - remove_state: remove 'state' properties with a 'config' counterpart
+    - remove_keys: list of key names or path patterns to remove (see KeyMatcher), key names are removed recursively
+    """
+    if not isinstance(data, (dict, list)):
+        return data
+
+    matcher = key_matcher(remove_keys)
+    root = {} if isinstance(data, dict) else []
+    stack = [(data, root, matcher.start)]
+    while stack:
+        source, target, state = stack.pop()
+        if isinstance(source, dict):
+            skip = _state_keys(source) if remove_state else []
+            items = ((key, value) for key, value in source.items() if key not in skip)
+        else:
+            items = enumerate(source)
+
+        for key, value in items:
+            child_state = state
+            if state:
+                child_state, matched = matcher.step(state, key)
+                if matched:
+                    continue
+            if isinstance(value, dict):
+                value_copy = {}
+                stack.append((value, value_copy, child_state))
+                value = value_copy
+            elif isinstance(value, list):
+                value_copy = []
+                stack.append((value, value_copy, child_state))
+                value = value_copy
+            elif isinstance(value, bool):
+                pass
+            elif isinstance(value, (int, float)):
+                value = str(value)
+            elif isinstance(value, str):
+                lower_value = value.lower()
+                if lower_value == "true":
+                    value = True
+                elif lower_value == "false":
+                    value = False
+
+            if isinstance(target, dict):
+                target[key] = value
+            else:
+                target.append(value)
+
+    return root
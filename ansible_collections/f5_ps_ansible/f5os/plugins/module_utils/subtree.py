@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from urllib.parse import unquote
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.cache import (
+    uri_path,
+    uris_overlap,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.utils import add_query
+
+# keys of common OpenConfig and F5OS lists, by list name without module prefix
+LIST_KEYS = {
+    "host-entry": ["hostname"],
+    "interface": ["name"],
+    "role": ["rolename"],
+    "server": ["address"],
+    "subinterface": ["index"],
+    "tenant": ["name"],
+    "user": ["username"],
+    "vlan": ["vlan-id"],
+}
+
+
+def local_name(name: str) -> str:
+    """Returns `name` without its YANG module prefix, e.g. 'vlan' for 'openconfig-vlan:vlan'."""
+    return name.rsplit(":", 1)[-1]
+
+
+def list_keys_lookup(name, list_keys=None):
+    """Returns the key names of list `name` from `list_keys` or the built-in LIST_KEYS, None for unknown lists."""
+    list_keys = dict(LIST_KEYS, **(list_keys or {}))
+    keys = list_keys.get(name) or list_keys.get(local_name(str(name)))
+    if isinstance(keys, str):
+        keys = [keys]
+    return keys or None
+
+
+def parse_uri(uri: str) -> list:
+    """Returns the segments of a RESTCONF resource `uri` following the datastore ('/data') as list of (name, keys) tuples. `keys` is None for segments without list keys."""
+    path = uri_path(uri)
+    index = path.find("/data/")
+    if index != -1:
+        path = path[index + len("/data/") :]
+    elif path.endswith("/data"):
+        # the datastore root
+        path = ""
+    segments = []
+    for segment in path.split("/"):
+        if not segment:
+            continue
+        if "=" in segment:
+            name, keys = segment.split("=", 1)
+            segments.append((name, [unquote(key) for key in keys.split(",")]))
+        else:
+            segments.append((segment, None))
+    return segments
+
+
+def qualified_name(segments: list) -> str:
+    """Returns the module qualified name of the last segment, the module is inherited from the closest parent segment with a module prefix (RFC 7951)."""
+    name = segments[-1][0]
+    if ":" in name:
+        return name
+    for parent, _ in reversed(segments[:-1]):
+        if ":" in parent:
+            return f"{parent.split(':', 1)[0]}:{name}"
+    return name
+
+
+def _query(uri: str) -> str:
+    return uri.split("?", 1)[1] if "?" in uri else ""
+
+
+def _member(node, name: str):
+    """Returns the value of the member `name` of dict `node`, module prefixes are ignored."""
+    if not isinstance(node, dict):
+        return None
+    if name in node:
+        return node[name]
+    name = local_name(name)
+    for key, value in node.items():
+        if local_name(str(key)) == name:
+            return value
+    return None
+
+
+def list_entry_key(entry, key_names):
+    """Returns the tuple of the key values of list `entry`, in the order of the key leafs `key_names`, or of the value of a leaf-list entry. None if the entry has no value for a key or `key_names` is None."""
+    if not isinstance(entry, dict):
+        return (str(entry),)
+    if key_names is None:
+        return None
+    values = [_member(entry, name) for name in key_names]
+    if any(value is None or isinstance(value, (dict, list)) for value in values):
+        return None
+    return tuple(str(value) for value in values)
+
+
+def list_entry_matches(entry, keys: list, key_names) -> bool:
+    """Returns True if the list `entry` is identified by the URI `keys`. Leaf-list entries are compared directly, list entries by the values of their key leafs `key_names` (see list_keys_lookup), one to one and in order."""
+    if isinstance(entry, dict) and (key_names is None or len(key_names) != len(keys)):
+        return False
+    return list_entry_key(entry, key_names) == tuple(keys)
+
+
+class SubtreeIndex:
+    """Answers GET requests of child resources from the fetched content of a parent resource (container or list entry).
+
+    Resources written after the parent has been fetched are tracked as `dirty`, reads overlapping with them must be sent to the API.
+
+    Lists are indexed by the values of the key leafs of their entries on first access, so reads of list entries do not scan the list, e.g. for a snapshot of the whole datastore. The key leafs are looked up with `list_keys` (see list_keys_lookup), reads of entries of lists with unknown keys are sent to the API.
+    """
+
+    def __init__(self, uri: str, api_response: dict, dirty=None, list_keys=None):
+        """Initialize the index of resource `uri` with its GET `api_response`. Query parameters of `uri` must be identical for child resources to be answered, 'depth' and 'fields' are not supported."""
+        self.uri = uri_path(uri)
+        self.query = _query(uri)
+        self.segments = parse_uri(uri)
+        self.dirty = list(dirty or [])
+        self.list_keys = list_keys
+        self.node = None
+        # False if the fetched list entry cannot be identified by its keys
+        self.identified = True
+        self._lists = {}
+        contents = api_response.get("contents") or {}
+        if api_response.get("code", 0) == 200 and isinstance(contents, dict):
+            self.node = (
+                _member(contents, self.segments[-1][0]) if self.segments else contents
+            )
+            if self.segments and self.segments[-1][1] is not None:
+                # the parent is a list entry, RESTCONF returns it as single entry list
+                name, keys = self.segments[-1]
+                key_names = list_keys_lookup(name, list_keys)
+                entries = self.node if isinstance(self.node, list) else []
+                self.node = next(
+                    (e for e in entries if list_entry_matches(e, keys, key_names)),
+                    None,
+                )
+                if key_names is None and len(entries) == 1:
+                    self.node = entries[0]
+                elif key_names is None and entries:
+                    self.identified = False
+        elif api_response.get("code", 0) != 404:
+            # the parent could not be read, only its absence (404) tells that the children are absent
+            self.identified = False
+
+    def covers(self, uri: str) -> bool:
+        """Returns True if `uri` is a child of the indexed resource."""
+        if (
+            not self.identified
+            or _query(uri) != self.query
+            or "depth=" in self.query
+            or "fields=" in self.query
+        ):
+            return False
+        return uri_path(uri).startswith(self.uri + "/")
+
+    def _list_index(self, value: list, key_names) -> dict:
+        """Returns the entries of list `value` by their key values (see list_entry_key)."""
+        index = self._lists.get(id(value))
+        if index is None:
+            index = {}
+            for entry in value:
+                index.setdefault(list_entry_key(entry, key_names), entry)
+            self._lists[id(value)] = index
+        return index
+
+    def mark_dirty(self, uri: str) -> None:
+        """Record a write to `uri`."""
+        self.dirty.append(uri_path(uri))
+
+    def get(self, uri: str):
+        """Returns the GET response for child `uri` or None if it cannot be answered locally."""
+        if not self.covers(uri) or any(uris_overlap(uri, d) for d in self.dirty):
+            return None
+
+        segments = parse_uri(uri)
+        node = self.node
+        value = None
+        for name, keys in segments[len(self.segments) :]:
+            value = _member(node, name)
+            if value is not None and keys is not None:
+                entries = value if isinstance(value, list) else []
+                key_names = list_keys_lookup(name, self.list_keys)
+                if any(isinstance(e, dict) for e in entries) and (
+                    key_names is None or len(key_names) != len(keys)
+                ):
+                    # the key leafs of the list are unknown
+                    return None
+                entry = self._list_index(entries, key_names).get(tuple(keys))
+                value = None if entry is None else [entry]
+                node = entry
+            else:
+                node = value
+            if value is None:
+                return {"code": 404, "contents": {}}
+
+        return {"code": 200, "contents": {qualified_name(segments): value}}
+
+
+def prefetch(api_client, uri, params=None):
+    """fetch resource `uri` once and answer subsequent GET requests of `api_client` (an APIClient) for its child resources with the same query `params` from it. The children of an absent (404) resource are absent, if `uri` cannot be read otherwise they are read from the API."""
+    uri = add_query(uri, params)
+    response, dirty = api_client.cache.get_partial(uri)
+    if response is None:
+        response = api_client.get(uri=uri)
+    if response.get("code", 0) not in [200, 404]:
+        return response
+    api_client.add_subtree(
+        SubtreeIndex(uri, response, dirty, api_client.module.params.get("list_keys"))
+    )
+    return response
+
+
+def snapshot(api_client, datastore, params=None, refresh=False):
+    """answer GET requests of `api_client` (an APIClient) for all resources below the `datastore` root with the same query `params` from a snapshot of the datastore. The snapshot is fetched once and shared across tasks for the same device, resources written since are read from the API again."""
+    uri = add_query(datastore.rstrip("/"), params)
+    response, dirty = None, []
+    if not refresh:
+        response, dirty = api_client.snapshots.get_partial(uri)
+    if response is None:
+        response = api_client.call("GET", uri, cached=False)
+        if response.get("code", 0) != 200:
+            # the datastore could not be read, resources are read from the API
+            return response
+        api_client.snapshots.set(uri, response)
+    api_client.add_subtree(
+        SubtreeIndex(uri, response, dirty, api_client.module.params.get("list_keys"))
+    )
+    return response
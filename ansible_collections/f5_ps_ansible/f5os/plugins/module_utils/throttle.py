@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import os
+import random
+import time
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.cache import (
+    connection_scope,
+    device_dir,
+    locked,
+    make_dir,
+    read_json,
+    write_json,
+)
+
+IDEMPOTENT_METHODS = ("GET", "PUT", "DELETE")
+RETRY_STATUS = (429, 503)
+BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+
+
+def retry_after(response: dict):
+    """Returns the seconds of the Retry-After header of `response`, None if it is missing or an HTTP date."""
+    for name, value in (response.get("headers") or {}).items():
+        if name.lower() == "retry-after":
+            try:
+                return max(0.0, float(value))
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def retry_delay(attempt: int, response=None) -> float:
+    """Returns the seconds to wait before retry `attempt` (starting at 0), the Retry-After header of `response` or an exponential backoff with jitter, so forks throttled at the same time do not retry at the same time."""
+    delay = retry_after(response or {})
+    if delay is None:
+        delay = min(MAX_BACKOFF, BACKOFF * 2**attempt) * random.uniform(0.5, 1.0)
+    return min(MAX_BACKOFF, delay)
+
+
+def retryable(method: str, response=None) -> bool:
+    """Returns True if the request of `method` can be retried, `response` is None if the connection failed."""
+    if method not in IDEMPOTENT_METHODS:
+        return False
+    return response is None or response.get("code", 0) in RETRY_STATUS
+
+
+class RateLimiter:
+    """Token bucket limiting the requests to a device to `rate` per second with bursts of up to `burst` requests.
+
+    The bucket is stored in the file `path`, access is serialized with a lock file so the limit is shared by all forks using the device. A `rate` of 0 disables the limiter, so does a directory of the bucket which is not private to the user. `socket_path` scopes the directory of the bucket to a persistent connection, see make_dir.
+    """
+
+    def __init__(self, path, rate=0, burst=None, socket_path=None):
+        """Initialize the rate limiter with the bucket file `path`."""
+        self.path = path
+        self.rate = float(rate or 0)
+        self.burst = float(burst or max(1.0, self.rate))
+        self.socket_path = socket_path
+        self._private = False
+
+    def acquire(self) -> float:
+        """Take a token from the bucket, waits until it is available. Returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        if not self._private:
+            self._private = make_dir(os.path.dirname(self.path), self.socket_path)
+            if not self._private:
+                return 0.0
+        with locked(self.path):
+            now = time.time()
+            bucket = read_json(self.path, {})
+            elapsed = max(0.0, now - bucket.get("updated", now))
+            tokens = min(
+                self.burst, bucket.get("tokens", self.burst) + elapsed * self.rate
+            )
+            # the token is reserved, a negative balance is the wait of the following requests
+            tokens -= 1
+            write_json(self.path, {"tokens": tokens, "updated": now})
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+def rate_limiter(module, device: str):
+    """Returns the RateLimiter of `device`, it is enabled by the 'rate_limit' parameter of `module` (requests per second)."""
+    return RateLimiter(
+        os.path.join(device_dir(device), "ratelimit.json"),
+        rate=module.params.get("rate_limit"),
+        socket_path=connection_scope(module, device),
+    )
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import json
+import time
+from contextlib import contextmanager
+
+
+def response_bytes(response: dict) -> int:
+    """Returns the size of the JSON serialized contents of `response`, the httpapi only returns the parsed response body."""
+    contents = response.get("contents")
+    if not contents:
+        return 0
+    return len(json.dumps(contents, separators=(",", ":")))
+
+
+class Timings:
+    """Collects the wall time of the API calls and processing phases of a module execution.
+
+    A disabled instance records nothing, `phase` only yields.
+    """
+
+    def __init__(self, enabled=False):
+        """Initialize the timings, the total time starts now."""
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.api_calls = []
+        self.phases = {}
+        self.throttling = {
+            "rate_limited": 0,
+            "rate_limit_ms": 0.0,
+            "retries": 0,
+            "retry_ms": 0.0,
+        }
+
+    def record_call(self, method, uri, response, seconds, source="api") -> None:
+        """Record an API call of `method` and `uri` which took `seconds`. `source` is 'api' for requests sent to the API, otherwise the local source of the response, e.g. 'cache'."""
+        if not self.enabled:
+            return
+        call = {
+            "method": method,
+            "uri": uri,
+            "status": response.get("code", 0),
+            "bytes": response_bytes(response),
+            "ms": round(seconds * 1000, 3),
+            "source": source,
+        }
+        self.api_calls.append(call)
+
+    def record_wait(self, reason: str, seconds: float) -> None:
+        """Record a wait of `seconds` before a request, `reason` is 'rate_limit' for the rate limiter or 'retry' for the backoff before a retry."""
+        if not self.enabled or (reason == "rate_limit" and not seconds):
+            return
+        counter = "rate_limited" if reason == "rate_limit" else "retries"
+        self.throttling[counter] += 1
+        self.throttling[f"{reason}_ms"] += seconds * 1000
+
+    @contextmanager
+    def phase(self, name: str):
+        """Context manager adding the wall time of its block to phase `name`."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            phase = self.phases.setdefault(name, {"ms": 0.0, "count": 0})
+            phase["ms"] += seconds * 1000
+            phase["count"] += 1
+
+    def result(self) -> dict:
+        """Returns the timings block of the module result."""
+        return {
+            "total_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            "api_calls": list(self.api_calls),
+            "phases": {
+                name: {"ms": round(phase["ms"], 3), "count": phase["count"]}
+                for name, phase in self.phases.items()
+            },
+            "throttling": {
+                name: round(value, 3) for name, value in self.throttling.items()
+            },
+        }
@@ -3,36 +3,229 @@
 # Copyright: Simon Kowallik for the F5 DevCentral Community
 # GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 
-from copy import deepcopy
+import hashlib
+import json
+import time
+from urllib.parse import quote
+
+from ansible.module_utils.connection import Connection, ConnectionError
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.cache import (
+    fingerprint_cache,
+    remove_stale_dirs,
+    response_cache,
+    snapshot_cache,
+    uri_is_parent,
+    uris_overlap,
+    validator_cache,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.throttle import (
+    rate_limiter,
+    retry_delay,
+    retryable,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.timing import Timings
+
+YANG_DATA_JSON = "application/yang-data+json"
+YANG_PATCH_JSON = "application/yang-patch+json"
+
+
+def query_params(content=None, depth=None, fields=None, with_defaults=None) -> dict:
+    """Returns the RESTCONF (RFC 8040) query parameters for all arguments which are set."""
+    params = {
+        "content": content,
+        "depth": depth,
+        "fields": fields,
+        "with-defaults": with_defaults,
+    }
+    return {k: v for k, v in params.items() if v not in [None, ""]}
+
+
+def module_query_params(module) -> dict:
+    """Returns the RESTCONF query parameters set by the 'content', 'depth', 'fields' and 'with_defaults' parameters of `module`."""
+    return query_params(
+        content=module.params.get("content"),
+        depth=module.params.get("depth"),
+        fields=module.params.get("fields"),
+        with_defaults=module.params.get("with_defaults"),
+    )
+
+
+def add_query(uri: str, params=None) -> str:
+    """Returns `uri` with the query `params` appended, existing query parameters of `uri` are kept."""
+    if not params:
+        return uri
+    query = "&".join(
+        f"{key}={quote(str(value), safe=':/;(),=')}" for key, value in params.items()
+    )
+    return f"{uri}{'&' if '?' in uri else '?'}{query}"
+
+
+def response_validators(response: dict) -> dict:
+    """Returns the conditional request headers (If-None-Match, If-Modified-Since) for the ETag and Last-Modified headers of `response`."""
+    headers = {str(k).lower(): v for k, v in (response.get("headers") or {}).items()}
+    validators = {}
+    if headers.get("etag"):
+        validators["If-None-Match"] = headers["etag"]
+    if headers.get("last-modified"):
+        validators["If-Modified-Since"] = headers["last-modified"]
+    return validators
+
+
+def config_fingerprint(*values) -> str:
+    """Returns the SHA-256 fingerprint of the JSON serializable `values`, e.g. the desired configuration of a resource. Unlike hash() it is stable across processes."""
+    data = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def device_identity(connection, socket_path: str) -> str:
+    """Returns an identifier of the device behind `connection` which is stable across playbook runs, `socket_path` if the connection options are not available."""
+    try:
+        return "@".join(
+            str(connection.get_option(option))
+            for option in ("remote_user", "host", "port")
+        )
+    except (AttributeError, ConnectionError):
+        return socket_path
+
 
-from ansible.module_utils.connection import Connection
+def default_api_prefix(connection) -> str:
+    """Returns the path prefix of the F5OS RESTCONF API for the port of `connection`, '/restconf' for port 8888 and '/api' otherwise or if the connection options are not available."""
+    try:
+        port = connection.get_option("port")
+    except (AttributeError, ConnectionError):
+        return "/api"
+    return "/restconf" if str(port) == "8888" else "/api"
 
 
 class APIClient:
     """Class to interact with the BIG-IP F5OS API."""
 
-    def __init__(self, module):
-        """Initialize the API class."""
+    def __init__(self, module, snapshot=None):
+        """Initialize the API class. `snapshot` enables or disables the snapshot cache instead of the 'snapshot' parameter of `module`."""
         self.module = module
         self.connection = Connection(module._socket_path)
+        # the caches of the persistent connections of previous playbook runs
+        remove_stale_dirs()
+        self.cache = response_cache(module)
+        device = module._socket_path
+        if (
+            module.params.get("conditional_get")
+            or module.params.get("fingerprint")
+            or module.params.get("rate_limit")
+        ):
+            device = device_identity(self.connection, device)
+        self.validators = validator_cache(module, device)
+        self.fingerprints = fingerprint_cache(module, device)
+        self.rate_limiter = rate_limiter(module, device)
+        self.retries = module.params.get("retries") or 0
+        self.snapshots = snapshot_cache(module, enabled=snapshot)
+        self.timings = Timings(enabled=bool(module.params.get("timings")))
+        self.subtrees = []
+
+    def add_subtree(self, subtree):
+        """answer GET requests of the resources below `subtree` (a SubtreeIndex, see prefetch and snapshot of subtree) from it."""
+        self.subtrees.append(subtree)
+
+    def invalidate(self, uri):
+        """drop cached, prefetched and snapshot content of resource `uri` after it has been written to."""
+        self.cache.invalidate(uri)
+        self.snapshots.invalidate(uri)
+        subtrees = []
+        for subtree in self.subtrees:
+            if uri_is_parent(subtree.uri, uri):
+                subtree.mark_dirty(uri)
+                subtrees.append(subtree)
+            elif not uris_overlap(subtree.uri, uri):
+                subtrees.append(subtree)
+        self.subtrees = subtrees
+
+    def call(
+        self,
+        method,
+        uri,
+        config=None,
+        content_type=YANG_DATA_JSON,
+        params=None,
+        cached=True,
+        validators=None,
+    ):
+        """send a request to the API, GET requests are answered from prefetched content and the caches if possible unless `cached` is False. GET requests with `validators` are sent as conditional request, a 304 Not Modified response is returned as is."""
+        uri = add_query(uri, params)
+        cached = cached and not validators
+        start = time.perf_counter()
+        if method == "GET" and cached:
+            for subtree in self.subtrees:
+                response = subtree.get(uri)
+                if response is not None:
+                    self.timings.record_call(
+                        method, uri, response, time.perf_counter() - start, "prefetch"
+                    )
+                    return response
+            response = self.cache.get(uri)
+            if response is not None:
+                self.timings.record_call(
+                    method, uri, response, time.perf_counter() - start, "cache"
+                )
+                return response
 
-    def call(self, method, uri, config=None):
-        """query the API with a GET request."""
         if config is None:
-            headers = {"Accept": "application/yang-data+json"}
+            headers = {"Accept": YANG_DATA_JSON}
         else:
             headers = {
-                "Content-Type": "application/yang-data+json",
-                "Accept": "application/yang-data+json",
+                "Content-Type": content_type,
+                "Accept": YANG_DATA_JSON,
             }
-        response = self.connection.send_request(
-            method=method,
-            path=uri,
-            headers=headers,
-            payload=config,
-        )
+        validated = None
+        if method == "GET":
+            if not validators:
+                validated, validators = self.validators.get_validated(uri)
+            headers.update(validators)
+        response = self._send(method, uri, headers, config)
+
+        if method == "GET":
+            if response.get("code", 0) == 304 and validated is not None:
+                # not modified, serve the body of the validated response, reading it marked the entry as recently used
+                response = validated
+            elif response.get("code", 0) == 200:
+                validators = response_validators(response)
+                if validators:
+                    self.validators.set(uri, response, validators)
+            if cached and response.get("code", 0) in [200, 204, 404]:
+                self.cache.set(uri, response)
+        elif content_type != YANG_PATCH_JSON:
+            # write-through: drop cached responses of the affected resources
+            self.invalidate(uri)
         return response
 
+    def _send(self, method, uri, headers, config):
+        """send a request to the API within the rate limit, idempotent requests are retried with backoff on 429 and 503 responses and connection errors."""
+        attempt = 0
+        while True:
+            self.timings.record_wait("rate_limit", self.rate_limiter.acquire())
+            start = time.perf_counter()
+            try:
+                response = self.connection.send_request(
+                    method=method,
+                    path=uri,
+                    headers=headers,
+                    payload=config,
+                )
+            except ConnectionError:
+                if attempt >= self.retries or not retryable(method):
+                    raise
+                response = None
+            else:
+                self.timings.record_call(
+                    method, uri, response, time.perf_counter() - start
+                )
+                if attempt >= self.retries or not retryable(method, response):
+                    return response
+            delay = retry_delay(attempt, response)
+            self.timings.record_wait("retry", delay)
+            time.sleep(delay)
+            attempt += 1
+
     def delete(self, *args, **kwargs):
         """delete a resource."""
         return self.call("DELETE", *args, **kwargs)
@@ -53,239 +246,45 @@ class APIClient:
         """update a resource."""
         return self.call("PATCH", *args, **kwargs)
 
+    def yang_patch(self, uri, edits, patch_id="f5_ps_ansible.f5os"):
+        """apply a list of edits with a single YANG-PATCH (RFC 8072) request, usually against the datastore root."""
+        config = {
+            "ietf-yang-patch:yang-patch": {
+                "patch-id": patch_id,
+                "edit": edits,
+            }
+        }
+        response = self.call("PATCH", uri, config=config, content_type=YANG_PATCH_JSON)
+        for edit in edits:
+            self.invalidate(uri.rstrip("/") + edit["target"])
+        return response
 
-def remove_state_property(data: dict) -> dict:
-    """Recursively remove the 'state' property from the data structure if a 'config' property is present on the same level. It also supports ':config' and ':state' suffixes for an identical key."""
-
-    def _remove_suffix(s: str, suffix: str) -> str:
-        if s.endswith(suffix):
-            return s[: -len(suffix)]
-        return s
-
-    data_items = list(data.items())
-    for key, value in data_items:
-        if key == "state" or str(key).endswith(":state"):
-            _base_key_name = _remove_suffix(str(key), ":state")
-            if "config" in data.keys() or any(
-                k.endswith(f"{_base_key_name}:config") for k in data.keys()
-            ):
-                data.pop(key)
-        elif isinstance(value, dict):
-            data[key] = remove_state_property(value)
-        elif isinstance(value, list):
-            data[key] = [
-                remove_state_property(item) if isinstance(item, dict) else item
-                for item in value
-            ]
-    return data
-
-
-def recurse_remove_keys(data: dict, keys: list) -> dict:
-    """Recursively remove keys from the data structure."""
-    data_items = list(data.items())
-    for key, value in data_items:
-        if key in keys:
-            data.pop(key)
-        elif isinstance(value, dict):
-            data[key] = recurse_remove_keys(value, keys)
-        elif isinstance(value, list):
-            data[key] = [
-                recurse_remove_keys(item, keys) if isinstance(item, dict) else item
-                for item in value
-            ]
-    return data
-
-
-def dicts_equal(d1, d2, remove_keys=[]) -> bool:
-    """
-    Compare two dictionaries recursively, return True if they are equal, False otherwise.
-
-    d1, d2: dictionaries to compare
-    remove_keys: list of keys to remove from the dictionaries before comparison
-
-    Lists with different order but same content are considered equal.
-    Values with integers and floats are compared as strings, hence the type is ignored.
-
-    d1 will be mutated by this function, so make sure to pass a copy if you want to keep the original.
-    d2 will not be mutated by this function.
-    """
-
-    def _process_lists(_d1, _d2):
-        def _sort_key(element):
-            if isinstance(element, dict):
-                return (3, str(element))  # Assign a higher priority to dicts
-            elif isinstance(element, list):
-                return (2, str(element))  # Assign a medium priority to lists
-            elif isinstance(element, str):
-                return (1, element)  # Assign a medium-low priority to strings
-            elif isinstance(element, (int, float)):
-                return (0, element)  # Assign a lower priority to numbers
-            else:
-                return (4, str(element))  # Catch-all for other types
-
-        if len(_d1) != len(_d2):
-            return False
-
-        # sort lists by type and value
-        _l1 = sorted(_d1, key=_sort_key)
-        _l2 = sorted(_d2, key=_sort_key)
-
-        for i, item in enumerate(_l1):
-            if isinstance(item, dict):
-                if not dicts_equal(item, _l2[i]):
-                    return False
-            elif isinstance(item, list):
-                if not _process_lists(item, _l2[i]):
-                    return False
-            else:
-                if str(item) not in [
-                    str(entry) for entry in _l2 if not isinstance(entry, (list, dict))
-                ]:
-                    return False
-        return True
-
-    _d1 = d1  # d1 will be mutated by this function
-    _d2 = deepcopy(d2)
 
-    if remove_keys:
-        _d1 = recurse_remove_keys(_d1, remove_keys)
-        _d2 = recurse_remove_keys(_d2, remove_keys)
+def datastore_target(uri: str) -> tuple:
+    """Split a RESTCONF resource `uri` into the datastore root and the target path relative to it, e.g. '/api/data/openconfig-vlan:vlans' into ('/api/data', '/openconfig-vlan:vlans')."""
+    path = uri.split("?", 1)[0].rstrip("/")
+    index = path.find("/data/")
+    if index == -1:
+        return path, "/"
+    return path[: index + len("/data")], path[index + len("/data") :]
 
-    # simplest case: if the dictionaries are the same object, they are the same
-    if _d1 == _d2:
-        return True
 
-    # If the types are different, the dictionaries are different
-    if type(_d1) != type(_d2):
-        return False
+def yang_patch_edit(edit_id, operation: str, target: str, value=None) -> dict:
+    """Returns a YANG-PATCH edit entry. `value` is ignored for the 'delete' and 'remove' operations."""
+    edit = {"edit-id": str(edit_id), "operation": operation, "target": target}
+    if operation not in ["delete", "remove"]:
+        edit.update({"value": value})
+    return edit
 
-    # If the dictionaries are not the same length, they are different
-    if len(_d1) != len(_d2):
-        return False
 
-    # If the dictionaries are empty, they are the same
-    if len(_d1) == 0:
+def yang_patch_ok(api_response: dict) -> bool:
+    """Returns True if a YANG-PATCH `api_response` reports success for all edits."""
+    if api_response.get("code", 0) not in [200, 204]:
         return False
-
-    # If the dictionaries are not empty, compare the keys
-    if set(_d1) != set(_d2):
+    contents = api_response.get("contents") or {}
+    status = contents.get("ietf-yang-patch:yang-patch-status", {})
+    if status.get("errors"):
         return False
-
-    # If the keys are the same, compare the values
-    for key in _d1.keys():
-        if isinstance(_d1[key], dict):
-            if not dicts_equal(_d1[key], _d2[key]):
-                return False
-        elif isinstance(_d1[key], list):
-            if not _process_lists(_d1[key], _d2[key]):
-                return False
-        else:
-            if str(_d1[key]) != str(_d2[key]):
-                return False
-
-    return True
-
-
-def format_bool_values(d):
-    """Returns a copy of dict `d` with all boolean values (True, False) properly formatted. It converts str values of 'true', 'True', 'false', 'False' to the actual boolean python representation."""
-
-    def _list_format_bool_values(l: list):
-        _l = []
-        for i in l:
-            if isinstance(i, dict):
-                _l.append(_dict_format_bool_values(i))
-            elif isinstance(i, list):
-                _l.append(_list_format_bool_values(i))
-            elif isinstance(i, str):
-                if i.lower() == "true":
-                    _l.append(True)
-                elif i.lower() == "false":
-                    _l.append(False)
-                else:
-                    _l.append(i)
-            else:
-                _l.append(i)
-        return _l
-
-    def _dict_format_bool_values(d):
-        try:
-            for k, v in d.items():
-                if isinstance(v, dict):
-                    _dict_format_bool_values(v)
-                elif isinstance(v, list):
-                    d[k] = _list_format_bool_values(v)
-                elif isinstance(v, str):
-                    if v.lower() == "true":
-                        d[k] = True
-                    elif v.lower() == "false":
-                        d[k] = False
-                    else:
-                        d[k] = v
-                else:
-                    d[k] = v
-        except AttributeError:
-            pass
-        return d
-
-    import copy
-
-    _d = copy.deepcopy(d)
-
-    return _dict_format_bool_values(_d)
-
-
-def number_values_to_string(d):
-    """Returns a copy of dict `d` with all numeric values (int, float) converted strings (str)."""
-
-    def _list_number_elements_to_string(l: list):
-        _l = []
-        for i in l:
-            if isinstance(i, dict):
-                _l.append(_dict_number_values_to_string(i))
-            elif isinstance(i, list):
-                _l.append(_list_number_elements_to_string(i))
-            elif isinstance(i, (int, float)):
-                _l.append(str(i))
-            else:
-                _l.append(i)
-        return _l
-
-    def _dict_number_values_to_string(d):
-        try:
-            for k, v in d.items():
-                if isinstance(v, dict):
-                    _dict_number_values_to_string(v)
-                elif isinstance(v, list):
-                    d[k] = _list_number_elements_to_string(v)
-                elif isinstance(v, (int, float)):
-                    d[k] = str(v)
-                else:
-                    d[k] = v
-        except AttributeError:
-            pass
-        return d
-
-    import copy
-
-    _d = copy.deepcopy(d)
-
-    return _dict_number_values_to_string(_d)
-
-
-def changes_add_deep_diff(changes):
-    """Updates `changes` dict with `diff` if deepdiff dependency is installed. The diff will be created based on 'before' and 'after' keys of `changes`."""
-    diff = None
-    if changes:
-        try:
-            from deepdiff import DeepDiff
-
-            diff = DeepDiff(
-                changes.get("before", {}),
-                changes.get("after", {}),
-                ignore_order=True,
-                verbose_level=2,
-            ).to_dict()
-        except ImportError:
-            pass
-    if diff:
-        changes.update({"diff": diff})
+    return not any(
+        edit.get("errors") for edit in status.get("edit-status", {}).get("edit", [])
+    )
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: f5os_config_snapshot
+short_description: Take a snapshot of the F5OS RESTCONF datastore for tasks using snapshot.
+description:
+  - Fetches the whole configuration datastore with a single GET request of the datastore root (e.g. '/api/data?content=config') and stores it gzip compressed on the ansible controller.
+  - Tasks of f5os_restconf_config with snapshot enabled compare against the snapshot instead of reading every resource from the API. Without this module the first of these tasks takes the snapshot.
+author:
+  - Simon Kowallik (@simonkowallik)
+version_added: "1.4.0"
+options:
+  api_prefix:
+    description: The path prefix of the F5OS RESTCONF API, '/api' for the default HTTPS port 443 and '/restconf' for port 8888. Derived from the port of the httpapi connection (ansible_httpapi_port) if not set.
+    required: False
+    type: str
+  state:
+    description:
+      - present - take a snapshot if there is none for the device, or if refresh is set.
+      - absent - drop the snapshot, tasks with snapshot enabled take a new one.
+    required: False
+    type: str
+    default: "present"
+    choices:
+        - "present"
+        - "absent"
+  refresh:
+    description: Take a new snapshot even if there is one, e.g. after the configuration was changed outside of this collection.
+    required: False
+    type: bool
+    default: False
+  content:
+    description: The RESTCONF 'content' query parameter of the snapshot, it must match the content parameter of the tasks using the snapshot.
+    required: False
+    type: str
+    default: "config"
+    choices:
+        - "config"
+        - "nonconfig"
+        - "all"
+  with_defaults:
+    description: The RESTCONF 'with-defaults' query parameter of the snapshot, it must match the with_defaults parameter of the tasks using the snapshot.
+    required: False
+    type: str
+    choices:
+        - "report-all"
+        - "trim"
+        - "explicit"
+        - "report-all-tagged"
+  conditional_get:
+    description: Send the GET request as conditional request with the validators (ETag, Last-Modified) of a previous response, see conditional_get of f5os_restconf_get.
+    required: False
+    type: bool
+    default: False
+  conditional_get_max_entries:
+    description: The maximum number of responses kept in the validator cache of the device, see conditional_get_max_entries of f5os_restconf_get.
+    required: False
+    type: int
+    default: 4096
+  rate_limit:
+    description: Limit the API requests to the device to this many requests per second across forks, see rate_limit of f5os_restconf_config. 0 disables the limit.
+    required: False
+    type: float
+    default: 0
+  retries:
+    description: Retry idempotent requests this many times on 429 and 503 responses and connection errors, see retries of f5os_restconf_config.
+    required: False
+    type: int
+    default: 0
+attributes:
+    check_mode:
+        description: The module supports check mode.
+        support: full
+    diff_mode:
+        description: The module does not supports diff mode.
+        support: none
+notes:
+    - This module requires the f5networks.f5os collection to be installed on the ansible controller.
+    - This module uses the httpapi of the f5networks.f5os collection.
+    - The snapshot is scoped to the persistent connection of the device, which is unique per playbook run, and valid for one hour. It is removed by the first task of a later playbook run once the connection is closed.
+"""
+
+EXAMPLES = r"""
+- name: "Take a snapshot of the configuration, the following tasks only contact the device for writes"
+  f5_ps_ansible.f5os.f5os_config_snapshot:
+    api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+
+- name: "Configure VLANs"
+  vars:
+    f5os_api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+  f5_ps_ansible.f5os.f5os_restconf_config:
+    uri: "{{ f5os_api_prefix }}/data/openconfig-vlan:vlans/vlan={{ item.id }}"
+    config:
+      openconfig-vlan:vlan:
+        - vlan-id: "{{ item.id }}"
+          config:
+            vlan-id: "{{ item.id }}"
+            name: "{{ item.name }}"
+    snapshot: true
+  loop: "{{ vlans }}"
+
+- name: "Drop the snapshot"
+  f5_ps_ansible.f5os.f5os_config_snapshot:
+    api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+    state: absent
+"""
+
+RETURN = r"""
+uri:
+    description: The URI of the snapshot, including the query parameters.
+    returned: always
+    type: str
+taken:
+    description: True if the snapshot was fetched from the API, False if an existing snapshot is used.
+    returned: when state is present
+    type: bool
+size:
+    description: The size of the snapshot in bytes, uncompressed.
+    returned: when state is present
+    type: int
+"""
+
+import json
+
+from ansible.module_utils._text import to_text
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.connection import ConnectionError
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.subtree import (
+    snapshot,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.utils import (
+    APIClient,
+    add_query,
+    default_api_prefix,
+    query_params,
+)
+
+ARGUMENT_SPEC = dict(
+    api_prefix=dict(required=False, type="str"),
+    state=dict(
+        required=False, type="str", default="present", choices=["present", "absent"]
+    ),
+    refresh=dict(required=False, type="bool", default=False),
+    content=dict(
+        required=False,
+        type="str",
+        default="config",
+        choices=["config", "nonconfig", "all"],
+    ),
+    with_defaults=dict(
+        required=False,
+        type="str",
+        choices=["report-all", "trim", "explicit", "report-all-tagged"],
+    ),
+    conditional_get=dict(required=False, type="bool", default=False),
+    conditional_get_max_entries=dict(required=False, type="int", default=4096),
+    rate_limit=dict(required=False, type="float", default=0),
+    retries=dict(required=False, type="int", default=0),
+)
+
+ARGUMENT_SPEC_OPTIONS = dict()
+
+
+def run_module(module) -> dict:
+    """Returns the result of the module execution, `module` is an AnsibleModule or an object providing the same attributes."""
+    api_client = APIClient(module, snapshot=True)
+    api_prefix = module.params["api_prefix"] or default_api_prefix(
+        api_client.connection
+    )
+    datastore = f"{api_prefix.rstrip('/')}/data"
+    params = query_params(
+        content=module.params["content"], with_defaults=module.params["with_defaults"]
+    )
+    result = {"changed": False, "failed": False, "uri": add_query(datastore, params)}
+
+    if module.params["state"] == "absent":
+        api_client.snapshots.invalidate(datastore)
+        return result
+
+    api_response = None
+    if not module.params["refresh"]:
+        api_response, _ = api_client.snapshots.get_partial(result["uri"])
+    taken = api_response is None
+    if taken:
+        try:
+            api_response = snapshot(api_client, datastore, params=params, refresh=True)
+        except ConnectionError as exc:
+            result.update({"failed": True, "msg": to_text(exc)})
+            return result
+
+    if api_response.get("code", 0) != 200:
+        result.update(
+            {
+                "failed": True,
+                "msg": "Unsupported or unknown API response code.",
+                "api_response": api_response,
+            }
+        )
+        return result
+
+    result.update(
+        {
+            "taken": taken,
+            "size": len(
+                json.dumps(api_response.get("contents"), separators=(",", ":"))
+            ),
+        }
+    )
+    return result
+
+
+def main():
+    """entry point for module execution"""
+    module = AnsibleModule(
+        argument_spec=ARGUMENT_SPEC,
+        supports_check_mode=True,
+        **ARGUMENT_SPEC_OPTIONS,
+    )
+
+    result = run_module(module)
+    if result.get("msg"):
+        module.fail_json(**result)
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: f5os_facts
+short_description: Gather facts from the F5OS RESTCONF API.
+description:
+  - Gathers configuration and state of F5OS subsystems from the F5OS RESTCONF API and returns them as ansible_facts.
+  - The selected subsets are fetched one after the other within a single module execution. Subsequent tasks can use the facts instead of reading the same resources again.
+author:
+  - Simon Kowallik (@simonkowallik)
+version_added: "1.4.0"
+options:
+  gather_subset:
+    description:
+      - The subsets of facts to gather. Each subset is stored as 'f5os_<subset>' in ansible_facts, e.g. 'f5os_vlans'.
+      - Use 'all' to gather all subsets. A subset prefixed with '!' is excluded, e.g. '!interfaces'.
+      - version - the F5OS version (openconfig-system:system/f5os-system-version:version)
+      - clock - the system clock (openconfig-system:system/clock)
+      - interfaces - all interfaces including LAG interfaces (openconfig-interfaces:interfaces)
+      - lags - the LACP configuration and state of the LAGs (openconfig-lacp:lacp)
+      - vlans - all VLANs (openconfig-vlan:vlans)
+      - tenants - all tenants (f5-tenants:tenants)
+      - dns - the DNS configuration (openconfig-system:system/dns)
+      - ntp - the NTP configuration (openconfig-system:system/ntp)
+      - tls - the TLS certificate, key and CA bundles of the API (openconfig-system:system/aaa/f5-openconfig-aaa-tls:tls)
+    required: False
+    type: list
+    elements: str
+    default: ["all"]
+  api_prefix:
+    description: The path prefix of the F5OS RESTCONF API, '/api' for the default HTTPS port 443 and '/restconf' for port 8888. Derived from the port of the httpapi connection (ansible_httpapi_port) if not set.
+    required: False
+    type: str
+  cache:
+    description:
+      - Store the responses in the response cache of the device, see the cache option of f5os_restconf_get. Subsequent f5os_restconf_get tasks with cache enabled are served from the cache.
+    required: False
+    type: bool
+    default: False
+  cache_ttl:
+    description: The time in seconds a cached response is valid.
+    required: False
+    type: int
+    default: 300
+  conditional_get:
+    description: Send GET requests as conditional requests with the validators (ETag, Last-Modified) of a previous response, see conditional_get of f5os_restconf_get.
+    required: False
+    type: bool
+    default: False
+  conditional_get_max_entries:
+    description: The maximum number of responses kept in the validator cache of the device, see conditional_get_max_entries of f5os_restconf_get.
+    required: False
+    type: int
+    default: 4096
+attributes:
+    check_mode:
+        description: The module supports check mode.
+        support: full
+    diff_mode:
+        description: The module does not supports diff mode.
+        support: none
+    facts:
+        description: The module returns ansible_facts.
+        support: full
+notes:
+    - This module requires the f5networks.f5os collection to be installed on the ansible controller.
+    - This module uses the httpapi of the f5networks.f5os collection.
+    - Subsets which are not available on the F5OS platform (the API responds with 404) are returned as empty dict.
+"""
+
+EXAMPLES = r"""
+- name: "Gather all F5OS facts, the API prefix is derived from the port of the connection"
+  f5_ps_ansible.f5os.f5os_facts:
+
+- name: "Display the VLANs"
+  ansible.builtin.debug:
+    var: ansible_facts.f5os_vlans
+
+- name: "Gather all facts except interfaces and tenants"
+  f5_ps_ansible.f5os.f5os_facts:
+    api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+    gather_subset:
+      - all
+      - "!interfaces"
+      - "!tenants"
+
+- name: "Gather the version and DNS configuration only"
+  f5_ps_ansible.f5os.f5os_facts:
+    api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+    gather_subset:
+      - version
+      - dns
+"""
+
+RETURN = r"""
+ansible_facts:
+    description: The gathered facts, 'f5os_<subset>' contains the API response contents of the subset as returned by the API, including the state, 'f5os_gather_subset' the list of gathered subsets.
+    returned: always
+    type: dict
+api_responses:
+    description: The API response code of each gathered subset.
+    returned: always
+    type: dict
+"""
+
+from ansible.module_utils._text import to_text
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.connection import ConnectionError
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.utils import (
+    APIClient,
+    default_api_prefix,
+)
+
+FACT_SUBSETS = {
+    "version": "openconfig-system:system/f5os-system-version:version",
+    "clock": "openconfig-system:system/clock",
+    "interfaces": "openconfig-interfaces:interfaces",
+    "lags": "openconfig-lacp:lacp",
+    "vlans": "openconfig-vlan:vlans",
+    "tenants": "f5-tenants:tenants",
+    "dns": "openconfig-system:system/dns",
+    "ntp": "openconfig-system:system/ntp",
+    "tls": "openconfig-system:system/aaa/f5-openconfig-aaa-tls:tls",
+}
+
+ARGUMENT_SPEC = dict(
+    gather_subset=dict(required=False, type="list", elements="str", default=["all"]),
+    api_prefix=dict(required=False, type="str"),
+    cache=dict(required=False, type="bool", default=False),
+    cache_ttl=dict(required=False, type="int", default=300),
+    conditional_get=dict(required=False, type="bool", default=False),
+    conditional_get_max_entries=dict(required=False, type="int", default=4096),
+)
+
+ARGUMENT_SPEC_OPTIONS = dict()
+
+
+def select_subsets(gather_subset: list) -> list:
+    """Returns the subsets selected by `gather_subset`, raises ValueError for unknown subsets."""
+    include = set()
+    exclude = set()
+    for subset in gather_subset:
+        name = subset[1:] if subset.startswith("!") else subset
+        if name != "all" and name not in FACT_SUBSETS:
+            raise ValueError(
+                f"Unknown subset '{name}', choose from: all, {', '.join(FACT_SUBSETS)}."
+            )
+        names = set(FACT_SUBSETS) if name == "all" else {name}
+        if subset.startswith("!"):
+            exclude.update(names)
+        else:
+            include.update(names)
+    if not include and exclude:
+        include = set(FACT_SUBSETS)
+    return [subset for subset in FACT_SUBSETS if subset in include - exclude]
+
+
+def run_module(module) -> dict:
+    """Returns the result of the module execution, `module` is an AnsibleModule or an object providing the same attributes."""
+    result = {"changed": False, "failed": False}
+
+    try:
+        subsets = select_subsets(module.params["gather_subset"])
+    except ValueError as exc:
+        result.update({"failed": True, "msg": to_text(exc)})
+        return result
+
+    api_client = APIClient(module)
+    api_prefix = (
+        module.params["api_prefix"] or default_api_prefix(api_client.connection)
+    ).rstrip("/")
+
+    # the requests of the subsets are sent one after the other, the httpapi connection does not send them concurrently
+    api_responses = {}
+    try:
+        for subset in subsets:
+            api_responses[subset] = api_client.get(
+                uri=f"{api_prefix}/data/{FACT_SUBSETS[subset]}"
+            )
+    except ConnectionError as exc:
+        result.update({"failed": True, "msg": to_text(exc)})
+        return result
+
+    facts = {"f5os_gather_subset": subsets}
+    failed_subsets = []
+    for subset, api_response in api_responses.items():
+        code = api_response.get("code", 0)
+        if code in (200, 204, 404):
+            facts[f"f5os_{subset}"] = api_response.get("contents") or {}
+        else:
+            failed_subsets.append(subset)
+
+    result.update(
+        {
+            "ansible_facts": facts,
+            "api_responses": {s: r.get("code", 0) for s, r in api_responses.items()},
+        }
+    )
+    if failed_subsets:
+        result.update(
+            {
+                "failed": True,
+                "msg": f"Unsupported or unknown API response code for subsets: {', '.join(failed_subsets)}.",
+            }
+        )
+    return result
+
+
+def main():
+    """entry point for module execution"""
+    module = AnsibleModule(
+        argument_spec=ARGUMENT_SPEC,
+        supports_check_mode=True,
+        **ARGUMENT_SPEC_OPTIONS,
+    )
+
+    result = run_module(module)
+    if result.get("msg"):
+        module.fail_json(**result)
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
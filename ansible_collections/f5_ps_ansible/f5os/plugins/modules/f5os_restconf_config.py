@@ -19,8 +19,8 @@ author:
 version_added: "1.0.0"
 options:
   uri:
-    description: The URI of the resource to configure.
-    required: True
+    description: The URI of the resource to configure. Mutually exclusive with items, one of both is required.
+    required: False
     type: str
   method:
     description: The HTTP method to configure the resource.
@@ -43,7 +43,10 @@ options:
     required: False
     type: dict
   keys_ignore:
-    description: A list of keys to ignore when comparing the current and desired configuration. This is useful when only a subset of the configuration is desired to be compared. The keys are ignored for the comparison only, not for the actual configuration. The keys will be ignored recursively in the desired configuration and current configuration.
+    description:
+      - A list of keys to ignore when comparing the current and desired configuration. This is useful when only a subset of the configuration is desired to be compared. The keys are ignored for the comparison only, not for the actual configuration.
+      - A key name without '/', e.g. 'passphrase' or 'f5-*:state', is ignored recursively in the desired configuration and current configuration.
+      - A path, e.g. '/openconfig-vlan:vlans/vlan/*/members', only ignores the matching keys. Paths start at the top level of the configuration, list entries are matched by their index, usually with '*'. '*' matches any single key or list index and can be combined with other characters (e.g. 'f5-*:state'), '**' matches any number of keys, e.g. '**/passphrase'.
     required: False
     type: list
     elements: str
@@ -51,11 +54,164 @@ options:
     description: A JMESPath query to filter the current configuration before it is compared to the desired configuration.
     required: False
     type: str
+  items:
+    description:
+      - A list of resources to configure within a single module execution. Each item is processed like a separate task using the same API connection, which is much faster than looping over the module with with_items or loop.
+      - Items are processed in order, a failed item does not stop the processing of the remaining items.
+      - The options method, state, keys_ignore and config_query apply to all items, an item setting one of them overrides it. All other options, e.g. list_keys or content, apply to all items alike.
+      - Mutually exclusive with uri.
+    required: False
+    type: list
+    elements: dict
+    suboptions:
+      uri:
+        description: The URI of the resource to configure.
+        required: True
+        type: str
+      config:
+        description: The desired configuration of the resource, see config.
+        required: False
+        type: dict
+      method:
+        description: The HTTP method to configure the resource, defaults to method.
+        required: False
+        type: str
+        choices:
+            - "PUT"
+            - "PATCH"
+      state:
+        description: The desired state of the resource, defaults to state.
+        required: False
+        type: str
+        choices:
+            - "present"
+            - "absent"
+      keys_ignore:
+        description: A list of keys to ignore when comparing the current and desired configuration, defaults to keys_ignore. An empty list ignores no keys.
+        required: False
+        type: list
+        elements: str
+      config_query:
+        description: A JMESPath query to filter the current configuration, defaults to config_query. An empty string does not filter the configuration.
+        required: False
+        type: str
+  list_keys:
+    description:
+      - The key names of YANG lists by list name, for example 'server' with the key names '["address"]'. Entries of keyed lists are matched by their keys to report precisely which entries were added, removed or changed in changes.list_changes and changes.diff.
+      - With prefetch_uri or snapshot, list entries are looked up by their keys in the prefetched content. Entries of lists with unknown keys are read from the API.
+      - Keys of common lists are built-in, like 'vlan' (vlan-id), 'interface' (name), 'server' (address) and 'user' (username). The list names are matched with and without module prefix.
+    required: False
+    type: dict
+    default: {}
+  yang_patch:
+    description:
+      - Send all changes as edits of a single YANG-PATCH (RFC 8072) request to the datastore root instead of one PUT, PATCH or DELETE request per resource.
+      - PUT is sent as a 'replace', PATCH as a 'merge' and state 'absent' as a 'delete' edit.
+      - The YANG-PATCH is applied atomically, either all edits succeed or none is applied. This is most useful together with items.
+    required: False
+    type: bool
+    default: False
+  content:
+    description:
+      - The RESTCONF 'content' query parameter, selects configuration ('config'), state ('nonconfig') or all ('all') data of the resource.
+      - Defaults to 'config' as state data is not compared. If the API rejects the query parameters the resource is read again without them.
+    required: False
+    type: str
+    default: "config"
+    choices:
+        - "config"
+        - "nonconfig"
+        - "all"
+  depth:
+    description: The RESTCONF 'depth' query parameter, limits the number of nest levels returned. Either a positive integer or 'unbounded'.
+    required: False
+    type: str
+  fields:
+    description: The RESTCONF 'fields' query parameter, selects the data nodes to return, e.g. 'config(name;enabled)'.
+    required: False
+    type: str
+  with_defaults:
+    description: The RESTCONF 'with-defaults' query parameter, controls how default values are reported.
+    required: False
+    type: str
+    choices:
+        - "report-all"
+        - "trim"
+        - "explicit"
+        - "report-all-tagged"
+  prefetch_uri:
+    description:
+      - The URI of a parent resource (container or list entry) of the resource(s) to read. It is fetched once and reads of its child resources are answered from it, instead of sending a GET request per resource.
+      - Together with cache, the parent resource is fetched once for all tasks using the same prefetch_uri. Written child resources are read from the API again.
+    required: False
+    type: str
+  cache:
+    description:
+      - Cache GET responses on the ansible controller and share them across tasks for the same device. Cached responses are served without sending a request to the API.
+      - Cached responses of a resource and its parents and children are dropped whenever this collection writes to the resource, regardless of this option.
+      - The cache is scoped to the persistent connection of the device, which is unique per playbook run. It is stored in a directory only accessible by the user running ansible, which is removed by the first task of a later playbook run once the connection is closed.
+    required: False
+    type: bool
+    default: False
+  cache_ttl:
+    description: The time in seconds a cached response is valid.
+    required: False
+    type: int
+    default: 300
+  snapshot:
+    description:
+      - Compare against a snapshot of the whole datastore instead of reading every resource from the API. The snapshot is fetched with a single GET request of the datastore root (e.g. '/api/data') using the query parameters of this task (content, with_defaults) and stored gzip compressed on the ansible controller.
+      - All tasks with snapshot enabled for the same device and query parameters share the snapshot, the device is only contacted for writes. Resources written since the snapshot was taken, by any task of this collection, are read from the API again.
+      - The snapshot is scoped to the persistent connection of the device, which is unique per playbook run, and valid for one hour. Like the cache it is removed once the connection is closed. Use f5os_config_snapshot to take or refresh it explicitly.
+      - The query parameters depth and fields are not supported, resources are read from the API when they are set.
+    required: False
+    type: bool
+    default: False
+  conditional_get:
+    description: Send GET requests as conditional requests with the validators (ETag, Last-Modified) of a previous response, see conditional_get of f5os_restconf_get.
+    required: False
+    type: bool
+    default: False
+  conditional_get_max_entries:
+    description: The maximum number of responses kept in the validator cache of the device, see conditional_get_max_entries of f5os_restconf_get.
+    required: False
+    type: int
+    default: 4096
+  fingerprint:
+    description:
+      - Remember the fingerprint (SHA-256) of the desired configuration last applied to or found on a resource, together with the validators (ETag, Last-Modified) of the resource. The fingerprints are stored per device on the ansible controller and kept across playbook runs.
+      - When the same desired configuration is presented again, a conditional GET request is sent. If the API responds with 304 Not Modified, the resource did not change and the task reports no change without reading and comparing the configuration. Otherwise the configuration is compared as usual.
+      - Use it for repeated runs enforcing the same configuration, e.g. scheduled drift enforcement. Only applies to state present, and requires that the API and the httpapi return the validators.
+    required: False
+    type: bool
+    default: False
   secrets:
     description: A list of secrets to redact from the output. Any value in this list will be redacted with 'VALUE_SPECIFIED_IN_NO_LOG_PARAMETER'.
     required: False
     type: list
     elements: str
+  timings:
+    description:
+      - Return the 'timings' block with the wall time of every API call (method, uri, status, response bytes, source) and of the processing phases of the module, e.g. read, normalize, compare, diff and write.
+      - Use it to find out which part of a slow task takes the time. The callback plugin f5_ps_ansible.f5os.f5os_timings aggregates the timings of all tasks of a playbook run, use module_defaults for the action group 'group/f5_ps_ansible.f5os.timings' to enable timings for all tasks.
+    required: False
+    type: bool
+    default: False
+  rate_limit:
+    description:
+      - Limit the API requests to the device to this many requests per second, e.g. when many forks or delegated tasks use the same device.
+      - The limit is a token bucket in a lock file on the ansible controller, it is shared by all tasks and forks using the same device with the same rate_limit. 0 disables the limit.
+      - Use module_defaults for the action group 'group/f5_ps_ansible.f5os.throttling' to set rate_limit and retries for all tasks.
+    required: False
+    type: float
+    default: 0
+  retries:
+    description:
+      - Retry idempotent requests (GET, PUT and DELETE) this many times if the API responds with 429 Too Many Requests or 503 Service Unavailable or the connection fails.
+      - Retries wait with exponential backoff and jitter (0.5s, 1s, 2s, ... up to 30s) or the time of the Retry-After header of the response. Waits are reported in the throttling block of timings.
+    required: False
+    type: int
+    default: 0
 attributes:
     check_mode:
         description: The module supports check mode and will report what changes would have been made.
@@ -66,8 +222,8 @@ attributes:
 notes:
     - This module requires the f5networks.f5os collection to be installed on the ansible controller.
     - This module uses the httpapi of the f5networks.f5os collection.
+    - The module is executed in the ansible worker process on the controller by its action plugin, which saves the module transfer and execution overhead per task. Async tasks and connections other than httpapi execute the module the regular way.
     - When using config_query jmespath module is required.
-    - For better diff support, deepdiff module is recommended.
 """
 
 EXAMPLES = r"""
@@ -98,6 +254,78 @@ EXAMPLES = r"""
       id: 30
       state: absent  # Remove VLAN 30 from interface 7.0
 
+- name: 'Create a VLAN and add it to a LAG using a single task'
+  vars:
+    f5os_api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+  f5_ps_ansible.f5os.f5os_restconf_config:
+    # all items are processed within one module execution
+    items:
+      - uri: "{{ f5os_api_prefix }}/data/openconfig-vlan:vlans/vlan=20"
+        config:
+          openconfig-vlan:vlan:
+            - vlan-id: 20
+              config:
+                vlan-id: 20
+                name: vlan20
+        keys_ignore:
+          - members
+      - uri: "{{ f5os_api_prefix }}/data/openconfig-interfaces:interfaces/interface=my-lag/openconfig-if-aggregate:aggregation/openconfig-vlan:switched-vlan/config/trunk-vlans=20"
+        config:
+          openconfig-vlan:trunk-vlans: [20]
+      - uri: "{{ f5os_api_prefix }}/data/openconfig-interfaces:interfaces/interface=my-lag/openconfig-if-aggregate:aggregation/openconfig-vlan:switched-vlan/config/trunk-vlans=30"
+        state: absent
+
+- name: 'Create VLANs atomically with a single YANG-PATCH request'
+  vars:
+    f5os_api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+  f5_ps_ansible.f5os.f5os_restconf_config:
+    yang_patch: true
+    items:
+      - uri: "{{ f5os_api_prefix }}/data/openconfig-vlan:vlans/vlan=40"
+        config:
+          openconfig-vlan:vlan:
+            - vlan-id: 40
+              config:
+                vlan-id: 40
+                name: vlan40
+        keys_ignore:
+          - members
+      - uri: "{{ f5os_api_prefix }}/data/openconfig-vlan:vlans/vlan=50"
+        config:
+          openconfig-vlan:vlan:
+            - vlan-id: 50
+              config:
+                vlan-id: 50
+                name: vlan50
+        keys_ignore:
+          - members
+
+- name: 'Configure trunked VLANs of many LAGs reading all interfaces only once'
+  vars:
+    f5os_api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+  f5_ps_ansible.f5os.f5os_restconf_config:
+    uri: "{{ f5os_api_prefix }}/data/openconfig-interfaces:interfaces/interface={{ item.lag }}/openconfig-if-aggregate:aggregation/openconfig-vlan:switched-vlan/config/trunk-vlans={{ item.id }}"
+    config:
+      openconfig-vlan:trunk-vlans: ['{{ item.id }}']
+    prefetch_uri: "{{ f5os_api_prefix }}/data/openconfig-interfaces:interfaces"
+    cache: true
+  with_items:
+    - lag: lag1
+      id: 20
+    - lag: lag2
+      id: 20
+    - lag: lag2
+      id: 30
+
+- name: 'Enforce the configuration of many resources, reading the datastore only once for all tasks'
+  vars:
+    f5os_api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+  f5_ps_ansible.f5os.f5os_restconf_config:
+    uri: "{{ f5os_api_prefix }}/data/{{ item.path }}"
+    config: "{{ item.config }}"
+    snapshot: true
+  loop: "{{ f5os_desired_config }}"
+
 - name: 'Partially configure LLDP'
   vars:
     f5os_api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
@@ -120,6 +348,22 @@ EXAMPLES = r"""
       - system-description
       - system-name
 
+- name: 'Ignore the members of all VLANs, but not other keys named members'
+  vars:
+    f5os_api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+  f5_ps_ansible.f5os.f5os_restconf_config:
+    uri: "{{ f5os_api_prefix }}/data/openconfig-vlan:vlans"
+    method: PATCH
+    config:
+      openconfig-vlan:vlans:
+        vlan:
+          - vlan-id: 20
+            config:
+              vlan-id: 20
+              name: vlan20
+    keys_ignore:
+      - /openconfig-vlan:vlans/vlan/*/members
+
 - name: 'Using PATCH on a group of resources (list) with additional config endpoints'
   vars:
     f5os_api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
@@ -184,7 +428,7 @@ desired_config_state:
     returned: always
     type: dict
 changes:
-    description: The changes made to the resource if any.
+    description: The changes made to the resource if any. 'list_changes' contains the added, removed and changed entries of every list that differs, by path of the list.
     returned: always
     type: dict
 keys_ignore:
@@ -196,49 +440,72 @@ config_query:
     description: The JMESPath query used to filter the current configuration before it is compared to the desired configuration.
     returned: when config_query is set
     type: str
+fingerprint:
+    description: Set to 'unchanged' if the resource did not change since the same desired configuration was last applied or found, see the fingerprint option.
+    returned: when the fingerprint matched
+    type: str
+results:
+    description: The result of each item when items is used. Every entry contains the items[].uri and the same keys as a single resource result.
+    returned: when items is set
+    type: list
+    elements: dict
+timings:
+    description:
+      - The timings of the module execution, when timings is enabled. 'total_ms' is the wall time of the module, 'api_calls' contains an entry per API call (method, uri, status, bytes, ms and source) and 'phases' the accumulated time (ms) and count of each processing phase.
+      - The source of an API call is 'api' for requests sent to the API, 'prefetch' or 'cache' for responses answered locally. 'bytes' is the size of the JSON serialized response contents.
+      - The 'throttling' block counts the requests delayed by rate_limit and the retries with their accumulated wait (rate_limited, rate_limit_ms, retries, retry_ms).
+    returned: when timings is enabled
+    type: dict
 """
 
-from copy import deepcopy
-
 from ansible.module_utils._text import to_text
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.connection import ConnectionError
 
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.diff import (
+    changes_add_deep_diff,
+    changes_add_list_changes,
+    dicts_equal,
+)
 from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.json_query import (
     json_query,
 )
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.normalize import (
+    normalize,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.subtree import (
+    prefetch,
+    snapshot,
+)
 from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.utils import (
     APIClient,
-    changes_add_deep_diff,
-    dicts_equal,
-    format_bool_values,
-    number_values_to_string,
-    remove_state_property,
+    add_query,
+    config_fingerprint,
+    datastore_target,
+    module_query_params,
+    response_validators,
+    yang_patch_edit,
+    yang_patch_ok,
 )
 
 
-def main():
-    """entry point for module execution"""
-    argument_spec = dict(
-        uri=dict(required=True, type="str"),
-        config=dict(required=False, type="dict", default=None),
-        method=dict(
-            required=False, type="str", default="PUT", choices=["PUT", "PATCH"]
-        ),
-        state=dict(
-            required=False, type="str", default="present", choices=["present", "absent"]
-        ),
-        keys_ignore=dict(required=False, type="list", default=[]),
-        config_query=dict(required=False, type="str", default=""),
-        secrets=dict(required=False, type="list", default=[], no_log=True),
-    )
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+def item_option(module, item, option):
+    """Returns `option` of `item`, the module parameter of the same name if the item does not set it."""
+    value = item.get(option)
+    return module.params[option] if value is None else value
+
+
+def process_item(module, api_client, item, edits=None):
+    """process a single uri/config item and return its result. If `edits` is a list, changes are queued as YANG-PATCH edits instead of being applied."""
+    uri = item["uri"]
+    method = item_option(module, item, "method")
+    param_keys_ignore = item_option(module, item, "keys_ignore") or []
+    param_config_query = item_option(module, item, "config_query") or ""
 
     result = {"changed": False, "failed": False, "keys_ignore": []}
     changes = {}  # default changes
-
-    param_keys_ignore = module.params["keys_ignore"]
-    param_config_query = module.params["config_query"]
+    memo = {}  # canonical representations, shared by the comparison and the diffs
+    api_response = None
 
     if param_keys_ignore:
         result.update({"keys_ignore": param_keys_ignore})
@@ -246,29 +513,76 @@ def main():
     if param_config_query:
         result.update({"config_query": param_config_query})
 
-    desired_state = module.params["state"]
+    desired_state = item_option(module, item, "state")
     current_state = "absent"
-    desired_config = number_values_to_string(module.params["config"])
-    desired_config = format_bool_values(desired_config)
+    with api_client.timings.phase("normalize"):
+        desired_config = normalize(item.get("config"))
     current_config = {}
 
-    api_client = APIClient(module)
+    params = module_query_params(module)
+
+    fingerprint = None
+    if module.params["fingerprint"] and desired_state == "present":
+        fingerprint = config_fingerprint(
+            desired_config, method, param_keys_ignore, param_config_query
+        )
+
+    def _record_fingerprint(response):
+        # remember the desired config applied to or found on the resource, with the validators of the resource
+        validators = response_validators(response)
+        if fingerprint and validators:
+            api_client.fingerprints.set(
+                add_query(uri, params), {"fingerprint": fingerprint}, validators
+            )
+
     try:
-        api_response = api_client.get(uri=module.params["uri"])
+        api_response = None
+        if fingerprint:
+            record, validators = api_client.fingerprints.get_validated(
+                add_query(uri, params)
+            )
+            if record and record.get("fingerprint") == fingerprint:
+                api_response = api_client.get(
+                    uri=uri, params=params, validators=validators
+                )
+                if api_response.get("code", 0) == 304:
+                    # the resource did not change since the desired config was last applied or found
+                    result.update(
+                        {
+                            "fingerprint": "unchanged",
+                            "changes": changes,
+                            "api_response": api_response,
+                        }
+                    )
+                    if module._diff:  # ansible --diff mode
+                        result.update({"diff": changes})
+                    return result
+
+        with api_client.timings.phase("read"):
+            if api_response is None:
+                api_response = api_client.get(uri=uri, params=params)
+            if params and api_response.get("code", 0) == 400:
+                # the query parameters are not supported by the API endpoint
+                params = {}
+                api_response = api_client.get(uri=uri)
 
         # get current state and configuration
         if api_response.get("code", 0) in [
             200,  # resource present
         ]:
             current_state = "present"
-            current_config = deepcopy(api_response.get("contents", {}))
-            current_config = remove_state_property(current_config)
-            current_config = number_values_to_string(current_config)
-            current_config = format_bool_values(current_config)
+            with api_client.timings.phase("normalize"):
+                current_config = normalize(
+                    api_response.get("contents", {}),
+                    remove_state=True,
+                    # keys can only be removed before config_query when it is not set
+                    remove_keys=None if param_config_query else param_keys_ignore,
+                )
 
             if param_config_query:
                 # mutate current_config to only contain the desired part of the configuration
-                current_config = json_query(current_config, param_config_query)
+                with api_client.timings.phase("config_query"):
+                    current_config = json_query(current_config, param_config_query)
 
         elif api_response.get("code", 0) in [
             404,  # resource absent
@@ -283,10 +597,14 @@ def main():
             current_config = {}
             current_state = "absent"
         else:  # unsupported response codes
-            module.fail_json(
-                msg="Unsupported or unknown API response code.",
-                **{"api_response": api_response},
+            result.update(
+                {
+                    "failed": True,
+                    "msg": "Unsupported or unknown API response code.",
+                    "api_response": api_response,
+                }
             )
+            return result
 
         # add current and desired state and configuration to the result for better troubleshooting
         result.update(
@@ -294,7 +612,7 @@ def main():
                 "current_config_state": {
                     "api_request": {
                         "method": "GET",
-                        "uri": module.params["uri"],
+                        "uri": add_query(uri, params),
                     },
                     "api_response": api_response,
                     "current_state": current_state,
@@ -317,43 +635,83 @@ def main():
                 changes.update({"before": current_config, "after": {}})
             elif desired_state == "present" and current_state == "present":
                 # we would update the resource, if changed
-                if not dicts_equal(current_config, desired_config, param_keys_ignore):
+                with api_client.timings.phase("compare"):
+                    equal = dicts_equal(
+                        current_config, desired_config, param_keys_ignore, memo
+                    )
+                if not equal:
                     changes.update({"before": current_config, "after": desired_config})
 
             if module._diff:  # ansible --diff mode
                 result.update({"diff": changes})
 
             if changes:
-                changes_add_deep_diff(changes)
+                with api_client.timings.phase("diff"):
+                    changes_add_list_changes(
+                        changes, module.params["list_keys"], param_keys_ignore, memo
+                    )
+                    changes_add_deep_diff(changes, module.params["list_keys"], memo)
                 result.update({"changed": True})
 
             result.update({"changes": changes})
-            if param_keys_ignore:
-                result.update({"keys_ignore": param_keys_ignore})
 
-            module.exit_json(**result)
+            return result
+
+        # queue desired state and configuration as YANG-PATCH edit, it is applied by the caller
+        if edits is not None:
+            operation = None
+            if desired_state == "present":
+                with api_client.timings.phase("compare"):
+                    equal = dicts_equal(
+                        current_config, desired_config, param_keys_ignore, memo
+                    )
+                if not equal:
+                    operation = "merge" if method == "PATCH" else "replace"
+                    changes.update({"before": current_config, "after": desired_config})
+            elif desired_state == "absent" and current_state == "present":
+                operation = "delete"
+                changes.update({"before": current_config, "after": {}})
+
+            if operation is None:
+                _record_fingerprint(api_response)
+            else:
+                datastore, target = datastore_target(uri)
+                edits.append(
+                    {
+                        "datastore": datastore,
+                        "edit": yang_patch_edit(
+                            len(edits) + 1, operation, target, desired_config
+                        ),
+                        "result": result,
+                    }
+                )
 
         # apply desired state and configuration
-        if desired_state == "present":
+        elif desired_state == "present":
             # check if a config change is required
-            if not dicts_equal(current_config, desired_config, param_keys_ignore):
-                if module.params["method"] == "PATCH":
-                    api_response = api_client.patch(
-                        uri=module.params["uri"], config=desired_config
-                    )
-                else:
-                    api_response = api_client.put(
-                        uri=module.params["uri"], config=desired_config
-                    )
+            with api_client.timings.phase("compare"):
+                equal = dicts_equal(
+                    current_config, desired_config, param_keys_ignore, memo
+                )
+            if not equal:
+                with api_client.timings.phase("write"):
+                    if method == "PATCH":
+                        api_response = api_client.patch(uri=uri, config=desired_config)
+                    else:
+                        api_response = api_client.put(uri=uri, config=desired_config)
 
                 if api_response.get("code", 0) not in [201, 204]:
                     result.update({"failed": True})
                 else:
                     changes.update({"before": current_config, "after": desired_config})
+                    _record_fingerprint(api_response)
+            else:
+                _record_fingerprint(api_response)
 
         elif desired_state == "absent" and current_state == "present":
             # check if a delete is required
-            api_response = api_client.delete(uri=module.params["uri"])
+            with api_client.timings.phase("write"):
+                api_response = api_client.delete(uri=uri)
 
             if api_response.get("code", 0) not in [201, 204]:
                 result.update({"failed": True})
@@ -361,18 +719,179 @@ def main():
                 changes.update({"before": current_config, "after": {}})
 
     except ConnectionError as exc:
-        module.fail_json(msg=to_text(exc))
+        result.update({"failed": True, "msg": to_text(exc)})
+        return result
 
     if module._diff:  # ansible --diff mode
         result.update({"diff": changes})
 
     if changes:
-        changes_add_deep_diff(changes)
+        with api_client.timings.phase("diff"):
+            changes_add_list_changes(
+                changes, module.params["list_keys"], param_keys_ignore, memo
+            )
+            changes_add_deep_diff(changes, module.params["list_keys"], memo)
         result.update({"changed": True})
 
     result.update({"changes": changes})
     result.update({"api_response": api_response or {}})
 
+    return result
+
+
+def apply_yang_patch(api_client, edits):
+    """apply queued edits with one YANG-PATCH request per datastore and update the results of the affected items"""
+    datastores = {}
+    for edit in edits:
+        datastores.setdefault(edit["datastore"], []).append(edit)
+
+    for datastore, datastore_edits in datastores.items():
+        try:
+            with api_client.timings.phase("write"):
+                api_response = api_client.yang_patch(
+                    uri=datastore, edits=[edit["edit"] for edit in datastore_edits]
+                )
+            msg = None
+        except ConnectionError as exc:
+            api_response = {}
+            msg = to_text(exc)
+
+        for edit in datastore_edits:
+            result = edit["result"]
+            result.update({"api_response": api_response or {}})
+            if msg or not yang_patch_ok(api_response):
+                # the YANG-PATCH is atomic, no edit was applied
+                result.update({"failed": True, "changed": False, "changes": {}})
+                result.pop("diff", None)
+                if msg:
+                    result.update({"msg": msg})
+
+
+ITEM_SPEC = dict(
+    uri=dict(required=True, type="str"),
+    config=dict(required=False, type="dict"),
+    method=dict(required=False, type="str", choices=["PUT", "PATCH"]),
+    state=dict(required=False, type="str", choices=["present", "absent"]),
+    keys_ignore=dict(required=False, type="list", elements="str"),
+    config_query=dict(required=False, type="str"),
+)
+
+ARGUMENT_SPEC = dict(
+    uri=dict(required=False, type="str"),
+    config=dict(required=False, type="dict", default=None),
+    method=dict(required=False, type="str", default="PUT", choices=["PUT", "PATCH"]),
+    state=dict(
+        required=False, type="str", default="present", choices=["present", "absent"]
+    ),
+    keys_ignore=dict(required=False, type="list", default=[]),
+    config_query=dict(required=False, type="str", default=""),
+    items=dict(required=False, type="list", elements="dict", options=ITEM_SPEC),
+    yang_patch=dict(required=False, type="bool", default=False),
+    list_keys=dict(required=False, type="dict", default={}),
+    content=dict(
+        required=False,
+        type="str",
+        default="config",
+        choices=["config", "nonconfig", "all"],
+    ),
+    depth=dict(required=False, type="str"),
+    fields=dict(required=False, type="str"),
+    with_defaults=dict(
+        required=False,
+        type="str",
+        choices=["report-all", "trim", "explicit", "report-all-tagged"],
+    ),
+    prefetch_uri=dict(required=False, type="str"),
+    cache=dict(required=False, type="bool", default=False),
+    cache_ttl=dict(required=False, type="int", default=300),
+    snapshot=dict(required=False, type="bool", default=False),
+    conditional_get=dict(required=False, type="bool", default=False),
+    conditional_get_max_entries=dict(required=False, type="int", default=4096),
+    fingerprint=dict(required=False, type="bool", default=False),
+    secrets=dict(required=False, type="list", default=[], no_log=True),
+    timings=dict(required=False, type="bool", default=False),
+    rate_limit=dict(required=False, type="float", default=0),
+    retries=dict(required=False, type="int", default=0),
+)
+
+ARGUMENT_SPEC_OPTIONS = dict(
+    required_one_of=[("uri", "items")],
+    mutually_exclusive=[("uri", "items")],
+)
+
+
+def run_module(module) -> dict:
+    """Returns the result of the module execution, `module` is an AnsibleModule or an object providing the same attributes."""
+    api_client = APIClient(module)
+    result = process_items(module, api_client)
+    if api_client.timings.enabled:
+        result.update({"timings": api_client.timings.result()})
+    return result
+
+
+def process_items(module, api_client) -> dict:
+    """process the resource or all items of the module and return the result of the module."""
+    edits = [] if module.params["yang_patch"] and not module.check_mode else None
+
+    if module.params["prefetch_uri"]:
+        try:
+            prefetch(
+                api_client,
+                uri=module.params["prefetch_uri"],
+                params=module_query_params(module),
+            )
+        except ConnectionError as exc:
+            return {"changed": False, "failed": True, "msg": to_text(exc)}
+
+    if module.params["snapshot"]:
+        items = module.params["items"] or [module.params]
+        datastores = dict.fromkeys(datastore_target(item["uri"])[0] for item in items)
+        try:
+            for datastore in datastores:
+                snapshot(api_client, datastore, params=module_query_params(module))
+        except ConnectionError as exc:
+            return {"changed": False, "failed": True, "msg": to_text(exc)}
+
+    if module.params["items"] is None:
+        result = process_item(module, api_client, module.params, edits)
+        if edits:
+            apply_yang_patch(api_client, edits)
+        return result
+
+    # bulk mode: process all items within this module execution, reusing the API client
+    results = []
+    for item in module.params["items"]:
+        item_result = process_item(module, api_client, item, edits)
+        item_result.update({"uri": item["uri"]})
+        results.append(item_result)
+
+    if edits:
+        apply_yang_patch(api_client, edits)
+
+    result = {
+        "changed": any(r["changed"] for r in results),
+        "failed": any(r["failed"] for r in results),
+        "results": results,
+    }
+    if module._diff:  # ansible --diff mode
+        result.update({"diff": [r["diff"] for r in results if r.get("diff")]})
+    if result["failed"]:
+        result.update({"msg": "One or more items failed."})
+
+    return result
+
+
+def main():
+    """entry point for module execution"""
+    module = AnsibleModule(
+        argument_spec=ARGUMENT_SPEC,
+        supports_check_mode=True,
+        **ARGUMENT_SPEC_OPTIONS,
+    )
+
+    result = run_module(module)
+    if result.get("msg"):
+        module.fail_json(**result)
     module.exit_json(**result)
 
 
@@ -21,6 +21,80 @@ options:
     description: The URI of the resource to read.
     required: True
     type: str
+  content:
+    description:
+      - The RESTCONF 'content' query parameter, selects configuration ('config'), state ('nonconfig') or all ('all') data of the resource.
+    required: False
+    type: str
+    choices:
+        - "config"
+        - "nonconfig"
+        - "all"
+  depth:
+    description: The RESTCONF 'depth' query parameter, limits the number of nest levels returned. Either a positive integer or 'unbounded'.
+    required: False
+    type: str
+  fields:
+    description: The RESTCONF 'fields' query parameter, selects the data nodes to return, e.g. 'config(name;enabled)'.
+    required: False
+    type: str
+  with_defaults:
+    description: The RESTCONF 'with-defaults' query parameter, controls how default values are reported.
+    required: False
+    type: str
+    choices:
+        - "report-all"
+        - "trim"
+        - "explicit"
+        - "report-all-tagged"
+  prefetch_uri:
+    description:
+      - The URI of a parent resource (container or list entry) of the resource(s) to read. It is fetched once and reads of its child resources are answered from it, instead of sending a GET request per resource.
+      - Together with cache, the parent resource is fetched once for all tasks using the same prefetch_uri. Written child resources are read from the API again.
+    required: False
+    type: str
+  cache:
+    description:
+      - Cache GET responses on the ansible controller and share them across tasks for the same device. Cached responses are served without sending a request to the API.
+      - Cached responses of a resource and its parents and children are dropped whenever this collection writes to the resource, regardless of this option.
+      - The cache is scoped to the persistent connection of the device, which is unique per playbook run. It is stored in a directory only accessible by the user running ansible, which is removed by the first task of a later playbook run once the connection is closed.
+    required: False
+    type: bool
+    default: False
+  cache_ttl:
+    description: The time in seconds a cached response is valid.
+    required: False
+    type: int
+    default: 300
+  conditional_get:
+    description:
+      - Send GET requests as conditional requests (If-None-Match, If-Modified-Since) with the validators (ETag, Last-Modified) of a previous response of the same resource. An unchanged resource is answered with 304 Not Modified and served from the validator cache on the ansible controller, without transferring and parsing the response again.
+      - Unlike cache, the validator cache is scoped to the device (user, host and port) and kept across playbook runs, the API decides whether a stored response is still valid. Responses without validators are not stored.
+    required: False
+    type: bool
+    default: False
+  conditional_get_max_entries:
+    description:
+      - The maximum number of responses kept in the validator cache of the device (see conditional_get), the least recently used responses are evicted beyond it.
+      - Set it at least to the number of resources read with conditional_get in a playbook run. Otherwise responses are evicted before the next run reads them again and every GET request transfers the full response.
+    required: False
+    type: int
+    default: 4096
+  timings:
+    description: Return the 'timings' block with the wall time of every API call and of the processing phases of the module, see timings of f5os_restconf_config.
+    required: False
+    type: bool
+    default: False
+  rate_limit:
+    description: Limit the API requests to the device to this many requests per second across forks, see rate_limit of f5os_restconf_config. 0 disables the limit.
+    required: False
+    type: float
+    default: 0
+  retries:
+    description: Retry idempotent requests this many times on 429 and 503 responses and connection errors, see retries of f5os_restconf_config.
+    required: False
+    type: int
+    default: 0
 attributes:
     check_mode:
         description: The module supports check mode.
@@ -31,6 +105,8 @@ attributes:
 notes:
     - This module requires the f5networks.f5os collection to be installed on the ansible controller.
     - This module uses the httpapi of the f5networks.f5os collection.
+    - The module is executed in the ansible worker process on the controller by its action plugin, which saves the module transfer and execution overhead per task. Async tasks and connections other than httpapi execute the module the regular way.
+    - conditional_get requires that the httpapi returns the response headers, otherwise the requests are sent unconditionally.
 """
 
 EXAMPLES = r"""
@@ -48,6 +124,25 @@ EXAMPLES = r"""
 - name: "Display clock config and state"
   ansible.builtin.debug:
     var: clock_config_state
+
+- name: "Get VLANs, subsequent tasks reading the VLANs within 10 minutes are served from the cache"
+  f5_ps_ansible.f5os.f5os_restconf_get:
+    uri: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}/data/openconfig-vlan:vlans"
+    cache: true
+    cache_ttl: 600
+  register: vlans
+
+- name: "Get the configuration of all interfaces without operational state and counters"
+  f5_ps_ansible.f5os.f5os_restconf_get:
+    uri: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}/data/openconfig-interfaces:interfaces"
+    content: config
+  register: interfaces_config
+
+- name: "Get the interfaces, unchanged interfaces are not transferred again in subsequent playbook runs"
+  f5_ps_ansible.f5os.f5os_restconf_get:
+    uri: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}/data/openconfig-interfaces:interfaces"
+    conditional_get: true
+  register: interfaces
 """
 
 RETURN = r"""
@@ -55,31 +150,83 @@ api_response:
     description: The API response received from the F5OS RESTCONF API.
     returned: always
     type: dict
+timings:
+    description: The timings of the module execution, see timings of f5os_restconf_config.
+    returned: when timings is enabled
+    type: dict
 """
 
 from ansible.module_utils._text import to_text
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.connection import ConnectionError
 
-from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.utils import APIClient
-
-
-def main():
-    """entry point for module execution"""
-    argument_spec = dict(
-        uri=dict(required=True, type="str"),
-    )
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
-
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.subtree import (
+    prefetch,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.utils import (
+    APIClient,
+    module_query_params,
+)
+
+ARGUMENT_SPEC = dict(
+    uri=dict(required=True, type="str"),
+    content=dict(
+        required=False,
+        type="str",
+        default=None,
+        choices=["config", "nonconfig", "all"],
+    ),
+    depth=dict(required=False, type="str"),
+    fields=dict(required=False, type="str"),
+    with_defaults=dict(
+        required=False,
+        type="str",
+        choices=["report-all", "trim", "explicit", "report-all-tagged"],
+    ),
+    prefetch_uri=dict(required=False, type="str"),
+    cache=dict(required=False, type="bool", default=False),
+    cache_ttl=dict(required=False, type="int", default=300),
+    conditional_get=dict(required=False, type="bool", default=False),
+    conditional_get_max_entries=dict(required=False, type="int", default=4096),
+    timings=dict(required=False, type="bool", default=False),
+    rate_limit=dict(required=False, type="float", default=0),
+    retries=dict(required=False, type="int", default=0),
+)
+
+ARGUMENT_SPEC_OPTIONS = dict()
+
+
+def run_module(module) -> dict:
+    """Returns the result of the module execution, `module` is an AnsibleModule or an object providing the same attributes."""
     result = {"changed": False, "failed": False}
 
+    params = module_query_params(module)
+
     api_client = APIClient(module)
     try:
-        api_response = api_client.get(uri=module.params["uri"])
+        if module.params["prefetch_uri"]:
+            prefetch(api_client, uri=module.params["prefetch_uri"], params=params)
+        api_response = api_client.get(uri=module.params["uri"], params=params)
         result.update({"api_response": api_response or {}})
     except ConnectionError as exc:
-        module.fail_json(msg=to_text(exc))
+        result.update({"failed": True, "msg": to_text(exc)})
+
+    if api_client.timings.enabled:
+        result.update({"timings": api_client.timings.result()})
+    return result
+
+
+def main():
+    """entry point for module execution"""
+    module = AnsibleModule(
+        argument_spec=ARGUMENT_SPEC,
+        supports_check_mode=True,
+        **ARGUMENT_SPEC_OPTIONS,
+    )
 
+    result = run_module(module)
+    if result.get("msg"):
+        module.fail_json(**result)
     module.exit_json(**result)
 
 
@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: f5os_restconf_list
+short_description: Reconcile the entries of a YANG list or leaf-list via the F5OS RESTCONF API.
+description:
+  - Reconciles the entries of a YANG list (e.g. VLANs, DNS or NTP servers) or leaf-list (e.g. the trunk-vlans of a LAG) with the desired entries.
+  - The list is read once, the added, changed and removed entries are applied with a single YANG-PATCH request (yang_patch) or a single PATCH request plus one DELETE request per removed entry.
+author:
+  - Simon Kowallik (@simonkowallik)
+version_added: "1.4.0"
+options:
+  uri:
+    description: The URI of the list or leaf-list, without list keys, e.g. '/api/data/openconfig-vlan:vlans/vlan'.
+    required: True
+    type: str
+  entries:
+    description:
+      - The desired entries of the list. Entries of a list are dicts which contain the key leafs, entries of a leaf-list are values.
+      - Missing entries are created, entries which differ from the current entry are updated, see method.
+      - An empty or null value is no entries, with purge all current entries are removed.
+    required: False
+    type: list
+    elements: raw
+    default: []
+  absent_entries:
+    description: Entries to remove from the list if present. For a list only the key leafs are required.
+    required: False
+    type: list
+    elements: raw
+    default: []
+  purge:
+    description: Remove all current entries which are not in entries.
+    required: False
+    type: bool
+    default: False
+  keys:
+    description:
+      - The key leafs of the list. Keys of common lists are built-in, see list_keys of f5os_restconf_config.
+      - Not used for leaf-lists.
+    required: False
+    type: list
+    elements: str
+  method:
+    description: Update changed entries by merging the desired entry into the current entry (PATCH) or by replacing the current entry (PUT).
+    required: False
+    type: str
+    default: "PATCH"
+    choices:
+        - "PATCH"
+        - "PUT"
+  keys_ignore:
+    description: A list of keys to ignore when comparing the current and desired entries, see keys_ignore of f5os_restconf_config. Paths start at the top level of the entry.
+    required: False
+    type: list
+    elements: str
+    default: []
+  yang_patch:
+    description:
+      - Apply all changes with a single YANG-PATCH (RFC 8072) request to the datastore root. The YANG-PATCH is applied atomically, either all changes succeed or none is applied.
+      - Without yang_patch, added entries and entries changed with method PATCH are sent in a single PATCH request, entries changed with method PUT and removed entries with one request per entry.
+    required: False
+    type: bool
+    default: False
+  conditional_get:
+    description: Send GET requests as conditional requests with the validators (ETag, Last-Modified) of a previous response, see conditional_get of f5os_restconf_get.
+    required: False
+    type: bool
+    default: False
+  conditional_get_max_entries:
+    description: The maximum number of responses kept in the validator cache of the device, see conditional_get_max_entries of f5os_restconf_get.
+    required: False
+    type: int
+    default: 4096
+  rate_limit:
+    description: Limit the API requests to the device to this many requests per second across forks, see rate_limit of f5os_restconf_config. 0 disables the limit.
+    required: False
+    type: float
+    default: 0
+  retries:
+    description: Retry idempotent requests this many times on 429 and 503 responses and connection errors, see retries of f5os_restconf_config.
+    required: False
+    type: int
+    default: 0
+attributes:
+    check_mode:
+        description: The module supports check mode.
+        support: full
+    diff_mode:
+        description: The module supports diff mode.
+        support: full
+notes:
+    - This module requires the f5networks.f5os collection to be installed on the ansible controller.
+    - This module uses the httpapi of the f5networks.f5os collection.
+"""
+
+EXAMPLES = r"""
+- name: "Ensure exactly these VLANs exist"
+  vars:
+    f5os_api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+  f5_ps_ansible.f5os.f5os_restconf_list:
+    uri: "{{ f5os_api_prefix }}/data/openconfig-vlan:vlans/vlan"
+    entries:
+      - vlan-id: 20
+        config:
+          vlan-id: 20
+          name: vlan20
+      - vlan-id: 30
+        config:
+          vlan-id: 30
+          name: vlan30
+    keys_ignore:
+      - members
+    purge: true
+    yang_patch: true
+
+- name: "Trunk VLAN 20 and 30 on lag1, remove VLAN 40"
+  vars:
+    f5os_api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+  f5_ps_ansible.f5os.f5os_restconf_list:
+    uri: "{{ f5os_api_prefix }}/data/openconfig-interfaces:interfaces/interface=lag1/openconfig-if-aggregate:aggregation/openconfig-vlan:switched-vlan/config/trunk-vlans"
+    entries: [20, 30]
+    absent_entries: [40]
+
+- name: "Set the DNS servers"
+  vars:
+    f5os_api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+  f5_ps_ansible.f5os.f5os_restconf_list:
+    uri: "{{ f5os_api_prefix }}/data/openconfig-system:system/dns/servers/server"
+    entries:
+      - address: 9.9.9.9
+        config:
+          address: 9.9.9.9
+      - address: 8.8.8.8
+        config:
+          address: 8.8.8.8
+    purge: true
+"""
+
+RETURN = r"""
+changes:
+    description: The 'added' and 'removed' entries and the 'changed' entries (with 'before' and 'after').
+    returned: always
+    type: dict
+api_responses:
+    description: The API responses of the requests applying the changes.
+    returned: when changes were applied
+    type: list
+    elements: dict
+diff:
+    description: The list before and after the changes.
+    returned: when diff mode is enabled
+    type: dict
+"""
+
+from urllib.parse import quote
+
+from ansible.module_utils._text import to_text
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.connection import ConnectionError
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.diff import (
+    dicts_equal,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.normalize import (
+    normalize,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.subtree import (
+    list_keys_lookup,
+    parse_uri,
+    qualified_name,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.utils import (
+    APIClient,
+    datastore_target,
+    yang_patch_edit,
+    yang_patch_ok,
+)
+
+ARGUMENT_SPEC = dict(
+    uri=dict(required=True, type="str"),
+    entries=dict(required=False, type="list", elements="raw", default=[]),
+    absent_entries=dict(required=False, type="list", elements="raw", default=[]),
+    purge=dict(required=False, type="bool", default=False),
+    keys=dict(required=False, type="list", elements="str"),
+    method=dict(required=False, type="str", default="PATCH", choices=["PATCH", "PUT"]),
+    keys_ignore=dict(required=False, type="list", elements="str", default=[]),
+    yang_patch=dict(required=False, type="bool", default=False),
+    conditional_get=dict(required=False, type="bool", default=False),
+    conditional_get_max_entries=dict(required=False, type="int", default=4096),
+    rate_limit=dict(required=False, type="float", default=0),
+    retries=dict(required=False, type="int", default=0),
+)
+
+ARGUMENT_SPEC_OPTIONS = dict()
+
+
+def entry_key(entry, keys) -> tuple:
+    """Returns the key of list `entry`, the value itself for leaf-list entries (`keys` is None)."""
+    if keys is None:
+        return (str(entry),)
+    return tuple(str(entry[key]) for key in keys)
+
+
+def entry_uri(uri: str, key: tuple) -> str:
+    """Returns the URI of the list entry with `key` of list `uri`."""
+    return f"{uri}={','.join(quote(k, safe='') for k in key)}"
+
+
+def list_contents(api_response: dict, list_name: str) -> list:
+    """Returns the list entries of the GET `api_response` of a list."""
+    if api_response.get("code", 0) != 200:
+        return []
+    contents = api_response.get("contents") or {}
+    if list_name in contents:
+        return contents[list_name] or []
+    values = list(contents.values())
+    return values[0] if len(values) == 1 and isinstance(values[0], list) else []
+
+
+def reconcile(current: list, desired: list, absent: list, keys, purge, keys_ignore):
+    """Returns the added, changed (before, after) and removed entries to reconcile the `current` list with the `desired` and `absent` entries."""
+    current_index = {entry_key(e, keys): e for e in current}
+    desired_index = {entry_key(e, keys): e for e in desired}
+    absent_keys = {entry_key(e, keys) for e in absent}
+
+    added = [e for k, e in desired_index.items() if k not in current_index]
+    changed = []
+    if keys is not None:
+        changed = [
+            (current_index[k], e)
+            for k, e in desired_index.items()
+            if k in current_index and not dicts_equal(current_index[k], e, keys_ignore)
+        ]
+    removed = [
+        e
+        for k, e in current_index.items()
+        if k in absent_keys or (purge and k not in desired_index)
+    ]
+    return added, changed, removed
+
+
+def apply_yang_patch(api_client, uri, list_name, keys, method, added, changed, removed):
+    """Applies the changes with a single YANG-PATCH request, returns the list of API responses and True on success."""
+    datastore, target = datastore_target(uri)
+    operation = "merge" if method == "PATCH" else "replace"
+    edits = []
+    for entry in added + [after for _, after in changed]:
+        edits.append(
+            yang_patch_edit(
+                len(edits) + 1,
+                operation,
+                entry_uri(target, entry_key(entry, keys)),
+                {list_name: [entry]},
+            )
+        )
+    for entry in removed:
+        edits.append(
+            yang_patch_edit(
+                len(edits) + 1, "delete", entry_uri(target, entry_key(entry, keys))
+            )
+        )
+    api_response = api_client.yang_patch(uri=datastore, edits=edits)
+    return [api_response], yang_patch_ok(api_response)
+
+
+def apply_requests(
+    api_client, uri, segments, list_name, keys, method, added, changed, removed
+):
+    """Applies the changes with a single PATCH request of the parent resource and one request per replaced or removed entry, returns the list of API responses and True on success."""
+    api_responses = []
+    merged = added + ([after for _, after in changed] if method == "PATCH" else [])
+    if merged:
+        parent_segments = segments[:-1]
+        if not parent_segments:
+            datastore, _ = datastore_target(uri)
+            api_responses.append(
+                api_client.patch(uri=datastore, config={list_name: merged})
+            )
+        elif parent_segments[-1][1] is None:
+            api_responses.append(
+                api_client.patch(
+                    uri=uri.rsplit("/", 1)[0],
+                    config={qualified_name(parent_segments): {segments[-1][0]: merged}},
+                )
+            )
+        else:
+            # the parent is a list entry, merge the entries one by one
+            for entry in merged:
+                api_responses.append(
+                    api_client.patch(
+                        uri=entry_uri(uri, entry_key(entry, keys)),
+                        config={list_name: [entry]},
+                    )
+                )
+    if method == "PUT":
+        for _, entry in changed:
+            api_responses.append(
+                api_client.put(
+                    uri=entry_uri(uri, entry_key(entry, keys)),
+                    config={list_name: [entry]},
+                )
+            )
+    for entry in removed:
+        api_responses.append(
+            api_client.delete(uri=entry_uri(uri, entry_key(entry, keys)))
+        )
+    ok = all(r.get("code", 0) in [200, 201, 204] for r in api_responses)
+    return api_responses, ok
+
+
+def run_module(module) -> dict:
+    """Returns the result of the module execution, `module` is an AnsibleModule or an object providing the same attributes."""
+    params = module.params
+    result = {"changed": False, "failed": False}
+
+    uri = params["uri"].rstrip("/")
+    segments = parse_uri(uri)
+    if not segments or segments[-1][1] is not None:
+        result.update(
+            {"failed": True, "msg": "The uri must address a list, without list keys."}
+        )
+        return result
+    list_name = qualified_name(segments)
+
+    # null, e.g. a template rendering no entries
+    desired = normalize(params["entries"] or [])
+    absent = normalize(params["absent_entries"] or [])
+
+    api_client = APIClient(module)
+    remove_state = False
+    try:
+        api_response = api_client.get(uri=uri, params={"content": "config"})
+        if api_response.get("code", 0) == 400:
+            # the query parameters are not supported by the API endpoint, the response includes the state
+            api_response = api_client.get(uri=uri)
+            remove_state = True
+    except ConnectionError as exc:
+        result.update({"failed": True, "msg": to_text(exc)})
+        return result
+    if api_response.get("code", 0) not in [200, 204, 404]:
+        result.update(
+            {
+                "failed": True,
+                "msg": "Unsupported or unknown API response code.",
+                "api_response": api_response,
+            }
+        )
+        return result
+    current = normalize(
+        list_contents(api_response, list_name), remove_state=remove_state
+    )
+
+    leaf_list = not any(isinstance(e, dict) for e in current + desired + absent)
+    keys = None
+    if not leaf_list:
+        keys = params["keys"] or list_keys_lookup(segments[-1][0])
+        if not keys:
+            result.update(
+                {"failed": True, "msg": f"The keys of list '{list_name}' are required."}
+            )
+            return result
+
+    try:
+        added, changed, removed = reconcile(
+            current, desired, absent, keys, params["purge"], params["keys_ignore"]
+        )
+    except KeyError as exc:
+        result.update(
+            {
+                "failed": True,
+                "msg": f"Entry without key {to_text(exc)} of list '{list_name}'.",
+            }
+        )
+        return result
+
+    result["changes"] = {
+        "added": added,
+        "removed": removed,
+        "changed": [{"before": before, "after": after} for before, after in changed],
+    }
+    result["changed"] = bool(added or changed or removed)
+
+    if module._diff:  # ansible --diff mode
+        removed_keys = {entry_key(e, keys) for e in removed}
+        changed_entries = {entry_key(after, keys): after for _, after in changed}
+        after_list = [
+            changed_entries.get(entry_key(e, keys), e)
+            for e in current
+            if entry_key(e, keys) not in removed_keys
+        ] + added
+        result["diff"] = {
+            "before": {list_name: current},
+            "after": {list_name: after_list},
+        }
+
+    if not result["changed"] or module.check_mode:
+        return result
+
+    apply = apply_yang_patch if params["yang_patch"] else apply_requests
+    args = (api_client, uri) if params["yang_patch"] else (api_client, uri, segments)
+    try:
+        api_responses, ok = apply(
+            *args, list_name, keys, params["method"], added, changed, removed
+        )
+    except ConnectionError as exc:
+        result.update({"failed": True, "msg": to_text(exc)})
+        return result
+
+    result["api_responses"] = api_responses
+    if not ok:
+        result.update({"failed": True, "msg": "Applying the changes failed."})
+    return result
+
+
+def main():
+    """entry point for module execution"""
+    module = AnsibleModule(
+        argument_spec=ARGUMENT_SPEC,
+        supports_check_mode=True,
+        **ARGUMENT_SPEC_OPTIONS,
+    )
+
+    result = run_module(module)
+    if result.get("msg"):
+        module.fail_json(**result)
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
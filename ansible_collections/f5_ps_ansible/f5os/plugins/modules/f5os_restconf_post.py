@@ -30,6 +30,16 @@ options:
     required: False
     type: list
     elements: str
+  timings:
+    description: Return the 'timings' block with the wall time of every API call and of the processing phases of the module, see timings of f5os_restconf_config.
+    required: False
+    type: bool
+    default: False
+  rate_limit:
+    description: Limit the API requests to the device to this many requests per second across forks, see rate_limit of f5os_restconf_config. 0 disables the limit.
+    required: False
+    type: float
+    default: 0
 attributes:
     check_mode:
         description: The module does not support check mode.
@@ -40,6 +50,7 @@ attributes:
 notes:
     - This module requires the f5networks.f5os collection to be installed on the ansible controller.
     - This module uses the httpapi of the f5networks.f5os collection.
+    - The module is executed in the ansible worker process on the controller by its action plugin, which saves the module transfer and execution overhead per task. Async tasks and connections other than httpapi execute the module the regular way.
 """
 
 EXAMPLES = r"""
@@ -75,42 +86,69 @@ api_response:
     description: The API response received from the F5OS RESTCONF API.
     returned: always
     type: dict
+timings:
+    description: The timings of the module execution, see timings of f5os_restconf_config.
+    returned: when timings is enabled
+    type: dict
 """
 
 from ansible.module_utils._text import to_text
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.connection import ConnectionError
 
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.normalize import (
+    normalize,
+)
 from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.utils import (
     APIClient,
-    format_bool_values,
-    number_values_to_string,
 )
 
+ARGUMENT_SPEC = dict(
+    uri=dict(required=True, type="str"),
+    config=dict(required=False, type="dict", default=None),
+    secrets=dict(required=False, type="list", default=[], no_log=True),
+    timings=dict(required=False, type="bool", default=False),
+    rate_limit=dict(required=False, type="float", default=0),
+)
 
-def main():
-    """entry point for module execution"""
-    argument_spec = dict(
-        uri=dict(required=True, type="str"),
-        config=dict(required=False, type="dict", default=None),
-        secrets=dict(required=False, type="list", default=[], no_log=True),
-    )
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+ARGUMENT_SPEC_OPTIONS = dict()
 
-    result = {"changed": True, "failed": True}
 
-    desired_config = number_values_to_string(module.params["config"])
-    desired_config = format_bool_values(desired_config)
+def run_module(module) -> dict:
+    """Returns the result of the module execution, `module` is an AnsibleModule or an object providing the same attributes."""
+    result = {"changed": True, "failed": True}
 
     api_client = APIClient(module)
+    with api_client.timings.phase("normalize"):
+        desired_config = normalize(module.params["config"])
+
     try:
-        api_response = api_client.post(uri=module.params["uri"], config=desired_config)
+        with api_client.timings.phase("write"):
+            api_response = api_client.post(
+                uri=module.params["uri"], config=desired_config
+            )
         result.update({"api_response": api_response or {}})
         if api_response.get("code", 0) >= 200 and api_response.get("code", 0) < 300:
             result["failed"] = False
     except ConnectionError as exc:
-        module.fail_json(msg=to_text(exc))
+        result.update({"changed": False, "msg": to_text(exc)})
+
+    if api_client.timings.enabled:
+        result.update({"timings": api_client.timings.result()})
+    return result
+
+
+def main():
+    """entry point for module execution"""
+    module = AnsibleModule(
+        argument_spec=ARGUMENT_SPEC,
+        supports_check_mode=True,
+        **ARGUMENT_SPEC_OPTIONS,
+    )
 
+    result = run_module(module)
+    if result.get("msg"):
+        module.fail_json(**result)
     module.exit_json(**result)
 
 
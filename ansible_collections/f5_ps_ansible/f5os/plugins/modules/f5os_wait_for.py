@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = r"""
+---
+module: f5os_wait_for
+short_description: Wait until F5OS RESTCONF API resources are ready.
+description:
+  - Polls one or more readiness URIs of the F5OS RESTCONF API until all of them respond with an expected status code, for example after a configuration change restarted the API.
+  - The interval between polls grows exponentially up to max_interval and is randomized (jitter), the module returns as soon as all URIs are ready or fails when timeout is reached.
+  - Connection errors, e.g. while the API restarts, are treated as not ready.
+author:
+  - Simon Kowallik (@simonkowallik)
+version_added: "1.4.0"
+options:
+  uris:
+    description: The URIs to poll, all of them must be ready.
+    required: True
+    type: list
+    elements: str
+  status_codes:
+    description: The response codes of a ready URI.
+    required: False
+    type: list
+    elements: int
+    default: [200]
+  timeout:
+    description: The maximum time in seconds to wait for all URIs to be ready, including delay.
+    required: False
+    type: int
+    default: 600
+  delay:
+    description: The time in seconds to wait before the first poll, use it when the API restarts with a delay after the configuration change.
+    required: False
+    type: float
+    default: 0
+  interval:
+    description: The time in seconds to wait after the first unsuccessful poll, it is multiplied by backoff after every further unsuccessful poll.
+    required: False
+    type: float
+    default: 1
+  max_interval:
+    description: The maximum time in seconds between two polls.
+    required: False
+    type: float
+    default: 30
+  backoff:
+    description: The factor the interval is multiplied with after every unsuccessful poll.
+    required: False
+    type: float
+    default: 2
+  jitter:
+    description: The fraction of the interval which is randomized, 0 disables jitter. With 0.5 the interval is between 50% and 100% of its value.
+    required: False
+    type: float
+    default: 0.5
+  consecutive_successes:
+    description: The number of consecutive polls in which all URIs must be ready. Use more than 1 if the API is briefly available before it restarts again.
+    required: False
+    type: int
+    default: 1
+attributes:
+    check_mode:
+        description: The module supports check mode.
+        support: full
+    diff_mode:
+        description: The module does not supports diff mode.
+        support: none
+notes:
+    - This module requires the f5networks.f5os collection to be installed on the ansible controller.
+    - This module uses the httpapi of the f5networks.f5os collection.
+    - The persistent_command_timeout of the httpapi connection limits the time of a single poll.
+"""
+
+EXAMPLES = r"""
+- name: "Wait until the API and the service pods are ready"
+  vars:
+    f5os_api_prefix: "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}"
+  f5_ps_ansible.f5os.f5os_wait_for:
+    uris:
+      - "{{ f5os_api_prefix }}/data/openconfig-system:system/f5os-system-version:version"
+      - "{{ f5os_api_prefix }}/data/f5-service-pod:service-pods"
+    delay: 10
+    timeout: 600
+
+- name: "Wait until the API is ready and stays ready for 3 polls"
+  f5_ps_ansible.f5os.f5os_wait_for:
+    uris:
+      - "{{ '/restconf' if ansible_httpapi_port == '8888' else '/api' }}/data/openconfig-system:system/f5os-system-version:version"
+    consecutive_successes: 3
+    max_interval: 10
+"""
+
+RETURN = r"""
+elapsed:
+    description: The time in seconds waited for the URIs to be ready.
+    returned: always
+    type: float
+attempts:
+    description: The number of polls.
+    returned: always
+    type: int
+probes:
+    description: The result of the last poll of each URI, contains the uri, the response code or the connection error (error) and if it is ready.
+    returned: always
+    type: list
+    elements: dict
+"""
+
+import random
+import time
+
+from ansible.module_utils._text import to_text
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.connection import ConnectionError
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.utils import (
+    APIClient,
+)
+
+ARGUMENT_SPEC = dict(
+    uris=dict(required=True, type="list", elements="str"),
+    status_codes=dict(required=False, type="list", elements="int", default=[200]),
+    timeout=dict(required=False, type="int", default=600),
+    delay=dict(required=False, type="float", default=0),
+    interval=dict(required=False, type="float", default=1),
+    max_interval=dict(required=False, type="float", default=30),
+    backoff=dict(required=False, type="float", default=2),
+    jitter=dict(required=False, type="float", default=0.5),
+    consecutive_successes=dict(required=False, type="int", default=1),
+)
+
+ARGUMENT_SPEC_OPTIONS = dict()
+
+
+def backoff_intervals(interval, max_interval, backoff, jitter):
+    """Returns a generator of the intervals between polls, growing by `backoff` up to `max_interval`, reduced by a random fraction of up to `jitter`."""
+    while True:
+        yield interval * (1 - random.uniform(0, min(max(jitter, 0), 1)))
+        interval = min(interval * backoff, max_interval)
+
+
+def probe(api_client, uri, status_codes) -> dict:
+    """Returns the result of a single poll of `uri`."""
+    try:
+        code = api_client.get(uri=uri).get("code", 0)
+    except ConnectionError as exc:
+        return {"uri": uri, "error": to_text(exc), "ready": False}
+    return {"uri": uri, "code": code, "ready": code in status_codes}
+
+
+def run_module(module) -> dict:
+    """Returns the result of the module execution, `module` is an AnsibleModule or an object providing the same attributes."""
+    params = module.params
+    start = time.monotonic()
+    deadline = start + params["timeout"]
+    intervals = backoff_intervals(
+        params["interval"], params["max_interval"], params["backoff"], params["jitter"]
+    )
+
+    if params["delay"]:
+        time.sleep(min(params["delay"], params["timeout"]))
+
+    api_client = APIClient(module)
+    attempts = 0
+    successes = 0
+    while True:
+        attempts += 1
+        probes = [
+            probe(api_client, uri, params["status_codes"]) for uri in params["uris"]
+        ]
+        if all(p["ready"] for p in probes):
+            successes += 1
+            if successes >= params["consecutive_successes"]:
+                break
+            # the next poll confirms the ready state, no backoff required
+            sleep = params["interval"]
+        else:
+            successes = 0
+            sleep = next(intervals)
+
+        if time.monotonic() + sleep > deadline:
+            return {
+                "changed": False,
+                "failed": True,
+                "msg": f"Timeout waiting for {', '.join(p['uri'] for p in probes if not p['ready']) or 'consecutive successes'}.",
+                "elapsed": round(time.monotonic() - start, 3),
+                "attempts": attempts,
+                "probes": probes,
+            }
+        time.sleep(sleep)
+
+    return {
+        "changed": False,
+        "failed": False,
+        "elapsed": round(time.monotonic() - start, 3),
+        "attempts": attempts,
+        "probes": probes,
+    }
+
+
+def main():
+    """entry point for module execution"""
+    module = AnsibleModule(
+        argument_spec=ARGUMENT_SPEC,
+        supports_check_mode=True,
+        **ARGUMENT_SPEC_OPTIONS,
+    )
+
+    result = run_module(module)
+    if result.get("msg"):
+        module.fail_json(**result)
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
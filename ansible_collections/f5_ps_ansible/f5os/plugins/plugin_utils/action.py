@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+from ansible.module_utils.common.parameters import remove_values
+from ansible.plugins.action import ActionBase
+
+
+class ModuleShim:
+    """Provides the attributes of AnsibleModule used by the modules of this collection, to run them without AnsibleModule."""
+
+    def __init__(self, name, params, socket_path, check_mode=False, diff=False):
+        self._name = name
+        self.params = params
+        self._socket_path = socket_path
+        self.check_mode = check_mode
+        self._diff = diff
+
+
+def run_in_process(module, name, args, socket_path, check_mode=False, diff=False):
+    """Returns the result of running `module` (the python module of an ansible module providing ARGUMENT_SPEC, ARGUMENT_SPEC_OPTIONS and run_module) with `args` in the current process, like AnsibleModule would. Values of no_log parameters are masked in the result."""
+    validator = ArgumentSpecValidator(
+        module.ARGUMENT_SPEC, **module.ARGUMENT_SPEC_OPTIONS
+    )
+    validation = validator.validate(args)
+    no_log_values = validation._no_log_values
+    if validation.error_messages:
+        return {
+            "changed": False,
+            "failed": True,
+            "msg": validation.errors.msg,
+            "invocation": {"module_args": remove_values(args, no_log_values)},
+        }
+
+    params = validation.validated_parameters
+    result = module.run_module(
+        ModuleShim(name, params, socket_path, check_mode=check_mode, diff=diff)
+    )
+    result.setdefault("changed", False)
+    if result.get("msg"):
+        result["failed"] = True
+    result["invocation"] = {"module_args": params}
+    return remove_values(result, no_log_values)
+
+
+class InProcessActionBase(ActionBase):
+    """Action plugin base running the module `module` in the controller worker process, using the socket of the persistent connection. This avoids building, transferring and executing the module (AnsiballZ) for every task.
+
+    The module is executed the regular way when the connection is not persistent or the task is async.
+    """
+
+    module = None
+
+    def run(self, tmp=None, task_vars=None):
+        result = super().run(tmp, task_vars)
+        del tmp
+
+        socket_path = getattr(self._connection, "socket_path", None)
+        if self._task.async_val or not socket_path:
+            result.update(self._execute_module(task_vars=task_vars))
+            return result
+
+        result.update(
+            run_in_process(
+                self.module,
+                self._task.action,
+                self._task.args,
+                socket_path,
+                check_mode=bool(self._task.check_mode),
+                diff=bool(self._task.diff),
+            )
+        )
+        return result
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Fixtures of the module_utils micro-benchmarks, usage: make benchmark, make benchmark-baseline
+
+The time of a benchmark is measured by pytest-benchmark and compared with its stored runs (--benchmark-compare). The peak memory (tracemalloc) of a single call is compared with memory_baseline.json, a benchmark fails if it exceeds the baseline by more than --memory-threshold percent.
+"""
+
+import json
+import os
+import tracemalloc
+
+import pytest
+from trees import datastore
+
+MEMORY_BASELINE = os.path.join(os.path.dirname(__file__), "memory_baseline.json")
+
+
+@pytest.fixture(scope="session")
+def tree():
+    return datastore()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--memory-threshold",
+        type=float,
+        default=20.0,
+        help="fail a benchmark if its peak memory exceeds the baseline by more than this percentage",
+    )
+    parser.addoption(
+        "--memory-baseline-update",
+        action="store_true",
+        default=False,
+        help="store the measured peak memory as baseline in memory_baseline.json",
+    )
+
+
+def peak_memory(func, args) -> int:
+    """Returns the peak memory in bytes allocated by func(*args)."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+@pytest.fixture(scope="session")
+def memory_baseline(request):
+    baseline = {}
+    if os.path.exists(MEMORY_BASELINE):
+        with open(MEMORY_BASELINE, "r") as f:
+            baseline = json.load(f)
+    measured = {}
+    yield baseline, measured
+    if request.config.getoption("memory_baseline_update") and measured:
+        with open(MEMORY_BASELINE, "w") as f:
+            json.dump(dict(baseline, **measured), f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+@pytest.fixture
+def measure(request, benchmark, memory_baseline):
+    """Returns a function benchmarking func(*args) and checking its peak memory against the baseline."""
+    baseline, measured = memory_baseline
+    threshold = request.config.getoption("memory_threshold")
+    name = request.node.name
+
+    def _measure(func, *args):
+        result = benchmark.pedantic(func, args=args, rounds=10, warmup_rounds=2)
+
+        peak = peak_memory(func, args)
+        benchmark.extra_info["peak_memory_bytes"] = peak
+        measured[name] = peak
+        if name in baseline and not request.config.getoption("memory_baseline_update"):
+            limit = baseline[name] * (1 + threshold / 100)
+            assert peak <= limit, (
+                f"peak memory {peak} bytes exceeds the baseline {baseline[name]} bytes by more than {threshold}%"
+            )
+        return result
+
+    return _measure
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Reports the payload size and the cold start time of the modules of this collection and fails if a budget is exceeded.
+
+- payload_bytes: size of the deflated zip of the module and the collection module_utils it imports (recursively), which AnsiballZ ships with every execution. The ansible module_utils are the same for all modules and not included.
+- import_ms: time to import the module in a new python interpreter which already imported ansible.module_utils.basic, the best of `--runs` runs. This is the cold start time added by the collection.
+
+usage: make benchmark-footprint, or PYTHONPATH=<repo root> python tests/benchmark/module_footprint.py [--json]
+"""
+
+import argparse
+import ast
+import io
+import json
+import os
+import subprocess
+import sys
+import zipfile
+
+COLLECTION = "ansible_collections.f5_ps_ansible.f5os"
+COLLECTION_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+BASELINE_IMPORTS = ["ansible.module_utils.basic", "ansible.module_utils.connection"]
+
+BUDGETS = {
+    "f5os_restconf_config": {"payload_bytes": 35000, "import_ms": 45},
+    "f5os_restconf_get": {"payload_bytes": 20000, "import_ms": 40},
+    "f5os_restconf_list": {"payload_bytes": 28500, "import_ms": 40},
+    "f5os_restconf_post": {"payload_bytes": 19000, "import_ms": 40},
+    "f5os_config_snapshot": {"payload_bytes": 19500, "import_ms": 40},
+    "f5os_facts": {"payload_bytes": 16500, "import_ms": 40},
+    "f5os_wait_for": {"payload_bytes": 16500, "import_ms": 40},
+}
+
+
+def module_path(name: str) -> str:
+    """Returns the file path of collection python module `name`."""
+    relative_name = name[len(COLLECTION) + 1 :]
+    return os.path.join(COLLECTION_DIR, *relative_name.split(".")) + ".py"
+
+
+def collection_imports(path: str) -> set:
+    """Returns the collection module_utils imported by the python file `path`."""
+    with open(path, "r") as f:
+        tree = ast.parse(f.read(), filename=path)
+    imports = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module:
+            names = [node.module]
+        elif isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        else:
+            continue
+        imports.update(
+            name
+            for name in names
+            if name.startswith(f"{COLLECTION}.plugins.module_utils")
+        )
+    return imports
+
+
+def payload(module: str) -> dict:
+    """Returns the files and the deflated zip size of `module` and its collection module_utils."""
+    name = f"{COLLECTION}.plugins.modules.{module}"
+    files = {name: module_path(name)}
+    pending = [name]
+    while pending:
+        for imported in collection_imports(files[pending.pop()]):
+            if imported not in files:
+                files[imported] = module_path(imported)
+                pending.append(imported)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, path in sorted(files.items()):
+            zf.write(path, arcname=name.replace(".", "/") + ".py")
+    return {
+        "files": len(files),
+        "source_bytes": sum(os.path.getsize(path) for path in files.values()),
+        "payload_bytes": len(buffer.getvalue()),
+    }
+
+
+def import_ms(module: str, runs: int = 5) -> float:
+    """Returns the best time in milliseconds to import `module` after the BASELINE_IMPORTS, measured with 'python -X importtime'."""
+    code = f"import {', '.join(BASELINE_IMPORTS)}; import {COLLECTION}.plugins.modules.{module}"
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    best = None
+    for _ in range(runs):
+        stderr = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stderr
+        total_us = 0
+        after_baseline = False
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = line.split("|", 2)
+            if not cumulative.strip().isdigit():
+                continue
+            top_level = not name[1:].startswith(" ")
+            if top_level and name.strip() == BASELINE_IMPORTS[-1]:
+                after_baseline = True
+            elif top_level and after_baseline:
+                total_us += int(cumulative)
+        best = total_us if best is None else min(best, total_us)
+    return round(best / 1000, 1)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument(
+        "--runs", type=int, default=5, help="import time runs per module"
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for module, budget in BUDGETS.items():
+        result = payload(module)
+        result["import_ms"] = import_ms(module, args.runs)
+        result["over_budget"] = [k for k, limit in budget.items() if result[k] > limit]
+        results[module] = result
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(
+            f"{'module':<24}{'files':>6}{'source':>10}{'payload':>10}{'budget':>10}{'import ms':>11}{'budget':>8}"
+        )
+        for module, result in results.items():
+            budget = BUDGETS[module]
+            print(
+                f"{module:<24}{result['files']:>6}{result['source_bytes']:>10}"
+                f"{result['payload_bytes']:>10}{budget['payload_bytes']:>10}"
+                f"{result['import_ms']:>11}{budget['import_ms']:>8}"
+                + (
+                    "  OVER BUDGET: " + ", ".join(result["over_budget"])
+                    if result["over_budget"]
+                    else ""
+                )
+            )
+
+    return 1 if any(result["over_budget"] for result in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
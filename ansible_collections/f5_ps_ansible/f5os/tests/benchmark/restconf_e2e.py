@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Benchmarks f5os_restconf_config end to end against the stand-in RESTCONF server (restconf_server.py) and reports the throughput and latency of the API requests.
+
+The module runs in process like the action plugin runs it, its connection is a StandInConnection sending real HTTP requests to the server. Every scenario configures `--vlans` VLANs:
+
+- create: the VLANs are absent and created
+- unchanged: the VLANs are present, nothing is written
+- delete: the VLANs are deleted
+
+With `--items` every scenario is a single task with an 'items' list (see yang_patch), otherwise every VLAN is a task of its own like a loop in a playbook.
+
+usage: make benchmark-e2e, or PYTHONPATH=<repo root> python tests/benchmark/restconf_e2e.py [--vlans 200] [--latency-ms 2] [--items] [--json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from restconf_server import RESTCONFServer, StandInConnection  # noqa: E402
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.callback.f5os_timings import (  # noqa: E402
+    TimingsReport,
+    format_report,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils import utils  # noqa: E402
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.cache import (  # noqa: E402
+    device_dir,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.modules import (  # noqa: E402
+    f5os_restconf_config,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.plugin_utils.action import (  # noqa: E402
+    ModuleShim,
+)
+
+SCENARIOS = ["create", "unchanged", "delete"]
+
+
+def vlan_item(api_prefix: str, vlan_id: int, state: str) -> dict:
+    """Returns the parameters of the VLAN `vlan_id` for f5os_restconf_config."""
+    return {
+        "uri": f"{api_prefix}/data/openconfig-vlan:vlans/vlan={vlan_id}",
+        "config": {
+            "openconfig-vlan:vlan": [
+                {
+                    "vlan-id": vlan_id,
+                    "config": {"vlan-id": vlan_id, "name": f"vlan-{vlan_id}"},
+                }
+            ]
+        },
+        "state": state,
+    }
+
+
+def module_params(**params) -> dict:
+    """Returns the parameters of f5os_restconf_config with the defaults of the argument spec."""
+    return dict(
+        {
+            spec: spec_options.get("default")
+            for spec, spec_options in f5os_restconf_config.ARGUMENT_SPEC.items()
+        },
+        **params,
+    )
+
+
+def tasks(args, scenario: str) -> list:
+    """Returns the parameters of the tasks of `scenario`."""
+    state = "absent" if scenario == "delete" else "present"
+    items = [
+        vlan_item(args.api_prefix, vlan_id, state)
+        for vlan_id in range(2, args.vlans + 2)
+    ]
+    options = {
+        "timings": True,
+        "conditional_get": args.conditional_get,
+        "fingerprint": args.fingerprint,
+        "snapshot": args.snapshot,
+        "retries": args.retries,
+        "rate_limit": args.rate_limit,
+    }
+    if args.items:
+        item_spec = dict.fromkeys(f5os_restconf_config.ITEM_SPEC)
+        return [
+            module_params(
+                items=[dict(item_spec, **item) for item in items],
+                yang_patch=args.yang_patch,
+                **options,
+            )
+        ]
+    return [module_params(**item, **options) for item in items]
+
+
+def run_scenario(args, scenario: str, socket_path: str) -> dict:
+    """Returns the report of running the tasks of `scenario`."""
+    timings_report = TimingsReport()
+    failed = changed = 0
+    task_params = tasks(args, scenario)
+    start = time.perf_counter()
+    for params in task_params:
+        module = ModuleShim("f5os_restconf_config", params, socket_path)
+        result = f5os_restconf_config.run_module(module)
+        failed += bool(result.get("failed"))
+        changed += bool(result.get("changed"))
+        timings_report.add("standin", result)
+    seconds = time.perf_counter() - start
+    report = timings_report.report()
+    requests = report["totals"]["requests"]
+    return {
+        "scenario": scenario,
+        "tasks": len(task_params),
+        "changed": changed,
+        "failed": failed,
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(requests / seconds, 1) if seconds else 0,
+        "vlans_per_second": round(args.vlans / seconds, 1) if seconds else 0,
+        "report": report,
+    }
+
+
+def parse_args(argv=None):
+    """Returns the parsed command line arguments `argv` (sys.argv if not set)."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--vlans", type=int, default=200)
+    parser.add_argument("--api-prefix", default="/api", choices=["/api", "/restconf"])
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--jitter-ms", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-code", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--items", action="store_true", help="one task with items")
+    parser.add_argument("--yang-patch", action="store_true")
+    parser.add_argument("--conditional-get", action="store_true")
+    parser.add_argument("--fingerprint", action="store_true")
+    parser.add_argument("--snapshot", action="store_true")
+    parser.add_argument("--retries", type=int, default=0)
+    parser.add_argument("--rate-limit", type=float, default=0)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    server = RESTCONFServer(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        error_code=args.error_code,
+        retry_after=0 if args.error_rate else None,
+        seed=args.seed,
+    )
+    connection = StandInConnection.bind(server)
+    utils.Connection = connection
+    # the caches scoped to the persistent connection are kept while its socket exists
+    socket_dir = tempfile.mkdtemp(prefix="standin-")
+    socket_path = os.path.join(socket_dir, "socket")
+    open(socket_path, "w").close()
+    # the caches of the run, per persistent connection and per device
+    cache_dirs = [
+        device_dir(socket_path),
+        device_dir(utils.device_identity(connection(socket_path), socket_path)),
+    ]
+
+    results = []
+    with server:
+        for scenario in SCENARIOS:
+            results.append(run_scenario(args, scenario, socket_path))
+    for cache_dir in cache_dirs + [socket_dir]:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 1 if any(result["failed"] for result in results) else 0
+
+    for result in results:
+        print(
+            f"{result['scenario']}: tasks: {result['tasks']}, changed: {result['changed']}, failed: {result['failed']}, "
+            f"time: {result['seconds']:.3f} s, VLANs/s: {result['vlans_per_second']}, requests/s: {result['requests_per_second']}"
+        )
+        for line in format_report(result["report"], args.top):
+            print(f"  {line}")
+        print()
+    print(f"server requests: {dict(server.requests)}")
+    return 1 if any(result["failed"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,618 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+A local stand-in for the F5OS RESTCONF API, to exercise the modules without an rSeries or VELOS system.
+
+- The '/api/data' and '/restconf/data' datastores are the same in-memory JSON tree, list entries are addressed with their keys, e.g. '/api/data/openconfig-vlan:vlans/vlan=20'.
+- GET returns 200 with the module qualified resource or 404, 'content=config' removes the 'state' containers. 'depth', 'fields' and 'with-defaults' are ignored.
+- PUT creates (201) or replaces (204) a resource, PATCH merges into an existing resource (204, 404 if it does not exist), POST creates a child resource (201, 409 if it exists), DELETE removes a resource (204 or 404).
+- YANG-PATCH (RFC 8072) requests to the datastore root apply all edits or none.
+- GET responses carry an ETag (the datastore revision) and Last-Modified, a matching If-None-Match is answered with 304.
+- Latency and errors can be injected: `latency` and `jitter` delay every request, `error_rate` answers requests with `error_code` (e.g. 503 or 429).
+
+StandInConnection is an httpapi compatible replacement of ansible.module_utils.connection.Connection for the collection module_utils, see restconf_e2e.py.
+
+usage: PYTHONPATH=<repo root> python tests/benchmark/restconf_server.py [--port 8888] [--latency-ms 10] [--error-rate 0.05] [--error-code 503]
+The server speaks plain HTTP, set ansible_httpapi_use_ssl to false.
+"""
+
+import argparse
+import copy
+import http.client
+import json
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote
+
+from ansible.module_utils.connection import ConnectionError
+
+DATASTORES = ("/api/data", "/restconf/data")
+YANG_DATA_JSON = "application/yang-data+json"
+YANG_PATCH_JSON = "application/yang-patch+json"
+
+# key leafs of the lists used by the collection, lists not listed here are keyed by the first leaf of their entries
+LIST_KEYS = {
+    "vlan": ["vlan-id"],
+    "interface": ["name"],
+    "server": ["address"],
+    "user": ["username"],
+    "role": ["rolename"],
+    "tenant": ["name"],
+}
+
+DEFAULT_DATASTORE = {
+    "openconfig-vlan:vlans": {"vlan": []},
+    "openconfig-interfaces:interfaces": {"interface": []},
+    "openconfig-system:system": {
+        "dns": {"config": {"search": []}},
+        "ntp": {"config": {"enabled": False}},
+    },
+}
+
+
+class RESTCONFError(Exception):
+    """A RESTCONF error response with HTTP status `code`."""
+
+    def __init__(self, code: int, tag: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.tag = tag
+        self.message = message
+
+    def contents(self) -> dict:
+        return errors(self.tag, self.message)
+
+
+def errors(tag: str, message: str) -> dict:
+    """Returns a RESTCONF (RFC 8040) errors body."""
+    return {
+        "ietf-restconf:errors": {
+            "error": [
+                {
+                    "error-type": "application",
+                    "error-tag": tag,
+                    "error-message": message,
+                }
+            ]
+        }
+    }
+
+
+def local_name(name: str) -> str:
+    return str(name).rsplit(":", 1)[-1]
+
+
+def parse_path(path: str) -> list:
+    """Returns the (name, keys) segments of the resource `path` relative to the datastore, raises RESTCONFError for paths outside of the datastores."""
+    path = path.rstrip("/")
+    for datastore in DATASTORES:
+        if path == datastore or path.startswith(datastore + "/"):
+            break
+    else:
+        raise RESTCONFError(404, "invalid-value", "uri keypath not found")
+    segments = []
+    for segment in path[len(datastore) :].split("/"):
+        if not segment:
+            continue
+        if "=" in segment:
+            name, keys = segment.split("=", 1)
+            segments.append((name, [unquote(key) for key in keys.split(",")]))
+        else:
+            segments.append((segment, None))
+    return segments
+
+
+def qualified_name(segments: list) -> str:
+    """Returns the module qualified name of the last segment (RFC 7951)."""
+    name = segments[-1][0]
+    if ":" in name:
+        return name
+    for parent, _ in reversed(segments[:-1]):
+        if ":" in parent:
+            return f"{parent.split(':', 1)[0]}:{name}"
+    return name
+
+
+def member_key(node: dict, name: str):
+    """Returns the member of `node` named `name`, module prefixes are ignored, None if there is none."""
+    if name in node:
+        return name
+    for key in node:
+        if local_name(key) == local_name(name):
+            return key
+    return None
+
+
+def entry_keys(list_name: str, entry) -> list:
+    """Returns the key values of the list `entry` as strings."""
+    if not isinstance(entry, dict):
+        return [str(entry)]
+    keys = LIST_KEYS.get(local_name(list_name))
+    if keys:
+        values = []
+        for key in keys:
+            member = member_key(entry, key)
+            values.append(None if member is None else str(entry[member]))
+        return values
+    for value in entry.values():
+        if not isinstance(value, (dict, list)):
+            return [str(value)]
+    return []
+
+
+def entry_index(entries: list, list_name: str, keys: list):
+    """Returns the index of the entry of `entries` identified by `keys`, None if there is none."""
+    for index, entry in enumerate(entries):
+        if entry_keys(list_name, entry) == keys:
+            return index
+    return None
+
+
+def merge(target, value, name: str = ""):
+    """Returns `target` with `value` merged into it, list entries are merged by their keys."""
+    if isinstance(target, dict) and isinstance(value, dict):
+        for key, child in value.items():
+            existing = member_key(target, key)
+            if existing is None:
+                target[key] = copy.deepcopy(child)
+            else:
+                target[existing] = merge(target[existing], child, key)
+        return target
+    if isinstance(target, list) and isinstance(value, list):
+        for entry in value:
+            index = entry_index(target, name, entry_keys(name, entry))
+            if index is None:
+                target.append(copy.deepcopy(entry))
+            else:
+                target[index] = merge(target[index], entry, name)
+        return target
+    return copy.deepcopy(value)
+
+
+def remove_state(value):
+    """Returns a copy of `value` without the 'state' containers, the response of 'content=config'."""
+    if isinstance(value, dict):
+        return {
+            key: remove_state(child)
+            for key, child in value.items()
+            if local_name(key) != "state"
+        }
+    if isinstance(value, list):
+        return [remove_state(entry) for entry in value]
+    return value
+
+
+class Datastore:
+    """The RESTCONF datastore of the stand-in server, an in-memory JSON tree."""
+
+    def __init__(self, data=None):
+        """Initialize the datastore with `data`, a copy of DEFAULT_DATASTORE if it is None."""
+        self.data = copy.deepcopy(DEFAULT_DATASTORE if data is None else data)
+        self.revision = 1
+        self.modified = time.time()
+        self.lock = threading.Lock()
+
+    def _parent(self, data: dict, segments: list, create=False):
+        """Returns the container of the last segment, missing containers are created with `create`."""
+        node = data
+        for name, keys in segments[:-1]:
+            key = member_key(node, name)
+            if key is None:
+                if not create or keys is not None:
+                    raise RESTCONFError(404, "invalid-value", "uri keypath not found")
+                key = name
+                node[key] = {}
+            value = node[key]
+            if keys is not None:
+                index = (
+                    entry_index(value, name, keys) if isinstance(value, list) else None
+                )
+                if index is None:
+                    raise RESTCONFError(404, "invalid-value", "uri keypath not found")
+                value = value[index]
+            if not isinstance(value, dict):
+                raise RESTCONFError(400, "invalid-value", "uri keypath not a container")
+            node = value
+        return node
+
+    def _read(self, data: dict, segments: list):
+        """Returns the value of the resource, a single entry list for list entries."""
+        if not segments:
+            return data
+        parent = self._parent(data, segments)
+        name, keys = segments[-1]
+        key = member_key(parent, name)
+        if key is None:
+            raise RESTCONFError(404, "invalid-value", "uri keypath not found")
+        value = parent[key]
+        if keys is None:
+            return value
+        index = entry_index(value, name, keys) if isinstance(value, list) else None
+        if index is None:
+            raise RESTCONFError(404, "invalid-value", "uri keypath not found")
+        return [value[index]]
+
+    @staticmethod
+    def _body(segments: list, payload):
+        """Returns the value of the request `payload`, a single member named like the target resource."""
+        if not isinstance(payload, dict) or len(payload) != 1:
+            raise RESTCONFError(400, "malformed-message", "expected a single member")
+        key, value = next(iter(payload.items()))
+        if segments and local_name(key) != local_name(segments[-1][0]):
+            raise RESTCONFError(400, "malformed-message", f"unexpected member {key}")
+        return key, value
+
+    def _put(self, data: dict, segments: list, payload) -> int:
+        if not segments:
+            if not isinstance(payload, dict):
+                raise RESTCONFError(400, "malformed-message", "expected an object")
+            data.clear()
+            data.update(copy.deepcopy(payload))
+            return 204
+        key, value = self._body(segments, payload)
+        parent = self._parent(data, segments, create=True)
+        name, keys = segments[-1]
+        existing = member_key(parent, name)
+        if keys is None:
+            parent[existing or key] = copy.deepcopy(value)
+            return 201 if existing is None else 204
+        entries = value if isinstance(value, list) else [value]
+        if len(entries) != 1 or entry_keys(name, entries[0]) != keys:
+            raise RESTCONFError(400, "invalid-value", "list keys do not match the uri")
+        target = parent.setdefault(existing or key, [])
+        index = entry_index(target, name, keys)
+        if index is None:
+            target.append(copy.deepcopy(entries[0]))
+            return 201
+        target[index] = copy.deepcopy(entries[0])
+        return 204
+
+    def _patch(self, data: dict, segments: list, payload) -> int:
+        if not segments:
+            merge(data, payload)
+            return 204
+        key, value = self._body(segments, payload)
+        current = self._read(data, segments)
+        if not isinstance(current, (dict, list)):
+            # a leaf is replaced
+            self._put(data, segments, payload)
+            return 204
+        merge(current, value, segments[-1][0])
+        return 204
+
+    def _post(self, data: dict, segments: list, payload) -> int:
+        node = self._read(data, segments)
+        if isinstance(node, list):
+            node = node[0]
+        if (
+            not isinstance(node, dict)
+            or not isinstance(payload, dict)
+            or len(payload) != 1
+        ):
+            raise RESTCONFError(400, "malformed-message", "expected a single member")
+        key, value = next(iter(payload.items()))
+        existing = member_key(node, key)
+        if isinstance(value, list):
+            target = node.setdefault(existing or key, [])
+            for entry in value:
+                if entry_index(target, key, entry_keys(key, entry)) is not None:
+                    raise RESTCONFError(409, "data-exists", "object already exists")
+                target.append(copy.deepcopy(entry))
+            return 201
+        if existing is not None:
+            raise RESTCONFError(409, "data-exists", "object already exists")
+        node[key] = copy.deepcopy(value)
+        return 201
+
+    def _delete(self, data: dict, segments: list) -> int:
+        if not segments:
+            data.clear()
+            return 204
+        parent = self._parent(data, segments)
+        name, keys = segments[-1]
+        key = member_key(parent, name)
+        if key is None:
+            raise RESTCONFError(404, "invalid-value", "uri keypath not found")
+        if keys is None:
+            del parent[key]
+            return 204
+        index = entry_index(parent[key], name, keys)
+        if index is None:
+            raise RESTCONFError(404, "invalid-value", "uri keypath not found")
+        del parent[key][index]
+        return 204
+
+    def _yang_patch(self, path: str, payload) -> tuple:
+        patch = (payload or {}).get("ietf-yang-patch:yang-patch") or {}
+        data = copy.deepcopy(self.data)
+        for edit in patch.get("edit", []):
+            segments = parse_path(path.rstrip("/") + edit.get("target", ""))
+            operation = edit.get("operation")
+            try:
+                if operation == "create":
+                    try:
+                        self._read(data, segments)
+                    except RESTCONFError:
+                        self._put(data, segments, edit.get("value"))
+                    else:
+                        raise RESTCONFError(409, "data-exists", "object already exists")
+                elif operation == "replace":
+                    self._put(data, segments, edit.get("value"))
+                elif operation == "merge":
+                    try:
+                        self._patch(data, segments, edit.get("value"))
+                    except RESTCONFError as exc:
+                        if exc.code != 404:
+                            raise
+                        self._put(data, segments, edit.get("value"))
+                elif operation in ["delete", "remove"]:
+                    try:
+                        self._delete(data, segments)
+                    except RESTCONFError:
+                        if operation == "delete":
+                            raise
+                else:
+                    raise RESTCONFError(400, "invalid-value", f"operation {operation}")
+            except RESTCONFError as exc:
+                status = {
+                    "patch-id": patch.get("patch-id"),
+                    "edit-status": {
+                        "edit": [
+                            {
+                                "edit-id": edit.get("edit-id"),
+                                "errors": exc.contents()["ietf-restconf:errors"],
+                            }
+                        ]
+                    },
+                }
+                return exc.code, {"ietf-yang-patch:yang-patch-status": status}
+        self.data = data
+        return 200, {
+            "ietf-yang-patch:yang-patch-status": {
+                "patch-id": patch.get("patch-id"),
+                "ok": [None],
+            }
+        }
+
+    def request(self, method: str, uri: str, payload=None, headers=None) -> tuple:
+        """Returns the (code, contents, headers) response of the request."""
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        path, _, query = uri.partition("?")
+        params = parse_qs(query)
+        with self.lock:
+            try:
+                segments = parse_path(path)
+                if method == "GET":
+                    etag = f'"{self.revision}"'
+                    validators = {
+                        "ETag": etag,
+                        "Last-Modified": formatdate(self.modified, usegmt=True),
+                    }
+                    if headers.get("if-none-match") == etag:
+                        return 304, None, validators
+                    value = self._read(self.data, segments)
+                    if params.get("content") == ["config"]:
+                        value = remove_state(value)
+                    contents = {qualified_name(segments): value} if segments else value
+                    return 200, copy.deepcopy(contents), validators
+                if method == "PATCH" and YANG_PATCH_JSON in headers.get(
+                    "content-type", ""
+                ):
+                    code, contents = self._yang_patch(path, payload)
+                elif method == "PUT":
+                    code, contents = self._put(self.data, segments, payload), None
+                elif method == "PATCH":
+                    code, contents = self._patch(self.data, segments, payload), None
+                elif method == "POST":
+                    code, contents = self._post(self.data, segments, payload), None
+                elif method == "DELETE":
+                    code, contents = self._delete(self.data, segments), None
+                else:
+                    raise RESTCONFError(405, "operation-not-supported", method)
+            except RESTCONFError as exc:
+                return exc.code, exc.contents(), {}
+            if code < 300:
+                self.revision += 1
+                self.modified = time.time()
+            return code, contents, {"ETag": f'"{self.revision}"'}
+
+
+class RESTCONFHandler(BaseHTTPRequestHandler):
+    """Request handler of the stand-in RESTCONF server."""
+
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, avoid the delayed ACK of persistent connections
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, code: int, contents=None, headers=None):
+        body = b"" if contents is None else json.dumps(contents).encode()
+        self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body:
+            self.send_header("Content-Type", YANG_DATA_JSON)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _handle(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        server.count(self.command)
+        delay = server.delay()
+        if delay:
+            time.sleep(delay)
+        if server.inject_error():
+            headers = {}
+            if server.retry_after is not None:
+                headers["Retry-After"] = str(server.retry_after)
+            self._respond(
+                server.error_code,
+                errors("resource-denied", "injected error"),
+                headers,
+            )
+            return
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            self._respond(400, errors("malformed-message", "invalid JSON"))
+            return
+        self._respond(
+            *server.datastore.request(self.command, self.path, payload, self.headers)
+        )
+
+    do_GET = do_PUT = do_PATCH = do_POST = do_DELETE = _handle
+
+
+class RESTCONFServer(ThreadingHTTPServer):
+    """The stand-in RESTCONF server, listening on `address` (a free port of localhost by default)."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address=("127.0.0.1", 0),
+        datastore=None,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        error_code=503,
+        retry_after=None,
+        seed=None,
+    ):
+        """Initialize the server. Requests are delayed by `latency` plus up to `jitter` seconds, a share of `error_rate` requests is answered with `error_code` (and a Retry-After header of `retry_after` seconds)."""
+        super().__init__(address, RESTCONFHandler)
+        self.datastore = datastore or Datastore()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.retry_after = retry_after
+        self.requests = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def count(self, method: str) -> None:
+        with self._lock:
+            self.requests[method] += 1
+
+    def delay(self) -> float:
+        with self._lock:
+            return self.latency + self._random.uniform(0, self.jitter)
+
+    def inject_error(self) -> bool:
+        with self._lock:
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def start(self):
+        """Serve requests in a background thread, returns the server."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving requests and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class StandInConnection:
+    """An httpapi compatible connection to a RESTCONFServer, it replaces ansible.module_utils.connection.Connection of the collection module_utils.
+
+    Responses are returned like the httpapi plugin of f5networks.f5os returns them: the status code, the parsed JSON body and the response headers. Network errors raise ConnectionError. Use `bind` to create a connection class for a server.
+    """
+
+    address = ("127.0.0.1", 8888)
+    remote_user = "admin"
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self._connection = None
+
+    @classmethod
+    def bind(cls, server):
+        """Returns a connection class sending its requests to `server`."""
+        return type(cls.__name__, (cls,), {"address": server.server_address[:2]})
+
+    def get_option(self, option):
+        return {
+            "remote_user": self.remote_user,
+            "host": self.address[0],
+            "port": self.address[1],
+        }[option]
+
+    def send_request(self, method, path, headers=None, payload=None):
+        if self._connection is None:
+            self._connection = http.client.HTTPConnection(*self.address, timeout=60)
+        body = None if payload is None else json.dumps(payload).encode()
+        try:
+            self._connection.request(method, path, body=body, headers=headers or {})
+            response = self._connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            self._connection.close()
+            self._connection = None
+            raise ConnectionError(f"{method} {path}: {exc}")
+        return {
+            "code": response.status,
+            "contents": json.loads(data) if data else {},
+            "headers": dict(response.getheaders()),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="F5OS RESTCONF stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-code", type=int, default=503)
+    parser.add_argument("--retry-after", type=int, default=None)
+    parser.add_argument("--datastore", help="JSON file with the initial datastore")
+    args = parser.parse_args()
+
+    datastore = None
+    if args.datastore:
+        with open(args.datastore, "r") as f:
+            datastore = Datastore(json.load(f))
+    server = RESTCONFServer(
+        (args.host, args.port),
+        datastore=datastore,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        error_code=args.error_code,
+        retry_after=args.retry_after,
+    )
+    print(
+        f"serving {', '.join(DATASTORES)} on http://{args.host}:{server.server_address[1]}"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
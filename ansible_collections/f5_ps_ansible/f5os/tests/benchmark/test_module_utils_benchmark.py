@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import copy
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from trees import interfaces, modified, vlans
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.diff import (
+    canonical,
+    deep_diff,
+    dicts_equal,
+    list_changes,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.normalize import (
+    normalize,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.subtree import (
+    SubtreeIndex,
+)
+
+LIST_KEYS = {"vlan": ["vlan-id"], "interface": ["name"], "server": ["address"]}
+
+
+class Test_normalize:
+    def test_normalize(self, measure, tree):
+        measure(normalize, tree)
+
+    def test_normalize_remove_state(self, measure, tree):
+        measure(normalize, tree, True)
+
+    def test_normalize_remove_keys(self, measure, tree):
+        measure(normalize, tree, True, ["counters", "interface/*/config/description"])
+
+
+class Test_compare:
+    def test_dicts_equal(self, measure, tree):
+        # equal content, reversed list order, the worst case of the comparison
+        other = copy.deepcopy(tree)
+        other["openconfig-vlan:vlans"]["vlan"].reverse()
+        assert measure(dicts_equal, tree, other) is True
+
+    def test_dicts_equal_different(self, measure, tree):
+        assert measure(dicts_equal, tree, modified(tree)) is False
+
+    def test_dicts_equal_remove_keys(self, measure, tree):
+        measure(dicts_equal, tree, modified(tree), ["state", "counters"])
+
+    def test_canonical(self, measure, tree):
+        measure(canonical, tree)
+
+    def test_canonical_lags(self, measure):
+        # LAGs with long trunk VLAN lists
+        measure(canonical, interfaces(count=0))
+
+
+class Test_diff:
+    def test_list_changes(self, measure, tree):
+        changes = measure(list_changes, tree, modified(tree), LIST_KEYS)
+        assert changes
+
+    def test_list_changes_vlans(self, measure):
+        before = vlans()
+        measure(list_changes, before, modified(before))
+
+    def test_deep_diff(self, measure, tree):
+        assert measure(deep_diff, tree, modified(tree), LIST_KEYS)
+
+
+class Test_subtree:
+    uri = "/api/data?content=config"
+
+    def test_index(self, measure, tree):
+        # the index is built by the first lookup
+        def _index():
+            subtree = SubtreeIndex(self.uri, {"code": 200, "contents": tree})
+            return subtree.get(
+                "/api/data/openconfig-vlan:vlans/vlan=4001?content=config"
+            )
+
+        assert measure(_index)["code"] == 200
+
+    def test_get(self, measure, tree):
+        subtree = SubtreeIndex(self.uri, {"code": 200, "contents": tree})
+        uris = [
+            f"/api/data/openconfig-vlan:vlans/vlan={vlan_id}?content=config"
+            for vlan_id in range(2, 4002, 10)
+        ]
+
+        def _get_all():
+            return [subtree.get(uri) for uri in uris]
+
+        responses = measure(_get_all)
+        assert all(response["code"] == 200 for response in responses)
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+import pytest
+import restconf_e2e
+from restconf_server import Datastore, RESTCONFServer, StandInConnection
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils import cache, utils
+from ansible_collections.f5_ps_ansible.f5os.plugins.modules import (
+    f5os_restconf_config,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.plugin_utils.action import (
+    ModuleShim,
+)
+
+VLANS = "/api/data/openconfig-vlan:vlans"
+
+
+def vlan(vlan_id, name):
+    return {
+        "openconfig-vlan:vlan": [
+            {"vlan-id": vlan_id, "config": {"vlan-id": vlan_id, "name": name}}
+        ]
+    }
+
+
+class Test_Datastore:
+    def test_put_get_delete(self):
+        datastore = Datastore()
+        uri = f"{VLANS}/vlan=20"
+        assert datastore.request("GET", uri)[0] == 404
+        assert datastore.request("PUT", uri, vlan(20, "a"))[0] == 201
+        assert datastore.request("PUT", uri, vlan(20, "b"))[0] == 204
+        code, contents, _ = datastore.request("GET", uri)
+        assert (code, contents) == (200, vlan(20, "b"))
+        # both datastores are the same tree, members are module qualified
+        code, contents, _ = datastore.request(
+            "GET", "/restconf/data/openconfig-vlan:vlans/vlan=20/config"
+        )
+        assert contents == {"openconfig-vlan:config": {"vlan-id": 20, "name": "b"}}
+        assert datastore.request("DELETE", uri)[0] == 204
+        assert datastore.request("DELETE", uri)[0] == 404
+
+    def test_put_keys_mismatch(self):
+        code, contents, _ = Datastore().request(
+            "PUT", f"{VLANS}/vlan=30", vlan(20, "a")
+        )
+        assert code == 400
+        assert "ietf-restconf:errors" in contents
+
+    def test_patch(self):
+        datastore = Datastore()
+        assert datastore.request("PATCH", f"{VLANS}/vlan=20", vlan(20, "a"))[0] == 404
+        datastore.request("PUT", f"{VLANS}/vlan=20", vlan(20, "a"))
+        payload = {
+            "openconfig-vlan:vlans": {"vlan": vlan(30, "c")["openconfig-vlan:vlan"]}
+        }
+        assert datastore.request("PATCH", VLANS, payload)[0] == 204
+        _, contents, _ = datastore.request("GET", VLANS)
+        assert [v["vlan-id"] for v in contents["openconfig-vlan:vlans"]["vlan"]] == [
+            20,
+            30,
+        ]
+
+    def test_post(self):
+        datastore = Datastore()
+        assert (
+            datastore.request(
+                "POST", VLANS, {"vlan": vlan(20, "a")["openconfig-vlan:vlan"]}
+            )[0]
+            == 201
+        )
+        assert (
+            datastore.request(
+                "POST", VLANS, {"vlan": vlan(20, "a")["openconfig-vlan:vlan"]}
+            )[0]
+            == 409
+        )
+
+    def test_content_config(self):
+        datastore = Datastore(
+            {
+                "openconfig-system:system": {
+                    "config": {"hostname": "f5os"},
+                    "state": {"hostname": "f5os"},
+                }
+            }
+        )
+        _, contents, _ = datastore.request(
+            "GET", "/api/data/openconfig-system:system?content=config"
+        )
+        assert contents == {
+            "openconfig-system:system": {"config": {"hostname": "f5os"}}
+        }
+
+    def test_etag(self):
+        datastore = Datastore()
+        _, _, headers = datastore.request("GET", VLANS)
+        assert (
+            datastore.request("GET", VLANS, headers={"If-None-Match": headers["ETag"]})[
+                0
+            ]
+            == 304
+        )
+        datastore.request("PUT", f"{VLANS}/vlan=20", vlan(20, "a"))
+        assert (
+            datastore.request("GET", VLANS, headers={"If-None-Match": headers["ETag"]})[
+                0
+            ]
+            == 200
+        )
+
+    def test_yang_patch(self):
+        datastore = Datastore()
+        headers = {"Content-Type": "application/yang-patch+json"}
+
+        def _patch(*edits):
+            payload = {
+                "ietf-yang-patch:yang-patch": {"patch-id": "p", "edit": list(edits)}
+            }
+            return datastore.request("PATCH", "/api/data", payload, headers)
+
+        create = {
+            "edit-id": "1",
+            "operation": "create",
+            "target": "/openconfig-vlan:vlans/vlan=20",
+            "value": vlan(20, "a"),
+        }
+        code, contents, _ = _patch(create)
+        assert utils.yang_patch_ok({"code": code, "contents": contents})
+        # all or nothing, the second edit fails
+        code, contents, _ = _patch(
+            dict(create, target="/openconfig-vlan:vlans/vlan=30", value=vlan(30, "c")),
+            create,
+        )
+        assert code == 409
+        assert not utils.yang_patch_ok({"code": code, "contents": contents})
+        assert datastore.request("GET", f"{VLANS}/vlan=30")[0] == 404
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "DEFAULT_CACHE_DIR", str(tmp_path / "cache"))
+    with RESTCONFServer() as server:
+        monkeypatch.setattr(utils, "Connection", StandInConnection.bind(server))
+        yield server
+
+
+def config_module(tmp_path, **params):
+    params = dict(
+        {
+            spec: spec_options.get("default")
+            for spec, spec_options in f5os_restconf_config.ARGUMENT_SPEC.items()
+        },
+        **params,
+    )
+    socket_path = tmp_path / "socket"
+    socket_path.touch()
+    return ModuleShim("f5os_restconf_config", params, str(socket_path))
+
+
+class Test_f5os_restconf_config:
+    uri = f"{VLANS}/vlan=20"
+
+    def test_present_absent(self, server, tmp_path):
+        for changed in [True, False]:
+            result = f5os_restconf_config.run_module(
+                config_module(tmp_path, uri=self.uri, config=vlan(20, "a"))
+            )
+            assert (result["failed"], result["changed"]) == (False, changed)
+        result = f5os_restconf_config.run_module(
+            config_module(tmp_path, uri=self.uri, state="absent")
+        )
+        assert result["changed"] is True
+        assert server.datastore.request("GET", self.uri)[0] == 404
+        assert server.requests == {"GET": 3, "PUT": 1, "DELETE": 1}
+
+    def test_retries(self, server, tmp_path, monkeypatch):
+        monkeypatch.setattr(utils.time, "sleep", lambda seconds: None)
+        server.error_rate = 1.0
+        module = config_module(tmp_path, uri=self.uri, config=vlan(20, "a"), retries=2)
+        result = f5os_restconf_config.run_module(module)
+        assert result["failed"] is True
+        assert server.requests == {"GET": 3}
+
+        server.error_rate = 0.0
+        result = f5os_restconf_config.run_module(module)
+        assert (result["failed"], result["changed"]) == (False, True)
+
+    def test_connection_error(self, server, tmp_path):
+        server.stop()
+        result = f5os_restconf_config.run_module(
+            config_module(tmp_path, uri=self.uri, config=vlan(20, "a"))
+        )
+        assert result["failed"] is True
+        assert "msg" in result
+
+
+class Test_restconf_e2e:
+    vlans = 500
+
+    def run(self, tmp_path, *options):
+        """Returns the seconds of creating the VLANs and of two unchanged runs with `options`, the second one is answered with 304 responses."""
+        args = restconf_e2e.parse_args(
+            ["--vlans", str(self.vlans), "--items", *options]
+        )
+        socket_path = tmp_path / "-".join(["socket", *options])
+        socket_path.touch()
+        results = [
+            restconf_e2e.run_scenario(args, scenario, str(socket_path))
+            for scenario in ["create", "unchanged", "unchanged", "delete"]
+        ]
+        assert [result["failed"] for result in results] == [0, 0, 0, 0]
+        return sum(result["seconds"] for result in results[:3])
+
+    def test_caches_overhead(self, server, tmp_path):
+        # the validator and fingerprint caches cost about one file access per request, not a pass over all entries
+        seconds = self.run(tmp_path)
+        for options in [
+            ["--conditional-get"],
+            ["--fingerprint", "--conditional-get"],
+        ]:
+            assert self.run(tmp_path, *options) < 3 * seconds + 1, options
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Simon Kowallik for the F5 DevCentral Community
+# GNU General Public License v3.0 (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Synthetic F5OS RESTCONF trees for the module_utils micro-benchmarks.
+
+The trees mimic the responses of a large F5OS system: thousands of VLANs, interfaces with counters, LAGs with trunk VLAN lists, DNS and NTP server lists, all with 'config' and 'state' pairs. Values are deterministic, the same tree is generated on every run.
+"""
+
+import copy
+
+VLANS = 4000
+INTERFACES = 512
+LAGS = 64
+TRUNK_VLANS = 1000
+SERVERS = 128
+
+COUNTERS = [
+    "in-octets",
+    "in-unicast-pkts",
+    "in-broadcast-pkts",
+    "in-multicast-pkts",
+    "in-discards",
+    "in-errors",
+    "out-octets",
+    "out-unicast-pkts",
+    "out-broadcast-pkts",
+    "out-multicast-pkts",
+    "out-discards",
+    "out-errors",
+]
+
+
+def vlans(count: int = VLANS) -> dict:
+    """Returns an openconfig-vlan:vlans tree with `count` VLANs."""
+    return {
+        "openconfig-vlan:vlans": {
+            "vlan": [
+                {
+                    "vlan-id": vlan_id,
+                    "config": {"vlan-id": vlan_id, "name": f"vlan-{vlan_id}"},
+                    "state": {
+                        "vlan-id": vlan_id,
+                        "name": f"vlan-{vlan_id}",
+                        "status": "ACTIVE",
+                    },
+                }
+                for vlan_id in range(2, count + 2)
+            ]
+        }
+    }
+
+
+def interfaces(count: int = INTERFACES, lags: int = LAGS) -> dict:
+    """Returns an openconfig-interfaces:interfaces tree with `count` ethernet interfaces with counters and `lags` LAGs with trunk VLAN lists."""
+    interface_list = []
+    for index in range(count):
+        name = f"{index // 32 + 1}.{index % 32 + 1}"
+        interface_list.append(
+            {
+                "name": name,
+                "config": {
+                    "name": name,
+                    "type": "iana-if-type:ethernetCsmacd",
+                    "description": f"port {name}",
+                    "enabled": True,
+                },
+                "state": {
+                    "name": name,
+                    "type": "iana-if-type:ethernetCsmacd",
+                    "enabled": True,
+                    "oper-status": "UP",
+                    "counters": {
+                        counter: index * 1000003 + position
+                        for position, counter in enumerate(COUNTERS)
+                    },
+                },
+                "openconfig-if-ethernet:ethernet": {
+                    "config": {
+                        "auto-negotiate": "false",
+                        "openconfig-if-aggregate:aggregate-id": f"lag-{index % lags}",
+                    },
+                    "state": {
+                        "port-speed": "openconfig-if-ethernet:SPEED_100GB",
+                        "negotiated-duplex-mode": "FULL",
+                        "counters": {"in-fcs-errors": 0, "in-crc-errors": index},
+                    },
+                },
+            }
+        )
+    for index in range(lags):
+        name = f"lag-{index}"
+        interface_list.append(
+            {
+                "name": name,
+                "config": {
+                    "name": name,
+                    "type": "iana-if-type:ieee8023adLag",
+                    "enabled": "true",
+                },
+                "state": {"name": name, "oper-status": "UP", "enabled": True},
+                "openconfig-if-aggregate:aggregation": {
+                    "config": {
+                        "lag-type": "LACP",
+                        "f5-if-aggregate:distribution-hash": "src-dst-ipport",
+                    },
+                    "state": {"lag-type": "LACP", "lag-speed": 200000},
+                    "openconfig-vlan:switched-vlan": {
+                        "config": {
+                            "native-vlan": 2 + index,
+                            "trunk-vlans": list(range(2, TRUNK_VLANS + 2)),
+                        }
+                    },
+                },
+            }
+        )
+    return {"openconfig-interfaces:interfaces": {"interface": interface_list}}
+
+
+def system(servers: int = SERVERS) -> dict:
+    """Returns an openconfig-system:system tree with `servers` DNS and NTP servers."""
+
+    def _server(address, port, extra):
+        config = dict({"address": address, "port": port}, **extra)
+        return {"address": address, "config": config, "state": dict(config)}
+
+    return {
+        "openconfig-system:system": {
+            "dns": {
+                "config": {"search": [f"d{i}.example.net" for i in range(servers)]},
+                "servers": {
+                    "server": [
+                        _server(f"192.0.2.{i % 254 + 1}:{i}", 53, {})
+                        for i in range(servers)
+                    ]
+                },
+            },
+            "ntp": {
+                "config": {"enabled": "true"},
+                "state": {"enabled": True},
+                "servers": {
+                    "server": [
+                        _server(
+                            f"198.51.100.{i % 254 + 1}:{i}",
+                            123,
+                            {"f5-openconfig-system-ntp:key-id": i, "prefer": "false"},
+                        )
+                        for i in range(servers)
+                    ]
+                },
+            },
+        }
+    }
+
+
+def datastore() -> dict:
+    """Returns a datastore tree with VLANs, interfaces, LAGs and system settings."""
+    return dict(**vlans(), **interfaces(), **system())
+
+
+def modified(tree: dict, every: int = 10) -> dict:
+    """Returns a deep copy of the datastore `tree` with every `every`th VLAN renamed, the last VLAN removed and the VLAN list reversed."""
+    tree = copy.deepcopy(tree)
+    vlan_list = tree["openconfig-vlan:vlans"]["vlan"]
+    for vlan in vlan_list[::every]:
+        vlan["config"]["name"] += "-renamed"
+    vlan_list.pop()
+    vlan_list.reverse()
+    return tree
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures of the unit tests: a fake device API replacing the persistent connection of utils and ModuleShims of the collection modules. The caches of all tests are stored below their tmp_path.
+"""
+
+import pytest
+from ansible.module_utils.connection import ConnectionError
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils import cache, utils
+from ansible_collections.f5_ps_ansible.f5os.plugins.plugin_utils.action import (
+    ModuleShim,
+)
+
+
+class FakeConnection:
+    """Connection to a FakeAPI, replaces ansible.module_utils.connection.Connection."""
+
+    def __init__(self, api, socket_path):
+        self.api = api
+        self.socket_path = socket_path
+
+    def get_option(self, option):
+        if self.api.options is None:
+            raise ConnectionError(f"option {option} is not available")
+        return self.api.options[option]
+
+    def send_request(self, method, path, headers=None, payload=None):
+        headers = headers or {}
+        self.api.requests.append((method, path, headers, payload))
+        return self.api.respond(method, path, headers, payload)
+
+
+class FakeAPI:
+    """Stand-in for the API of a device.
+
+    Requests are recorded in `requests` as (method, path, headers, payload) tuples and answered by `respond`. By default GET requests are answered from `responses` by path, with or without the query. A path has a response or a list of responses which are returned in order, the last one is repeated; exceptions are raised. Other paths answer 404, other methods 204.
+
+    The connection options (see device_identity) are `options`, None if they are not available.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.responses = {}
+        self.options = None
+        self.respond = self.respond_get
+
+    def connection(self, socket_path):
+        return FakeConnection(self, socket_path)
+
+    def respond_get(self, method, path, headers, payload):
+        if method != "GET":
+            return {"code": 204, "contents": {}}
+        response = self.responses.get(path, self.responses.get(path.split("?", 1)[0]))
+        if isinstance(response, list):
+            response = response.pop(0) if len(response) > 1 else response[0]
+        if response is None:
+            return {"code": 404, "contents": {}}
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def paths(self, *methods):
+        """Returns the (method, path) of the recorded requests, of `methods` only if set."""
+        return [
+            (method, path)
+            for method, path, _, _ in self.requests
+            if not methods or method in methods
+        ]
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Returns the FakeAPI behind the connections of APIClient."""
+    api = FakeAPI()
+    monkeypatch.setattr(utils, "Connection", api.connection)
+    return api
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Returns the directory of the caches of a test, it replaces DEFAULT_CACHE_DIR."""
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setattr(cache, "DEFAULT_CACHE_DIR", cache_dir)
+    return cache_dir
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    """Returns the socket path of the persistent connection of a test, the socket exists while the test runs."""
+    socket_path = tmp_path / "socket"
+    socket_path.touch()
+    return str(socket_path)
+
+
+@pytest.fixture
+def module_shim(socket_path):
+    """Returns a factory of ModuleShims of a collection module, its parameters are the defaults of the module's ARGUMENT_SPEC updated with `params`."""
+
+    def _module_shim(module, check_mode=False, diff=False, **params):
+        defaults = {
+            spec: spec_options.get("default")
+            for spec, spec_options in module.ARGUMENT_SPEC.items()
+        }
+        return ModuleShim(
+            module.__name__.rsplit(".", 1)[-1],
+            dict(defaults, **params),
+            socket_path,
+            check_mode,
+            diff,
+        )
+
+    return _module_shim
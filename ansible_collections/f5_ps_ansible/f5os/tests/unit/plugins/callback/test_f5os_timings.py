@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+from ansible_collections.f5_ps_ansible.f5os.plugins.callback.f5os_timings import (
+    TimingsReport,
+    format_report,
+    percentile,
+)
+
+VLANS = "/api/data/openconfig-vlan:vlans"
+
+
+def call(method, uri, ms, status=200, source="api", bytes=100):
+    return {
+        "method": method,
+        "uri": uri,
+        "status": status,
+        "bytes": bytes,
+        "ms": ms,
+        "source": source,
+    }
+
+
+def result(*calls):
+    return {
+        "changed": False,
+        "timings": {"total_ms": 1, "api_calls": list(calls), "phases": {}},
+    }
+
+
+class Test_percentile:
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 90) == 90
+        assert percentile(values, 99) == 99
+        assert percentile([], 50) == 0
+
+
+class Test_TimingsReport:
+    def test_report(self):
+        timings_report = TimingsReport()
+        timings_report.add(
+            "f5os1",
+            result(
+                call("GET", f"{VLANS}?content=config", 10),
+                call("PUT", f"{VLANS}/vlan=20", 30, status=204, bytes=0),
+            ),
+        )
+        # a loop with two items fetching the same resource again
+        timings_report.add(
+            "f5os1",
+            {
+                "results": [
+                    result(call("GET", f"{VLANS}?content=config", 20)),
+                    result(call("GET", f"{VLANS}?content=config", 5, source="cache")),
+                ]
+            },
+        )
+        timings_report.add("f5os2", result(call("GET", VLANS, 40)))
+        timings_report.add("f5os2", {"changed": False})
+
+        report = timings_report.report()
+        assert report["totals"]["requests"] == 4
+        assert report["totals"]["local"] == 1
+        assert report["totals"]["redundant_gets"] == 1
+        assert report["hosts"]["f5os1"] == {
+            "requests": 3,
+            "local": 1,
+            "bytes": 200,
+            "ms": 60.0,
+            "redundant_gets": 1,
+            "retries": 0,
+            "throttled_ms": 0,
+        }
+        assert report["redundant_gets"] == [
+            {"host": "f5os1", "uri": f"{VLANS}?content=config", "count": 2}
+        ]
+        get_vlans = report["endpoints"][0]
+        assert (get_vlans["method"], get_vlans["uri"], get_vlans["count"]) == (
+            "GET",
+            VLANS,
+            3,
+        )
+        assert (get_vlans["p50"], get_vlans["max"]) == (20, 40)
+
+    def test_throttling(self):
+        timings_report = TimingsReport()
+        for _ in range(2):
+            timings = result(call("GET", VLANS, 10, status=503), call("GET", VLANS, 10))
+            timings["timings"]["throttling"] = {
+                "rate_limited": 1,
+                "rate_limit_ms": 100.0,
+                "retries": 1,
+                "retry_ms": 500.0,
+            }
+            timings_report.add("f5os1", timings)
+        report = timings_report.report()
+        assert report["hosts"]["f5os1"]["retries"] == 2
+        assert report["totals"]["throttled_ms"] == 1200.0
+
+    def test_format_report(self):
+        timings_report = TimingsReport()
+        timings_report.add(
+            "f5os1", result(call("GET", VLANS, 10), call("GET", VLANS, 10))
+        )
+        lines = format_report(timings_report.report(), top=5)
+        assert lines[0].startswith("requests: 2,")
+        assert any(
+            "GET /api/data/openconfig-vlan:vlans fetched 2 times" in line
+            for line in lines
+        )
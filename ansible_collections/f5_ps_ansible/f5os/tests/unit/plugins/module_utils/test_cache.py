@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+
+import pytest
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils import cache
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.cache import (
+    ResponseCache,
+    device_dir,
+    remove_stale_dirs,
+    uris_overlap,
+)
+
+
+class Test_uris_overlap:
+    @pytest.mark.parametrize(
+        "uri1, uri2, result",
+        [
+            ("/api/data/a/b", "/api/data/a/b", True),
+            ("/api/data/a/b", "/api/data/a", True),
+            ("/api/data/a", "/api/data/a/b/c", True),
+            ("/api/data/a/b/", "/api/data/a/b?depth=1", True),
+            ("/api/data/vlans/vlan=20", "/api/data/vlans/vlan", True),
+            ("/api/data/vlans/vlan=20", "/api/data/vlans/vlan=30", False),
+            ("/api/data/a/b", "/api/data/a/bc", False),
+            ("/api/data/a", "/restconf/data/a", False),
+        ],
+    )
+    def test_overlap(self, uri1, uri2, result):
+        assert uris_overlap(uri1, uri2) == result
+
+
+class Test_cache_dirs:
+    def test_private(self, cache_dir, socket_path):
+        path = device_dir(socket_path)
+        ResponseCache(path).set("/api/data/a", {"code": 200, "contents": {}})
+        assert os.stat(cache_dir).st_mode & 0o777 == 0o700
+        assert os.stat(path).st_mode & 0o777 == 0o700
+
+    def test_other_user(self, monkeypatch, cache_dir, socket_path):
+        """a directory of another user is not used"""
+        path = device_dir(socket_path)
+        os.makedirs(path, mode=0o700)
+        uid = os.geteuid()
+        monkeypatch.setattr(cache.os, "geteuid", lambda: uid + 1)
+        response_cache = ResponseCache(path)
+        response_cache.set("/api/data/a", {"code": 200, "contents": {}})
+        assert response_cache.get("/api/data/a") is None
+        assert os.listdir(path) == []
+
+    def test_symlink(self, tmp_path, cache_dir, socket_path):
+        """a symlinked directory is not used"""
+        target = tmp_path / "target"
+        target.mkdir(mode=0o700)
+        os.makedirs(cache_dir, mode=0o700)
+        os.symlink(target, device_dir(socket_path))
+        ResponseCache(device_dir(socket_path)).set(
+            "/api/data/a", {"code": 200, "contents": {}}
+        )
+        assert os.listdir(target) == []
+
+    def test_no_follow(self, tmp_path, cache_dir, socket_path):
+        """a symlink planted as entry is not written through"""
+        victim = tmp_path / "victim"
+        victim.write_text("data")
+        response_cache = ResponseCache(device_dir(socket_path))
+        response_cache.set("/api/data/b", {"code": 200, "contents": {}})
+        os.symlink(victim, response_cache._entry_path("/api/data/a"))
+        response_cache.set("/api/data/a", {"code": 200, "contents": {}})
+        assert victim.read_text() == "data"
+        assert response_cache.get("/api/data/a") is None
+
+    def test_remove_stale_dirs(self, tmp_path, cache_dir):
+        response = {"code": 200, "contents": {}}
+        sockets = [tmp_path / "socket1", tmp_path / "socket2"]
+        for socket_path in sockets:
+            socket_path.touch()
+            ResponseCache(device_dir(socket_path), socket_path=str(socket_path)).set(
+                "/api/data/a", response
+            )
+        # kept across persistent connections
+        ResponseCache(device_dir("admin@f5os@443")).set("/api/data/a", response)
+        sockets[0].unlink()
+        remove_stale_dirs()
+        remaining = [device_dir(sockets[1]), device_dir("admin@f5os@443")]
+        assert sorted(os.listdir(cache_dir)) == sorted(
+            os.path.basename(path) for path in remaining
+        )
+
+
+class Test_ResponseCache:
+    response = {"code": 200, "contents": {"k": "v"}}
+
+    def test_get_set(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        assert cache.get("/api/data/a") is None
+        cache.set("/api/data/a", self.response)
+        assert cache.get("/api/data/a") == self.response
+        # shared by another instance (task) for the same device
+        assert ResponseCache(str(tmp_path)).get("/api/data/a") == self.response
+
+    def test_ttl(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), ttl=0)
+        cache.set("/api/data/a", self.response)
+        time.sleep(0.01)
+        assert cache.get("/api/data/a") is None
+
+    def test_lru(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_entries=2)
+        cache.set("/api/data/a", self.response)
+        cache.set("/api/data/b", self.response)
+        cache.get("/api/data/a")
+        cache.set("/api/data/c", self.response)
+        assert cache.get("/api/data/a") == self.response
+        assert cache.get("/api/data/b") is None
+        assert cache.get("/api/data/c") == self.response
+
+    def test_invalidate(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        cache.set("/api/data/a/b=1", self.response)
+        cache.set("/api/data/c", self.response)
+        # a disabled cache still invalidates
+        ResponseCache(str(tmp_path), enabled=False).invalidate("/api/data/a")
+        assert cache.get("/api/data/a/b=1") is None
+        assert cache.get("/api/data/c") == self.response
+
+    def test_invalidate_child(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        cache.set("/api/data/a", self.response)
+        cache.invalidate("/api/data/a/b=1")
+        assert cache.get("/api/data/a") is None
+        assert cache.get_partial("/api/data/a") == (self.response, ["/api/data/a/b=1"])
+
+    def test_disabled(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), enabled=False)
+        cache.set("/api/data/a", self.response)
+        assert cache.get("/api/data/a") is None
+
+    def test_get_validated(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), name="validator")
+        cache.set("/api/data/a", self.response)
+        assert cache.get_validated("/api/data/a") == (None, {})
+        cache.set("/api/data/a", self.response, {"If-None-Match": '"1"'})
+        assert cache.get_validated("/api/data/a") == (
+            self.response,
+            {"If-None-Match": '"1"'},
+        )
+        # separated from the response cache in the same directory
+        assert ResponseCache(str(tmp_path)).get("/api/data/a") is None
+
+    def test_get_does_not_write(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        cache.set("/api/data/a", self.response)
+        files = {p.name: p.stat().st_mtime_ns for p in tmp_path.iterdir()}
+        time.sleep(0.01)
+        assert cache.get("/api/data/a") == self.response
+        changed = [
+            p.name for p in tmp_path.iterdir() if p.stat().st_mtime_ns != files[p.name]
+        ]
+        # only the access time of the entry is updated
+        assert changed == [os.path.basename(cache._entry_path("/api/data/a"))]
+
+    def test_eviction_watermark(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_entries=20)
+        uris = [f"/api/data/a={i}" for i in range(21)]
+        for uri in uris:
+            cache.set(uri, self.response)
+        cached = [uri for uri in uris if cache.get(uri) is not None]
+        # evicted down to 90% of the limit, the least recently used first
+        assert cached == uris[3:]
+        assert cache._uris() == uris[3:]
+
+    def test_replace(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_entries=2)
+        cache.set("/api/data/a", self.response)
+        cache.invalidate("/api/data/a/b")
+        for _ in range(3):
+            cache.set("/api/data/a", {"code": 200, "contents": {}})
+        # a new response is not dirty, it is counted once
+        assert cache.get("/api/data/a") == {"code": 200, "contents": {}}
+        cache.set("/api/data/b", self.response)
+        assert cache.get("/api/data/a") is not None
@@ -0,0 +1,473 @@
+# -*- coding: utf-8 -*-
+import sys
+
+import pytest
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.diff import (
+    changes_add_deep_diff,
+    dicts_equal,
+    list_changes,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.subtree import (
+    list_keys_lookup,
+)
+
+try:
+    import deepdiff
+
+    DEEPDIFF_INSTALLED = True
+except ImportError:
+    DEEPDIFF_INSTALLED = False
+
+
+class Test_dicts_equal:
+    _one_num_int = {"1": 1}
+    _one_str_int = {"1": "1"}
+    _one_num_flt = {"1": 1.0}
+    _one_str_flt = {"1": "1.0"}
+
+    _list_order_a = {"k": [_one_num_int, _one_str_int, "x", 1, "y"]}
+    _list_order_b = {"k": [_one_str_int, _one_num_int, "y", "x", "1"]}
+
+    def test_simple_int_str(self):
+        d1 = {"k": self._one_num_int}
+        d2 = {"k": self._one_str_int}
+        assert dicts_equal(d1, d2) == True
+
+    def test_simple_float_str(self):
+        d1 = {"k": self._one_num_flt}
+        d2 = {"k": self._one_str_flt}
+        assert dicts_equal(d1, d2) == True
+
+    def test_list_order(self):
+        assert dicts_equal(self._list_order_a, self._list_order_b) == True
+
+    def test_advanced_12(self):
+        d1 = {"k": {"l": ["a", 1.0, {"a": self._list_order_a}]}}
+        d2 = {"k": {"l": ["a", "1.0", {"a": self._list_order_b}]}}
+        assert dicts_equal(d1, d2) == True
+
+    def test_advanced_21(self):
+        d1 = {"k": {"l": ["a", 1.0, {"a": self._list_order_a}]}}
+        d2 = {"k": {"l": ["a", "1.0", {"a": self._list_order_b}]}}
+        assert dicts_equal(d2, d1) == True
+
+    def test_remove_keys_path(self):
+        d1 = {"a": {"l": [{"x": 1, "y": 1}]}, "y": 1}
+        d2 = {"a": {"l": [{"x": 1, "y": 2}]}, "y": 1}
+        assert dicts_equal(d1, d2, ["/a/l/*/y"]) == True
+        assert dicts_equal(d1, d2, ["/a/y"]) == False
+        assert dicts_equal(d1, d2, ["y"]) == True
+        assert dicts_equal(d1, dict(d2, y=2), ["/a/l/*/y"]) == False
+
+    def test_not_equal_advanced(self):
+        d1 = {"k": {"l": ["a", 1.0, {"a": ["1", {"a": 1}]}]}}
+        d2 = {"k": {"l": ["a", "1.0", {"a": ["1", {"a": "2"}]}]}}
+        assert dicts_equal(d2, d1) == False
+
+    @pytest.mark.parametrize(
+        "d1, d2, result",
+        [
+            ({1: 2}, {1: 2}, True),  # equal
+            ({1: 2}, {1: "2"}, True),  # equal
+            ({1: 2}, {"1": 2}, False),  # type of keys different
+            ({1: 2}, {1: "1"}, False),
+            ({1: 2}, {1: 1}, False),
+            ({}, {}, True),
+        ],
+    )
+    def test_comparisons(self, d1, d2, result):
+        assert dicts_equal(d1, d2) == result
+
+    @pytest.mark.parametrize(
+        "d1, d2, result",
+        [
+            ([1, 2], {1: 2}, False),
+            (None, {1: 2}, False),
+            ("", {1: 2}, False),
+            (0, {1: 2}, False),
+        ],
+    )
+    def test_types(self, d1, d2, result):
+        assert dicts_equal(d1, d2) == result
+
+    @pytest.mark.parametrize(
+        "d1, d2, result",
+        [
+            (
+                {
+                    "one": [
+                        {
+                            "t": "1",
+                            "1": True,
+                            "k": "a",
+                        },
+                        {"t": "2", "l": ["a", 2, "c"]},
+                        [1, 2, 3, False, True],
+                    ],
+                    "list": [
+                        1,
+                        2,
+                        3,
+                    ],
+                },
+                {
+                    "one": [
+                        {"t": "1", "k": "a", "1": True},
+                        [1, 3, 2, True, False],
+                        {"t": "2", "l": ["a", 2, "c"]},
+                    ],
+                    "list": [
+                        2,
+                        1,
+                        3,
+                    ],
+                },
+                True,
+            ),
+            (
+                {
+                    "one": [
+                        {
+                            "t": "XXX",
+                            "1": True,
+                            "k": "a",
+                        },
+                        {"t": "2", "l": ["a", 2, "c"]},
+                        [1, 2, 3, False, True],
+                    ],
+                    "list": [
+                        1,
+                        2,
+                        3,
+                    ],
+                },
+                {
+                    "one": [
+                        {"t": "1", "k": "a", "1": True},
+                        [1, 3, 2, True, False],
+                        {"t": "2", "l": ["a", 2, "c"]},
+                    ],
+                    "list": [
+                        2,
+                        1,
+                        3,
+                    ],
+                },
+                False,
+            ),
+            (
+                {
+                    "one": [
+                        {
+                            "t": "1",
+                            "1": True,
+                            "k": "a",
+                        },
+                        {"t": "2", "l": ["a", 2, "c"]},
+                        [1, 2, 3, False, True],
+                    ],
+                    "list": [
+                        1,
+                        2,
+                        3,
+                    ],
+                },
+                {
+                    "one": [
+                        {"t": "1", "k": "a", "1": False},
+                        [1, 3, 2, True, False],
+                        {"t": "2", "l": ["a", 2, "c"]},
+                    ],
+                    "list": [
+                        2,
+                        1,
+                        3,
+                    ],
+                },
+                False,
+            ),
+            (
+                {
+                    "one": [
+                        {
+                            "t": "1",
+                            "1": True,
+                            "k": "a",
+                        },
+                        {"t": "2", "l": ["a", 2, "c"]},
+                        [1, 2, 3, False, True],
+                    ],
+                    "list": [
+                        1,
+                        2,
+                        3,
+                    ],
+                },
+                {
+                    "one": [
+                        {"t": "1", "k": "a", "1": True},
+                        [1, 99999, 2, True, False],
+                        {"t": "2", "l": ["a", 2, "c"]},
+                    ],
+                    "list": [
+                        2,
+                        1,
+                        3,
+                    ],
+                },
+                False,
+            ),
+            (
+                {
+                    "one": [
+                        {
+                            "t": "1",
+                            "1": True,
+                            "k": "a",
+                        },
+                        {"t": "2", "l": ["a", 2, "XXXX"]},
+                        [1, 2, 3, False, True],
+                    ],
+                    "list": [
+                        1,
+                        2,
+                        3,
+                    ],
+                },
+                {
+                    "one": [
+                        {"t": "1", "k": "a", "1": True},
+                        [1, 3, 2, True, False],
+                        {"t": "2", "l": ["a", 2, "c"]},
+                    ],
+                    "list": [
+                        2,
+                        1,
+                        3,
+                    ],
+                },
+                False,
+            ),
+            (
+                {
+                    "one": [
+                        {
+                            "t": "1",
+                            "1": True,
+                            "k": "a",
+                        },
+                        {"t": "2", "l": ["a", 2, "c"]},
+                        [1, 2, 3, False, True],
+                    ],
+                    "list": [
+                        1,
+                        2,
+                        3,
+                    ],
+                },
+                {
+                    "one": [
+                        {"t": "1", "k": "a", "1": True},
+                        [1, 3, 2, True, False],
+                        {"t": "2", "l": ["XXXX", 2, "c"]},
+                    ],
+                    "list": [
+                        2,
+                        1,
+                        3,
+                    ],
+                },
+                False,
+            ),
+        ],
+    )
+    def test_deep(self, d1, d2, result):
+        assert dicts_equal(d1, d2) == result
+
+    def test_mutation(self):
+        """must not mutate input dictionaries"""
+        d1 = {"list": [{"key1": "IGNORE!", "key2": 2}]}
+        d2 = {"list": [{"key1": 1, "key2": 2}]}
+
+        assert dicts_equal(d1, d2, remove_keys=["key1"]) == True
+        assert d2 == {"list": [{"key1": 1, "key2": 2}]}
+        assert d1 == {"list": [{"key1": "IGNORE!", "key2": 2}]}
+
+    @pytest.mark.parametrize(
+        "d1, d2, result",
+        [
+            ({"l": [1, 1, 2]}, {"l": [1, 2, 2]}, False),  # multiset, counts matter
+            ({"l": [1, 2, 1]}, {"l": ["1", "1", 2]}, True),
+            ({"l": [{"a": 1}, {"a": 1}]}, {"l": [{"a": "1"}, {"a": 1}]}, True),
+            ({"l": [{"a": 1}]}, {"l": ["{'a': 1}"]}, False),  # dict vs string
+            ({"l": [[1, 2]]}, {"l": [[2, 1]]}, True),
+        ],
+    )
+    def test_multiset(self, d1, d2, result):
+        assert dicts_equal(d1, d2) == result
+
+
+class Test_changes_add_deep_diff:
+    def test_no_diff(self):
+        changes = {"before": {}, "after": {}}
+        changes_add_deep_diff(changes)
+        assert "diff" not in changes
+
+    def test_diff(self):
+        changes = {"before": {"a": 1}, "after": {"a": 2}}
+        changes_add_deep_diff(changes)
+        assert "diff" in changes
+        assert changes["diff"] == {
+            "values_changed": {"root['a']": {"new_value": 2, "old_value": 1}}
+        }
+
+    def test_no_deepdiff(self, monkeypatch):
+        """the diff does not depend on deepdiff"""
+        changes = {"before": {"a": 1}, "after": {"a": 2}}
+        # mock ImportError
+        monkeypatch.setitem(sys.modules, "deepdiff", None)
+        changes_add_deep_diff(changes)
+        assert "diff" in changes
+
+    def test_report_types(self):
+        changes = {
+            "before": {"d": {"k": "v"}, "l": ["1", "2", {"x": "1"}], "t": 1},
+            "after": {"n": {"z": "1"}, "l": ["2", "3", {"x": "2"}], "t": "1"},
+        }
+        changes_add_deep_diff(changes)
+        assert changes["diff"] == {
+            "dictionary_item_removed": {"root['d']": {"k": "v"}},
+            "dictionary_item_added": {"root['n']": {"z": "1"}},
+            "iterable_item_removed": {"root['l'][0]": "1", "root['l'][2]": {"x": "1"}},
+            "iterable_item_added": {"root['l'][1]": "3", "root['l'][2]": {"x": "2"}},
+            "type_changes": {
+                "root['t']": {
+                    "old_type": "int",
+                    "new_type": "str",
+                    "old_value": 1,
+                    "new_value": "1",
+                }
+            },
+        }
+
+    def test_keyed_list(self):
+        changes = {
+            "before": {"vlan": [{"vlan-id": "1", "n": "a"}, {"vlan-id": "2"}]},
+            "after": {"vlan": [{"vlan-id": "3"}, {"vlan-id": "1", "n": "b"}]},
+        }
+        changes_add_deep_diff(changes)
+        assert changes["diff"] == {
+            "values_changed": {
+                "root['vlan'][1]['n']": {"new_value": "b", "old_value": "a"}
+            },
+            "iterable_item_removed": {"root['vlan'][1]": {"vlan-id": "2"}},
+            "iterable_item_added": {"root['vlan'][0]": {"vlan-id": "3"}},
+        }
+
+    def test_list_order(self):
+        changes = {"before": {"l": ["1", "2", "2"]}, "after": {"l": ["2", "1", "2"]}}
+        changes_add_deep_diff(changes)
+        assert "diff" not in changes
+
+    def test_memo(self):
+        """the diff reuses the representations of the comparison"""
+        before = {"l": [{"a": "1", "n": ["1"]}, {"a": "2"}], "k": {"x": "1"}}
+        after = {"l": [{"a": "3", "n": ["1"]}, {"a": "2"}], "k": {"x": "1"}}
+        memo = {}
+        assert dicts_equal(before, after, ["/k/x"], memo) == False
+        assert dicts_equal(before, after) == False
+        represented = set(memo)
+        assert id(before["l"][0]) in represented
+        assert id(before["k"]) not in represented  # keys to remove
+
+        changes = {"before": before, "after": after}
+        changes_add_deep_diff(changes, memo=memo)
+        assert set(memo) == represented
+        expected = {"before": before, "after": after}
+        changes_add_deep_diff(expected)
+        assert changes["diff"] == expected["diff"]
+
+    @pytest.mark.skipif(not DEEPDIFF_INSTALLED, reason="deepdiff not installed")
+    def test_same_as_deepdiff(self):
+        before = {"a": "1", "d": {"k": "v", "x": ["1", "2"]}, "r": "x"}
+        after = {"a": "2", "d": {"k": "v", "x": ["2", "1", "3"]}, "n": "y"}
+        changes = {"before": before, "after": after}
+        changes_add_deep_diff(changes)
+        assert (
+            changes["diff"]
+            == deepdiff.DeepDiff(
+                before, after, ignore_order=True, verbose_level=2
+            ).to_dict()
+        )
+
+
+class Test_list_changes:
+    before = {
+        "openconfig-vlan:vlans": {
+            "vlan": [
+                {"vlan-id": "1", "config": {"name": "a"}},
+                {"vlan-id": "2", "config": {"name": "b"}},
+            ]
+        },
+        "l": ["1", "2", "2"],
+    }
+    after = {
+        "openconfig-vlan:vlans": {
+            "vlan": [
+                {"vlan-id": "3", "config": {"name": "c"}},
+                {"vlan-id": "1", "config": {"name": "x"}},
+            ]
+        },
+        "l": ["2", "1", "3"],
+    }
+
+    def test_remove_keys_path(self):
+        changes = list_changes(
+            self.before,
+            self.after,
+            remove_keys=["/openconfig-vlan:vlans/vlan/*/config"],
+        )
+        assert changes["openconfig-vlan:vlans/vlan"] == {
+            "added": [{"vlan-id": "3"}],
+            "removed": [{"vlan-id": "2"}],
+        }
+
+    def test_list_keys_lookup(self):
+        assert list_keys_lookup("openconfig-vlan:vlan") == ["vlan-id"]
+        assert list_keys_lookup("unknown") is None
+        assert list_keys_lookup("unknown", {"unknown": "id"}) == ["id"]
+        assert list_keys_lookup("vlan", {"vlan": ["name"]}) == ["name"]
+
+    def test_keyed(self):
+        assert list_changes(self.before, self.after)["openconfig-vlan:vlans/vlan"] == {
+            "added": [{"vlan-id": "3", "config": {"name": "c"}}],
+            "removed": [{"vlan-id": "2", "config": {"name": "b"}}],
+            "changed": [
+                {
+                    "before": {"vlan-id": "1", "config": {"name": "a"}},
+                    "after": {"vlan-id": "1", "config": {"name": "x"}},
+                }
+            ],
+        }
+
+    def test_unkeyed(self):
+        assert list_changes(self.before, self.after)["l"] == {
+            "added": ["3"],
+            "removed": ["2"],
+        }
+
+    def test_nested(self):
+        before = {"interface": [{"name": "lag1", "trunk-vlans": ["1", "2"]}]}
+        after = {"interface": [{"name": "lag1", "trunk-vlans": ["1"]}]}
+        assert list_changes(before, after)["interface=lag1/trunk-vlans"] == {
+            "removed": ["2"]
+        }
+
+    def test_remove_keys(self):
+        before = {"vlan": [{"vlan-id": "1", "members": ["a"]}]}
+        after = {"vlan": [{"vlan-id": "1", "members": ["b"]}]}
+        assert list_changes(before, after, remove_keys=["members"]) == {}
+
+    def test_equal(self):
+        assert list_changes(self.before, self.before) == {}
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+import jmespath
+import pytest
+from ansible.errors import AnsibleFilterError
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.json_query import (
+    _compile,
+    json_query,
+)
+
+
+class Test_json_query:
+    data = {"a": {"b": [{"c": "1"}, {"c": "2"}]}}
+
+    def test_query(self):
+        assert json_query(self.data, "a.b[?c == '2'].c") == ["2"]
+
+    def test_compiled_once(self):
+        _compile.cache_clear()
+        json_query(self.data, "a.b[0]")
+        json_query(self.data, "a.b[0]")
+        assert _compile.cache_info().hits == 1
+        assert _compile.cache_info().misses == 1
+
+    def test_types_map_idempotent(self):
+        json_query(self.data, "a")
+        types_map = dict(jmespath.functions.REVERSE_TYPES_MAP)
+        json_query(self.data, "a")
+        assert jmespath.functions.REVERSE_TYPES_MAP == types_map
+        assert "AnsibleUnsafeText" in types_map["string"]
+
+    def test_invalid_expression(self):
+        with pytest.raises(AnsibleFilterError):
+            json_query(self.data, "a.[")
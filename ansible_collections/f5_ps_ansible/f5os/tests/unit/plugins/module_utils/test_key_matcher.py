@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.key_matcher import (
+    KeyMatcher,
+    prune,
+)
+
+VLANS = {
+    "openconfig-vlan:vlans": {
+        "vlan": [
+            {
+                "vlan-id": 20,
+                "config": {"vlan-id": 20, "name": "v20"},
+                "members": {"member": [{"interface": "lag1"}]},
+            },
+        ]
+    },
+    "members": ["kept unless ignored by name"],
+}
+
+
+class Test_KeyMatcher:
+    def _matches(self, patterns, path):
+        matcher = KeyMatcher(patterns)
+        state, matched = matcher.start, False
+        for key in path:
+            state, matched = matcher.step(state, key)
+        return matched
+
+    @pytest.mark.parametrize(
+        "patterns, path, expected",
+        [
+            (["members"], ["members"], True),
+            (["members"], ["a", "b", 0, "members"], True),
+            (["members"], ["members", "member"], False),
+            (["/a/b"], ["a", "b"], True),
+            (["/a/b"], ["b"], False),
+            (["/a/b"], ["x", "a", "b"], False),
+            (["/a/*/c"], ["a", 3, "c"], True),
+            (["/a/*/c"], ["a", "c"], False),
+            (["**/passphrase"], ["passphrase"], True),
+            (["**/passphrase"], ["a", 0, "b", "passphrase"], True),
+            (["/a/**/c"], ["a", "c"], True),
+            (["/a/**/c"], ["a", "x", "y", "c"], True),
+            (["/f5-*:state"], ["f5-lldp:state"], True),
+            (["/f5-*:state"], ["openconfig:state"], False),
+            (["f5-*:state"], ["f5-lldp:state"], True),
+            (["f5-*:state"], ["a", 0, "f5-lldp:state"], True),
+            ([], ["a"], False),
+        ],
+    )
+    def test_matches(self, patterns, path, expected):
+        assert self._matches(patterns, path) == expected
+
+    def test_empty_state(self):
+        matcher = KeyMatcher(["/a/b"])
+        state, matched = matcher.step(matcher.start, "x")
+        assert state == KeyMatcher.EMPTY and matched is False
+        assert matcher.step(state, "b") == (KeyMatcher.EMPTY, False)
+
+
+class Test_prune:
+    def test_path_pattern(self):
+        result = prune(VLANS, ["/openconfig-vlan:vlans/vlan/*/members"])
+        assert "members" not in result["openconfig-vlan:vlans"]["vlan"][0]
+        assert result["members"] == VLANS["members"]
+
+    def test_key_name(self):
+        result = prune(VLANS, ["members"])
+        assert "members" not in result
+        assert "members" not in result["openconfig-vlan:vlans"]["vlan"][0]
+
+    def test_key_name_wildcard(self):
+        assert prune({"a": {"f5-x:state": 1, "b": 2}}, ["f5-*:state"]) == {
+            "a": {"b": 2}
+        }
+
+    def test_not_mutated(self):
+        prune(VLANS, ["members", "config"])
+        assert "members" in VLANS["openconfig-vlan:vlans"]["vlan"][0]
+        assert "config" in VLANS["openconfig-vlan:vlans"]["vlan"][0]
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.normalize import (
+    normalize,
+)
+
+
+class Test_remove_keys:
+    def test_remove_keys(self):
+        data = {
+            "key1": "value1",
+            "key2": "value2",
+            "key3": "value3",
+        }
+        keys = ["key1", "key2"]
+        expected = {
+            "key3": "value3",
+        }
+        assert normalize(data, remove_keys=keys) == expected
+
+    def test_remove_keys_not_present(self):
+        data = {
+            "key1": "value1",
+            "key2": "value2",
+            "key3": "value3",
+        }
+        keys = ["key4", "key5"]
+        expected = {
+            "key1": "value1",
+            "key2": "value2",
+            "key3": "value3",
+        }
+        assert normalize(data, remove_keys=keys) == expected
+
+    def test_nested_remove_keys(self):
+        data = {
+            "key1": "value1",
+            "key2": "value2",
+            "key3": {
+                "key4": "value4",
+                "key5": "value5",
+            },
+        }
+        keys = ["key4"]
+        expected = {
+            "key1": "value1",
+            "key2": "value2",
+            "key3": {
+                "key5": "value5",
+            },
+        }
+        assert normalize(data, remove_keys=keys) == expected
+
+
+class Test_numbers:
+    d_1 = {
+        "k": 1,
+        "d": {"k": 1},
+        "l": ["1", 2.0, 3],
+        "l2": ["1", {"k": 1}, [1, 2.0, "3"]],
+        "s": "str",
+        "n": "9",
+    }
+    d_2 = {
+        "k": "1",
+        "d": {"k": "1"},
+        "l": ["1", "2.0", "3"],
+        "l2": ["1", {"k": "1"}, ["1", "2.0", "3"]],
+        "s": "str",
+        "n": "9",
+    }
+    d1 = {"d": d_1, "l": [d_1]}
+    d2 = {"d": d_2, "l": [d_2]}
+
+    def test_1(self):
+        # copy of d1 matches d2
+        assert normalize(self.d1) == self.d2
+        # type of d1["d"]["k"] is int (no change!)
+        assert type(self.d1["d"]["k"]) == int
+
+    def test_2(self):
+        assert normalize(self.d_1) == self.d_2
+        # type of d1["d"]["k"] is int (no change!)
+        assert type(self.d_1["d"]["k"]) == int
+
+
+class Test_remove_state:
+    TEST_NTP = [
+        {
+            "openconfig-system:servers": {
+                "server": [
+                    {
+                        "address": "192.0.2.123",
+                        "config": {
+                            "address": "192.0.2.123",
+                            "port": 123,
+                            "version": 4,
+                            "association-type": "SERVER",
+                            "iburst": False,
+                            "prefer": False,
+                        },
+                    }
+                ]
+            }
+        },
+        {
+            "openconfig-system:servers": {
+                "server": [
+                    {
+                        "address": "192.0.2.123",
+                        "config": {
+                            "address": "192.0.2.123",
+                            "port": 123,
+                            "version": 4,
+                            "association-type": "SERVER",
+                            "iburst": False,
+                            "prefer": False,
+                        },
+                        "state": {
+                            "address": "192.0.2.123",
+                            "port": 123,
+                            "version": 4,
+                            "association-type": "SERVER",
+                            "iburst": False,
+                            "prefer": False,
+                            "f5-openconfig-system-ntp:authenticated": False,
+                        },
+                    }
+                ]
+            }
+        },
+    ]
+
+    def test_remove_state(self):
+        testdata = {"key": {"list": [{"config": "entry1", "state": "entry1"}]}}
+        expected = {"key": {"list": [{"config": "entry1"}]}}
+
+        assert normalize(testdata, remove_state=True) == expected
+
+    def test_leave_other_types_untouched(self):
+        testdata = {
+            "key": [{"state": {"k": "v"}, "config": {"k": "v"}}],
+            "types": [{"state": {"k": "v"}, "config": {"k": "v"}}, "str", [1]],
+        }
+        expected = {
+            "key": [{"config": {"k": "v"}}],
+            "types": [{"config": {"k": "v"}}, "str", ["1"]],
+        }
+
+        assert normalize(testdata, remove_state=True) == expected
+
+    def test_keep_state_property_without_config_present(self):
+        testdata = {
+            "key": {
+                "list": [{"config": "entry1", "state": "entry1"}, {"state": "entry2"}]
+            }
+        }
+        expected = {"key": {"list": [{"config": "entry1"}, {"state": "entry2"}]}}
+
+        assert normalize(testdata, remove_state=True) == expected
+
+    def test_keep_state_property_without_config_present_contains(self):
+        testdata = {
+            "key": {
+                "list": [
+                    {"prop1:config": "entry1", "prop1:state": "entry1"},
+                    {"prop2:state": "entry2"},
+                ]
+            }
+        }
+        expected = {
+            "key": {"list": [{"prop1:config": "entry1"}, {"prop2:state": "entry2"}]}
+        }
+
+        assert normalize(testdata, remove_state=True) == expected
+
+    def test_keep_state_property_without_config_present_contains_exact(self):
+        testdata = {
+            "key": {
+                "list": [
+                    {"propX:config": "entry1", "propX:state": "entry1"},
+                    {"propY:config": "entry2", "propZ:state": "entry2"},
+                ]
+            }
+        }
+        expected = {
+            "key": {
+                "list": [
+                    {"propX:config": "entry1"},
+                    {"propY:config": "entry2", "propZ:state": "entry2"},
+                ]
+            }
+        }
+
+        assert normalize(testdata, remove_state=True) == expected
+
+    def test_ntp(self):
+        assert normalize(self.TEST_NTP[1], remove_state=True) == normalize(
+            self.TEST_NTP[0]
+        )
+
+
+class Test_bools:
+    def test_bools(self):
+        test_data = {
+            "k1": [
+                "true",
+                "True",
+                "false",
+                "False",
+                "str",
+                1,
+                1.0,
+                True,
+                False,
+                {"True": "true"},
+            ],
+            "k2": {"k1": "true", "k2": "True", "k3": "false", "k4": "False"},
+        }
+        expected_data = {
+            "k1": [
+                True,
+                True,
+                False,
+                False,
+                "str",
+                "1",
+                "1.0",
+                True,
+                False,
+                {"True": True},
+            ],
+            "k2": {"k1": True, "k2": True, "k3": False, "k4": False},
+        }
+
+        assert normalize(test_data) == expected_data
+
+
+class Test_normalize:
+    data = {
+        "k": 1,
+        "b": "True",
+        "l": ["1", 2.0, "false", True, [3, {"n": 4}]],
+        "openconfig-system:servers": Test_remove_state.TEST_NTP[1][
+            "openconfig-system:servers"
+        ],
+        "secret": "x",
+    }
+
+    def test_remove_state(self):
+        assert normalize(self.data, remove_state=True) == {
+            "k": "1",
+            "b": True,
+            "l": ["1", "2.0", False, True, ["3", {"n": "4"}]],
+            "openconfig-system:servers": {
+                "server": [
+                    {
+                        "address": "192.0.2.123",
+                        "config": {
+                            "address": "192.0.2.123",
+                            "port": "123",
+                            "version": "4",
+                            "association-type": "SERVER",
+                            "iburst": False,
+                            "prefer": False,
+                        },
+                    }
+                ]
+            },
+            "secret": "x",
+        }
+
+    def test_no_mutation(self):
+        import copy
+
+        data = copy.deepcopy(self.data)
+        normalize(data, remove_state=True, remove_keys=["secret"])
+        assert data == self.data
+
+    def test_remove_keys(self):
+        result = normalize(
+            {"secret": 1, "d": {"secret": 2, "k": 3}, "l": [{"secret": 4}]},
+            remove_keys=["secret"],
+        )
+        assert result == {"d": {"k": "3"}, "l": [{}]}
+
+    def test_remove_keys_path(self):
+        result = normalize(
+            {"secret": 1, "d": {"secret": 2, "k": 3}, "l": [{"secret": 4}]},
+            remove_keys=["/l/*/secret", "/secret"],
+        )
+        assert result == {"d": {"secret": "2", "k": "3"}, "l": [{}]}
+
+    def test_keep_state(self):
+        data = {"list": [{"config": "c", "state": "s"}]}
+        assert normalize(data) == data
+
+    @pytest.mark.parametrize("data", [None, "str", 1])
+    def test_other_types(self, data):
+        assert normalize(data) == data
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.subtree import (
+    SubtreeIndex,
+    parse_uri,
+    qualified_name,
+)
+
+PREFIX = "/api/data/openconfig-interfaces:interfaces"
+INTERFACES = {
+    "code": 200,
+    "contents": {
+        "openconfig-interfaces:interfaces": {
+            "interface": [
+                {
+                    "name": "1.0",
+                    "config": {"name": "1.0", "enabled": True},
+                },
+                {
+                    "name": "lag1",
+                    "config": {"name": "lag1"},
+                    "openconfig-if-aggregate:aggregation": {
+                        "openconfig-vlan:switched-vlan": {
+                            "config": {"trunk-vlans": [20, 30]}
+                        }
+                    },
+                },
+            ]
+        }
+    },
+}
+TRUNK_VLANS = "/interface=lag1/openconfig-if-aggregate:aggregation/openconfig-vlan:switched-vlan/config/trunk-vlans"
+
+
+class Test_parse_uri:
+    def test_parse_uri(self):
+        assert parse_uri(
+            "/restconf/data/openconfig-vlan:vlans/vlan=20/config?depth=1"
+        ) == [("openconfig-vlan:vlans", None), ("vlan", ["20"]), ("config", None)]
+
+    def test_parse_uri_keys(self):
+        assert parse_uri("/api/data/a:list=k1,1%2F1.0") == [("a:list", ["k1", "1/1.0"])]
+
+    @pytest.mark.parametrize(
+        "uri, result",
+        [
+            ("/api/data/openconfig-vlan:vlans/vlan=20", "openconfig-vlan:vlan"),
+            (PREFIX + TRUNK_VLANS + "=20", "openconfig-vlan:trunk-vlans"),
+            ("/api/data/openconfig-system:system", "openconfig-system:system"),
+        ],
+    )
+    def test_qualified_name(self, uri, result):
+        assert qualified_name(parse_uri(uri)) == result
+
+
+class Test_SubtreeIndex:
+    def test_leaf_list_entry(self):
+        index = SubtreeIndex(PREFIX, INTERFACES)
+        assert index.get(PREFIX + TRUNK_VLANS + "=20") == {
+            "code": 200,
+            "contents": {"openconfig-vlan:trunk-vlans": [20]},
+        }
+        assert index.get(PREFIX + TRUNK_VLANS + "=40") == {"code": 404, "contents": {}}
+
+    def test_list_entry(self):
+        index = SubtreeIndex(PREFIX, INTERFACES)
+        assert index.get(PREFIX + "/interface=1.0/config") == {
+            "code": 200,
+            "contents": {
+                "openconfig-interfaces:config": {"name": "1.0", "enabled": True}
+            },
+        }
+        assert index.get(PREFIX + "/interface=2.0/config")["code"] == 404
+
+    def test_parent_list_entry(self):
+        contents = INTERFACES["contents"]["openconfig-interfaces:interfaces"]
+        response = {
+            "code": 200,
+            "contents": {"openconfig-interfaces:interface": [contents["interface"][1]]},
+        }
+        index = SubtreeIndex(PREFIX + "/interface=lag1", response)
+        assert index.get(PREFIX + "/interface=lag1/config") == {
+            "code": 200,
+            "contents": {"openconfig-interfaces:config": {"name": "lag1"}},
+        }
+
+    def test_parent_absent(self):
+        index = SubtreeIndex(PREFIX, {"code": 404, "contents": {}})
+        assert index.get(PREFIX + "/interface=1.0")["code"] == 404
+
+    @pytest.mark.parametrize("code", [400, 401, 500])
+    def test_parent_failed(self, code):
+        index = SubtreeIndex(PREFIX, {"code": code, "contents": {}})
+        assert index.get(PREFIX + "/interface=1.0") is None
+
+    def test_not_covered(self):
+        index = SubtreeIndex(PREFIX, INTERFACES)
+        assert index.get(PREFIX) is None
+        assert index.get(PREFIX + "/interface=1.0?depth=1") is None
+        assert index.get("/api/data/openconfig-vlan:vlans") is None
+
+    def test_query(self):
+        index = SubtreeIndex(PREFIX + "?content=config", INTERFACES)
+        assert index.get(PREFIX + "/interface=1.0/config?content=config") is not None
+        assert index.get(PREFIX + "/interface=1.0/config") is None
+        index = SubtreeIndex(PREFIX + "?depth=2", INTERFACES)
+        assert index.get(PREFIX + "/interface=1.0/config?depth=2") is None
+
+    def test_dirty(self):
+        index = SubtreeIndex(PREFIX, INTERFACES)
+        index.mark_dirty(PREFIX + TRUNK_VLANS + "=20")
+        assert index.get(PREFIX + TRUNK_VLANS + "=20") is None
+        assert index.get(PREFIX + "/interface=lag1/config") is not None
+
+    def test_datastore_root(self):
+        assert parse_uri("/api/data?content=config") == []
+        index = SubtreeIndex("/api/data?content=config", INTERFACES)
+        assert index.get(PREFIX + "/interface=1.0/config?content=config") == {
+            "code": 200,
+            "contents": {
+                "openconfig-interfaces:config": {"name": "1.0", "enabled": True}
+            },
+        }
+
+    def test_list_entry_by_key_leaf(self):
+        # 'b' is the value of a non-key leaf of entry 'a'
+        response = {
+            "code": 200,
+            "contents": {
+                "m:things": {
+                    "thing": [{"name": "a", "peer": "b"}, {"name": "b", "peer": "a"}]
+                }
+            },
+        }
+        index = SubtreeIndex(
+            "/api/data/m:things", response, list_keys={"thing": "name"}
+        )
+        assert index.get("/api/data/m:things/thing=b") == {
+            "code": 200,
+            "contents": {"m:thing": [{"name": "b", "peer": "a"}]},
+        }
+        assert index.get("/api/data/m:things/thing=c")["code"] == 404
+
+    def test_list_entry_key_order(self):
+        response = {
+            "code": 200,
+            "contents": {
+                "m:c": {"l": [{"k1": "x", "k2": "y"}, {"k1": "y", "k2": "x"}]}
+            },
+        }
+        index = SubtreeIndex("/api/data/m:c", response, list_keys={"l": ["k1", "k2"]})
+        assert index.get("/api/data/m:c/l=y,x")["contents"] == {
+            "m:l": [{"k1": "y", "k2": "x"}]
+        }
+        # a different number of keys is answered by the API
+        assert index.get("/api/data/m:c/l=y") is None
+
+    def test_unknown_list_keys(self):
+        response = {"code": 200, "contents": {"m:c": {"l": [{"k1": "x", "k2": "y"}]}}}
+        index = SubtreeIndex("/api/data/m:c", response)
+        assert index.get("/api/data/m:c/l=y,x") is None
+        assert index.get("/api/data/m:c/l=x,y") is None
+
+    def test_parent_list_entry_unknown_keys(self):
+        entries = [{"k": "a", "v": 1}, {"k": "b", "v": 2}]
+        response = {"code": 200, "contents": {"m:l": entries}}
+        assert (
+            SubtreeIndex("/api/data/m:l=b", response).get("/api/data/m:l=b/v") is None
+        )
+        response = {"code": 200, "contents": {"m:l": entries[1:]}}
+        index = SubtreeIndex("/api/data/m:l=b", response)
+        assert index.get("/api/data/m:l=b/v")["contents"] == {"m:v": 2}
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils import throttle
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.throttle import (
+    RateLimiter,
+    retry_after,
+    retry_delay,
+    retryable,
+)
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+class Test_retry:
+    def test_retry_after(self):
+        assert retry_after({"headers": {"Retry-After": "2"}}) == 2.0
+        assert retry_after({"headers": {"retry-after": "-1"}}) == 0.0
+        assert (
+            retry_after({"headers": {"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"}})
+            is None
+        )
+        assert retry_after({"code": 503}) is None
+
+    def test_retry_delay(self):
+        for attempt, (low, high) in enumerate([(0.25, 0.5), (0.5, 1.0), (1.0, 2.0)]):
+            assert low <= retry_delay(attempt) <= high
+        assert retry_delay(20) <= throttle.MAX_BACKOFF
+        assert retry_delay(3, {"headers": {"Retry-After": "1"}}) == 1.0
+
+    @pytest.mark.parametrize(
+        "method, response, result",
+        [
+            ("GET", {"code": 503}, True),
+            ("PUT", {"code": 429}, True),
+            ("DELETE", None, True),
+            ("GET", {"code": 500}, False),
+            ("GET", {"code": 200}, False),
+            ("POST", {"code": 503}, False),
+            ("PATCH", None, False),
+        ],
+    )
+    def test_retryable(self, method, response, result):
+        assert retryable(method, response) is result
+
+
+class Test_RateLimiter:
+    @pytest.fixture
+    def fake_time(self, monkeypatch):
+        fake_time = FakeTime()
+        monkeypatch.setattr(throttle, "time", fake_time)
+        return fake_time
+
+    def test_disabled(self, fake_time, tmp_path):
+        rate_limiter = RateLimiter(str(tmp_path / "ratelimit.json"))
+        assert [rate_limiter.acquire() for _ in range(10)] == [0.0] * 10
+        assert not (tmp_path / "ratelimit.json").exists()
+
+    def test_rate(self, fake_time, tmp_path):
+        rate_limiter = RateLimiter(str(tmp_path / "ratelimit.json"), rate=2)
+        # a burst of two requests, the following requests wait for their tokens
+        assert [rate_limiter.acquire() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+        assert fake_time.sleeps == [0.5, 1.0]
+        fake_time.now += 10
+        assert rate_limiter.acquire() == 0.0
+
+    def test_shared(self, fake_time, tmp_path):
+        # instances of other forks share the bucket file
+        path = str(tmp_path / "ratelimit.json")
+        assert RateLimiter(path, rate=1).acquire() == 0.0
+        assert RateLimiter(path, rate=1).acquire() == 1.0
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.timing import (
+    Timings,
+    response_bytes,
+)
+
+
+class Test_Timings:
+    def test_record(self):
+        timings = Timings(enabled=True)
+        timings.record_call(
+            "GET", "/api/data/a", {"code": 200, "contents": {"k": 1}}, 0.5
+        )
+        with timings.phase("compare"):
+            pass
+        with timings.phase("compare"):
+            pass
+        result = timings.result()
+        assert result["api_calls"] == [
+            {
+                "method": "GET",
+                "uri": "/api/data/a",
+                "status": 200,
+                "bytes": 7,
+                "ms": 500.0,
+                "source": "api",
+            }
+        ]
+        assert result["phases"]["compare"]["count"] == 2
+        assert result["total_ms"] >= 0
+
+    def test_disabled(self):
+        timings = Timings()
+        timings.record_call("GET", "/api/data/a", {"code": 200}, 0.5)
+        with timings.phase("compare"):
+            pass
+        assert timings.api_calls == []
+        assert timings.phases == {}
+
+    def test_response_bytes(self):
+        assert response_bytes({"code": 204, "contents": {}}) == 0
+        assert response_bytes({"code": 200, "contents": {"a": [1, 2]}}) == 11
+
+    def test_record_wait(self):
+        timings = Timings(enabled=True)
+        timings.record_wait("rate_limit", 0.0)
+        timings.record_wait("rate_limit", 0.25)
+        timings.record_wait("retry", 0.5)
+        assert timings.result()["throttling"] == {
+            "rate_limited": 1,
+            "rate_limit_ms": 250.0,
+            "retries": 1,
+            "retry_ms": 500.0,
+        }
@@ -1,538 +1,262 @@
 # -*- coding: utf-8 -*-
-import sys
 
 import pytest
+from ansible.module_utils.connection import ConnectionError
 
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils import utils
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.cache import (
+    ResponseCache,
+)
 from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.utils import (
-    changes_add_deep_diff,
-    dicts_equal,
-    format_bool_values,
-    number_values_to_string,
-    recurse_remove_keys,
-    remove_state_property,
+    add_query,
+    datastore_target,
+    query_params,
+    response_validators,
+    yang_patch_edit,
+    yang_patch_ok,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.plugin_utils.action import (
+    ModuleShim,
 )
 
-try:
-    import deepdiff
-
-    DEEPDIFF_INSTALLED = True
-except ImportError:
-    DEEPDIFF_INSTALLED = False
-
-
-class Test_recurse_remove_keys:
-    def test_remove_keys(self):
-        data = {
-            "key1": "value1",
-            "key2": "value2",
-            "key3": "value3",
-        }
-        keys = ["key1", "key2"]
-        expected = {
-            "key3": "value3",
-        }
-        assert recurse_remove_keys(data, keys) == expected
-
-    def test_remove_keys_not_present(self):
-        data = {
-            "key1": "value1",
-            "key2": "value2",
-            "key3": "value3",
-        }
-        keys = ["key4", "key5"]
-        expected = {
-            "key1": "value1",
-            "key2": "value2",
-            "key3": "value3",
-        }
-        assert recurse_remove_keys(data, keys) == expected
-
-    def test_nested_remove_keys(self):
-        data = {
-            "key1": "value1",
-            "key2": "value2",
-            "key3": {
-                "key4": "value4",
-                "key5": "value5",
-            },
-        }
-        keys = ["key4"]
-        expected = {
-            "key1": "value1",
-            "key2": "value2",
-            "key3": {
-                "key5": "value5",
-            },
-        }
-        assert recurse_remove_keys(data, keys) == expected
-
-
-class Test_number_values_to_string:
-    d_1 = {
-        "k": 1,
-        "d": {"k": 1},
-        "l": ["1", 2.0, 3],
-        "l2": ["1", {"k": 1}, [1, 2.0, "3"]],
-        "s": "str",
-        "n": "9",
-    }
-    d_2 = {
-        "k": "1",
-        "d": {"k": "1"},
-        "l": ["1", "2.0", "3"],
-        "l2": ["1", {"k": "1"}, ["1", "2.0", "3"]],
-        "s": "str",
-        "n": "9",
-    }
-    d1 = {"d": d_1, "l": [d_1]}
-    d2 = {"d": d_2, "l": [d_2]}
-
-    def test_1(self):
-        # copy of d1 matches d2
-        assert number_values_to_string(self.d1) == self.d2
-        # type of d1["d"]["k"] is int (no change!)
-        assert type(self.d1["d"]["k"]) == int
-
-    def test_2(self):
-        assert number_values_to_string(self.d_1) == self.d_2
-        # type of d1["d"]["k"] is int (no change!)
-        assert type(self.d_1["d"]["k"]) == int
-
-
-class Test_dicts_equal:
-    _one_num_int = {"1": 1}
-    _one_str_int = {"1": "1"}
-    _one_num_flt = {"1": 1.0}
-    _one_str_flt = {"1": "1.0"}
-
-    _list_order_a = {"k": [_one_num_int, _one_str_int, "x", 1, "y"]}
-    _list_order_b = {"k": [_one_str_int, _one_num_int, "y", "x", "1"]}
-
-    def test_simple_int_str(self):
-        d1 = {"k": self._one_num_int}
-        d2 = {"k": self._one_str_int}
-        assert dicts_equal(d1, d2) == True
-
-    def test_simple_float_str(self):
-        d1 = {"k": self._one_num_flt}
-        d2 = {"k": self._one_str_flt}
-        assert dicts_equal(d1, d2) == True
-
-    def test_list_order(self):
-        assert dicts_equal(self._list_order_a, self._list_order_b) == True
-
-    def test_advanced_12(self):
-        d1 = {"k": {"l": ["a", 1.0, {"a": self._list_order_a}]}}
-        d2 = {"k": {"l": ["a", "1.0", {"a": self._list_order_b}]}}
-        assert dicts_equal(d1, d2) == True
-
-    def test_advanced_21(self):
-        d1 = {"k": {"l": ["a", 1.0, {"a": self._list_order_a}]}}
-        d2 = {"k": {"l": ["a", "1.0", {"a": self._list_order_b}]}}
-        assert dicts_equal(d2, d1) == True
-
-    def test_not_equal_advanced(self):
-        d1 = {"k": {"l": ["a", 1.0, {"a": ["1", {"a": 1}]}]}}
-        d2 = {"k": {"l": ["a", "1.0", {"a": ["1", {"a": "2"}]}]}}
-        assert dicts_equal(d2, d1) == False
-
-    @pytest.mark.parametrize(
-        "d1, d2, result",
-        [
-            ({1: 2}, {1: 2}, True),  # equal
-            ({1: 2}, {1: "2"}, True),  # equal
-            ({1: 2}, {"1": 2}, False),  # type of keys different
-            ({1: 2}, {1: "1"}, False),
-            ({1: 2}, {1: 1}, False),
-            ({}, {}, True),
-        ],
-    )
-    def test_comparisons(self, d1, d2, result):
-        assert dicts_equal(d1, d2) == result
 
+class Test_yang_patch:
     @pytest.mark.parametrize(
-        "d1, d2, result",
+        "uri, expected",
         [
-            ([1, 2], {1: 2}, False),
-            (None, {1: 2}, False),
-            ("", {1: 2}, False),
-            (0, {1: 2}, False),
+            (
+                "/api/data/openconfig-vlan:vlans/vlan=20",
+                ("/api/data", "/openconfig-vlan:vlans/vlan=20"),
+            ),
+            (
+                "/restconf/data/openconfig-system:system/dns/",
+                ("/restconf/data", "/openconfig-system:system/dns"),
+            ),
+            ("/restconf/data", ("/restconf/data", "/")),
         ],
     )
-    def test_types(self, d1, d2, result):
-        assert dicts_equal(d1, d2) == result
+    def test_datastore_target(self, uri, expected):
+        assert datastore_target(uri) == expected
+
+    def test_yang_patch_edit(self):
+        assert yang_patch_edit(1, "merge", "/a", {"a": "1"}) == {
+            "edit-id": "1",
+            "operation": "merge",
+            "target": "/a",
+            "value": {"a": "1"},
+        }
+        assert yang_patch_edit(2, "delete", "/a", {"a": "1"}) == {
+            "edit-id": "2",
+            "operation": "delete",
+            "target": "/a",
+        }
 
     @pytest.mark.parametrize(
-        "d1, d2, result",
+        "api_response, result",
         [
+            ({"code": 204, "contents": {}}, True),
             (
                 {
-                    "one": [
-                        {
-                            "t": "1",
-                            "1": True,
-                            "k": "a",
-                        },
-                        {"t": "2", "l": ["a", 2, "c"]},
-                        [1, 2, 3, False, True],
-                    ],
-                    "list": [
-                        1,
-                        2,
-                        3,
-                    ],
-                },
-                {
-                    "one": [
-                        {"t": "1", "k": "a", "1": True},
-                        [1, 3, 2, True, False],
-                        {"t": "2", "l": ["a", 2, "c"]},
-                    ],
-                    "list": [
-                        2,
-                        1,
-                        3,
-                    ],
+                    "code": 200,
+                    "contents": {
+                        "ietf-yang-patch:yang-patch-status": {
+                            "patch-id": "p",
+                            "ok": [None],
+                        }
+                    },
                 },
                 True,
             ),
             (
                 {
-                    "one": [
-                        {
-                            "t": "XXX",
-                            "1": True,
-                            "k": "a",
-                        },
-                        {"t": "2", "l": ["a", 2, "c"]},
-                        [1, 2, 3, False, True],
-                    ],
-                    "list": [
-                        1,
-                        2,
-                        3,
-                    ],
-                },
-                {
-                    "one": [
-                        {"t": "1", "k": "a", "1": True},
-                        [1, 3, 2, True, False],
-                        {"t": "2", "l": ["a", 2, "c"]},
-                    ],
-                    "list": [
-                        2,
-                        1,
-                        3,
-                    ],
-                },
-                False,
-            ),
-            (
-                {
-                    "one": [
-                        {
-                            "t": "1",
-                            "1": True,
-                            "k": "a",
-                        },
-                        {"t": "2", "l": ["a", 2, "c"]},
-                        [1, 2, 3, False, True],
-                    ],
-                    "list": [
-                        1,
-                        2,
-                        3,
-                    ],
-                },
-                {
-                    "one": [
-                        {"t": "1", "k": "a", "1": False},
-                        [1, 3, 2, True, False],
-                        {"t": "2", "l": ["a", 2, "c"]},
-                    ],
-                    "list": [
-                        2,
-                        1,
-                        3,
-                    ],
-                },
-                False,
-            ),
-            (
-                {
-                    "one": [
-                        {
-                            "t": "1",
-                            "1": True,
-                            "k": "a",
-                        },
-                        {"t": "2", "l": ["a", 2, "c"]},
-                        [1, 2, 3, False, True],
-                    ],
-                    "list": [
-                        1,
-                        2,
-                        3,
-                    ],
-                },
-                {
-                    "one": [
-                        {"t": "1", "k": "a", "1": True},
-                        [1, 99999, 2, True, False],
-                        {"t": "2", "l": ["a", 2, "c"]},
-                    ],
-                    "list": [
-                        2,
-                        1,
-                        3,
-                    ],
-                },
-                False,
-            ),
-            (
-                {
-                    "one": [
-                        {
-                            "t": "1",
-                            "1": True,
-                            "k": "a",
-                        },
-                        {"t": "2", "l": ["a", 2, "XXXX"]},
-                        [1, 2, 3, False, True],
-                    ],
-                    "list": [
-                        1,
-                        2,
-                        3,
-                    ],
-                },
-                {
-                    "one": [
-                        {"t": "1", "k": "a", "1": True},
-                        [1, 3, 2, True, False],
-                        {"t": "2", "l": ["a", 2, "c"]},
-                    ],
-                    "list": [
-                        2,
-                        1,
-                        3,
-                    ],
-                },
-                False,
-            ),
-            (
-                {
-                    "one": [
-                        {
-                            "t": "1",
-                            "1": True,
-                            "k": "a",
-                        },
-                        {"t": "2", "l": ["a", 2, "c"]},
-                        [1, 2, 3, False, True],
-                    ],
-                    "list": [
-                        1,
-                        2,
-                        3,
-                    ],
-                },
-                {
-                    "one": [
-                        {"t": "1", "k": "a", "1": True},
-                        [1, 3, 2, True, False],
-                        {"t": "2", "l": ["XXXX", 2, "c"]},
-                    ],
-                    "list": [
-                        2,
-                        1,
-                        3,
-                    ],
+                    "code": 200,
+                    "contents": {
+                        "ietf-yang-patch:yang-patch-status": {
+                            "patch-id": "p",
+                            "edit-status": {
+                                "edit": [
+                                    {"edit-id": "1", "ok": [None]},
+                                    {"edit-id": "2", "errors": {"error": []}},
+                                ]
+                            },
+                        }
+                    },
                 },
                 False,
             ),
+            ({"code": 400, "contents": {}}, False),
         ],
     )
-    def test_deep(self, d1, d2, result):
-        assert dicts_equal(d1, d2) == result
-
-    def test_mutation(self):
-        """must not mutate input dictionaries"""
-        d1 = {"list": [{"key1": "IGNORE!", "key2": 2}]}
-        d2 = {"list": [{"key1": 1, "key2": 2}]}
-
-        assert dicts_equal(d1, d2, remove_keys=["key1"]) == True
-        assert d2 == {"list": [{"key1": 1, "key2": 2}]}
-
-
-class Test_remove_state_property:
-    TEST_NTP = [
-        {
-            "openconfig-system:servers": {
-                "server": [
-                    {
-                        "address": "192.0.2.123",
-                        "config": {
-                            "address": "192.0.2.123",
-                            "port": 123,
-                            "version": 4,
-                            "association-type": "SERVER",
-                            "iburst": False,
-                            "prefer": False,
-                        },
-                    }
-                ]
-            }
-        },
-        {
-            "openconfig-system:servers": {
-                "server": [
-                    {
-                        "address": "192.0.2.123",
-                        "config": {
-                            "address": "192.0.2.123",
-                            "port": 123,
-                            "version": 4,
-                            "association-type": "SERVER",
-                            "iburst": False,
-                            "prefer": False,
-                        },
-                        "state": {
-                            "address": "192.0.2.123",
-                            "port": 123,
-                            "version": 4,
-                            "association-type": "SERVER",
-                            "iburst": False,
-                            "prefer": False,
-                            "f5-openconfig-system-ntp:authenticated": False,
-                        },
-                    }
-                ]
-            }
-        },
-    ]
-
-    def test_remove_state_property(self):
-        testdata = {"key": {"list": [{"config": "entry1", "state": "entry1"}]}}
-        expected = {"key": {"list": [{"config": "entry1"}]}}
-
-        assert remove_state_property(testdata) == expected
-
-    def test_leave_other_types_untouched(self):
-        testdata = test_data = {
-            "key": [{"state": {"k": "v"}, "config": {"k": "v"}}],
-            "types": [{"state": {"k": "v"}, "config": {"k": "v"}}, "str", [1]],
-        }
-        expected = {
-            "key": [{"config": {"k": "v"}}],
-            "types": [{"config": {"k": "v"}}, "str", [1]],
-        }
-
-        assert remove_state_property(testdata) == expected
-
-    def test_keep_state_property_without_config_present(self):
-        testdata = {
-            "key": {
-                "list": [{"config": "entry1", "state": "entry1"}, {"state": "entry2"}]
-            }
-        }
-        expected = {"key": {"list": [{"config": "entry1"}, {"state": "entry2"}]}}
-
-        assert remove_state_property(testdata) == expected
-
-    def test_keep_state_property_without_config_present_contains(self):
-        testdata = {
-            "key": {
-                "list": [
-                    {"prop1:config": "entry1", "prop1:state": "entry1"},
-                    {"prop2:state": "entry2"},
-                ]
-            }
-        }
-        expected = {
-            "key": {"list": [{"prop1:config": "entry1"}, {"prop2:state": "entry2"}]}
-        }
+    def test_yang_patch_ok(self, api_response, result):
+        assert yang_patch_ok(api_response) == result
 
-        assert remove_state_property(testdata) == expected
 
-    def test_keep_state_property_without_config_present_contains_exact(self):
-        testdata = {
-            "key": {
-                "list": [
-                    {"propX:config": "entry1", "propX:state": "entry1"},
-                    {"propY:config": "entry2", "propZ:state": "entry2"},
-                ]
-            }
+class Test_query_params:
+    def test_query_params(self):
+        assert query_params(content="config", depth=None, fields="") == {
+            "content": "config"
         }
-        expected = {
-            "key": {
-                "list": [
-                    {"propX:config": "entry1"},
-                    {"propY:config": "entry2", "propZ:state": "entry2"},
-                ]
-            }
+        assert query_params(depth="2", with_defaults="trim") == {
+            "depth": "2",
+            "with-defaults": "trim",
         }
 
-        assert remove_state_property(testdata) == expected
-
-    def test_ntp(self):
-        assert remove_state_property(self.TEST_NTP[1]) == self.TEST_NTP[0]
-
+    @pytest.mark.parametrize(
+        "uri, params, result",
+        [
+            ("/api/data/a", {}, "/api/data/a"),
+            ("/api/data/a", {"content": "config"}, "/api/data/a?content=config"),
+            (
+                "/api/data/a?depth=1",
+                {"content": "config"},
+                "/api/data/a?depth=1&content=config",
+            ),
+            (
+                "/api/data/a",
+                {"fields": "config(name;enabled)", "depth": 2},
+                "/api/data/a?fields=config(name;enabled)&depth=2",
+            ),
+            ("/api/data/a", {"fields": "a b&c"}, "/api/data/a?fields=a%20b%26c"),
+        ],
+    )
+    def test_add_query(self, uri, params, result):
+        assert add_query(uri, params) == result
 
-class Test_changes_add_deep_diff:
-    def test_no_diff(self):
-        changes = {"before": {}, "after": {}}
-        changes_add_deep_diff(changes)
-        assert "diff" not in changes
 
-    @pytest.mark.skipif(not DEEPDIFF_INSTALLED, reason="deepdiff not installed")
-    def test_diff(self):
-        changes = {"before": {"a": 1}, "after": {"a": 2}}
-        changes_add_deep_diff(changes)
-        assert "diff" in changes
-        assert changes["diff"] == {
-            "values_changed": {"root['a']": {"new_value": 2, "old_value": 1}}
+class Test_response_validators:
+    def test_validators(self):
+        response = {
+            "code": 200,
+            "headers": {"ETag": '"abc"', "Last-Modified": "Sun, 18 Oct 2026"},
         }
-
-    def test_no_deepdiff(self):
-        changes = {"before": {"a": 1}, "after": {"a": 2}}
-        # mock ImportError
-        sys.modules["deepdiff"] = None
-        changes_add_deep_diff(changes)
-        assert "diff" not in changes
-
-
-class Test_format_bool_values:
-    def test_format_bool_values(self):
-        test_data = {
-            "k1": [
-                "true",
-                "True",
-                "false",
-                "False",
-                "str",
-                1,
-                1.0,
-                True,
-                False,
-                {"True": "true"},
-            ],
-            "k2": {"k1": "true", "k2": "True", "k3": "false", "k4": "False"},
-        }
-        expected_data = {
-            "k1": [
-                True,
-                True,
-                False,
-                False,
-                "str",
-                1,
-                1.0,
-                True,
-                False,
-                {"True": True},
-            ],
-            "k2": {"k1": True, "k2": True, "k3": False, "k4": False},
+        assert response_validators(response) == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Sun, 18 Oct 2026",
         }
 
-        assert format_bool_values(test_data) == expected_data
+    def test_no_headers(self):
+        assert response_validators({"code": 200, "contents": {}}) == {}
+
+
+class Test_APIClient_conditional_get:
+    @staticmethod
+    def respond(method, path, headers, payload):
+        if headers.get("If-None-Match") == '"1"':
+            return {"code": 304, "contents": {}}
+        return {"code": 200, "contents": {"k": "v"}, "headers": {"etag": '"1"'}}
+
+    @pytest.fixture
+    def api_client(self, monkeypatch, tmp_path, api, socket_path):
+        api.respond = self.respond
+        api.options = {"remote_user": "admin", "host": "f5os", "port": 443}
+        devices = []
+
+        def _validator_cache(module, device):
+            devices.append(device)
+            return ResponseCache(
+                str(tmp_path),
+                enabled=bool(module.params.get("conditional_get")),
+                name="validator",
+            )
+
+        monkeypatch.setattr(utils, "validator_cache", _validator_cache)
+
+        def _api_client(**params):
+            client = utils.APIClient(ModuleShim("test", params, socket_path))
+            return client, devices[-1]
+
+        return _api_client
+
+    def test_not_modified(self, api, api_client):
+        client, device = api_client(conditional_get=True)
+        assert device == "admin@f5os@443"
+        first = client.get(uri="/api/data/a")
+        # a new task of another playbook run revalidates the stored response
+        second = api_client(conditional_get=True)[0].get(uri="/api/data/a")
+        assert first["contents"] == second["contents"] == {"k": "v"}
+        assert second["code"] == 200
+        assert [h.get("If-None-Match") for _, _, h, _ in api.requests] == [
+            None,
+            '"1"',
+        ]
+
+    def test_disabled(self, api, api_client, socket_path):
+        client, device = api_client()
+        assert device == socket_path
+        client.get(uri="/api/data/a")
+        client.get(uri="/api/data/a")
+        assert [h.get("If-None-Match") for _, _, h, _ in api.requests] == [
+            None,
+            None,
+        ]
+
+    def test_no_thrashing(self, api, socket_path):
+        # the validators of all resources read in a run are kept for the next run
+        api.respond = self.respond
+        uris = [f"/api/data/a/b={i}" for i in range(600)]
+        for _ in range(2):
+            client = utils.APIClient(
+                ModuleShim("test", {"conditional_get": True}, socket_path)
+            )
+            for uri in uris:
+                client.get(uri=uri)
+        conditional = [h for _, _, h, _ in api.requests if "If-None-Match" in h]
+        assert len(conditional) == len(uris)
+
+
+class Test_APIClient_retries:
+    @pytest.fixture
+    def api_client(self, monkeypatch, api, socket_path):
+        sleeps = []
+        monkeypatch.setattr(utils.time, "sleep", sleeps.append)
+
+        def _api_client(responses, **params):
+            def _respond(method, path, headers, payload):
+                response = responses.pop(0)
+                if response is None:
+                    raise ConnectionError("connection reset by peer")
+                return response
+
+            api.respond = _respond
+            client = utils.APIClient(ModuleShim("test", params, socket_path))
+            return client, sleeps
+
+        return _api_client
+
+    def test_retried(self, api, api_client):
+        client, sleeps = api_client(
+            [
+                {"code": 503, "contents": {}},
+                None,
+                {"code": 200, "contents": {"k": "v"}},
+            ],
+            retries=2,
+            timings=True,
+        )
+        assert client.get("/api/data/a")["code"] == 200
+        assert [method for method, _ in api.paths()] == ["GET"] * 3
+        assert len(sleeps) == 2
+        throttling = client.timings.result()["throttling"]
+        assert throttling["retries"] == 2
+        # the failed connection is not an API call
+        assert len(client.timings.api_calls) == 2
+
+    def test_exhausted(self, api, api_client):
+        client, _ = api_client(
+            [{"code": 429, "contents": {}}, {"code": 429, "contents": {}}], retries=1
+        )
+        assert client.put("/api/data/a", config={})["code"] == 429
+
+        client, _ = api_client([None, None], retries=1)
+        with pytest.raises(ConnectionError):
+            client.delete("/api/data/a")
+
+    def test_not_idempotent(self, api, api_client):
+        client, sleeps = api_client([{"code": 503, "contents": {}}], retries=3)
+        assert client.post("/api/data/a", config={})["code"] == 503
+        assert sleeps == []
+
+    def test_disabled(self, api, api_client):
+        client, _ = api_client([{"code": 503, "contents": {}}])
+        assert client.get("/api/data/a")["code"] == 503
+        assert [method for method, _ in api.paths()] == ["GET"]
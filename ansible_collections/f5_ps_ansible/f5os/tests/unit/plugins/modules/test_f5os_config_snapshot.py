@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pytest
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils import cache
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.utils import APIClient
+from ansible_collections.f5_ps_ansible.f5os.plugins.modules import (
+    f5os_config_snapshot,
+    f5os_restconf_config,
+)
+
+DATASTORE = {
+    "openconfig-vlan:vlans": {
+        "vlan": [
+            {"vlan-id": 20, "config": {"vlan-id": 20, "name": "vlan20"}},
+            {"vlan-id": 30, "config": {"vlan-id": 30, "name": "vlan30"}},
+        ]
+    },
+    "openconfig-system:system": {"dns": {"config": {"search": ["example.net"]}}},
+}
+
+
+@pytest.fixture(autouse=True)
+def api(api):
+    api.responses = {
+        "/api/data?content=config": {"code": 200, "contents": DATASTORE},
+        "/api/data/openconfig-vlan:vlans/vlan=30": {
+            "code": 200,
+            "contents": {
+                "openconfig-vlan:vlan": [
+                    {"vlan-id": 30, "config": {"vlan-id": 30, "name": "renamed"}}
+                ]
+            },
+        },
+    }
+    return api
+
+
+def vlan(vlan_id, name):
+    return {
+        "openconfig-vlan:vlan": [
+            {"vlan-id": vlan_id, "config": {"vlan-id": vlan_id, "name": name}}
+        ]
+    }
+
+
+class Test_f5os_config_snapshot:
+    def test_taken_once(self, api, module_shim):
+        result = f5os_config_snapshot.run_module(module_shim(f5os_config_snapshot))
+        assert result["taken"] is True
+        assert result["uri"] == "/api/data?content=config"
+        result = f5os_config_snapshot.run_module(module_shim(f5os_config_snapshot))
+        assert result["taken"] is False
+        assert api.paths() == [("GET", "/api/data?content=config")]
+
+    def test_api_prefix(self, api, module_shim):
+        api.options = {"port": 8888}
+        api.responses = {
+            "/restconf/data?content=config": api.responses["/api/data?content=config"]
+        }
+        result = f5os_config_snapshot.run_module(module_shim(f5os_config_snapshot))
+        assert result["uri"] == "/restconf/data?content=config"
+        assert result["taken"] is True
+
+    def test_params_unchanged(self, module_shim):
+        module = module_shim(f5os_config_snapshot)
+        params = dict(module.params)
+        f5os_config_snapshot.run_module(module)
+        assert module.params == params
+
+    def test_removed_with_connection(self, api, module_shim, socket_path):
+        f5os_config_snapshot.run_module(module_shim(f5os_config_snapshot))
+        # the persistent connection of the playbook run is closed
+        os.remove(socket_path)
+        APIClient(module_shim(f5os_config_snapshot), snapshot=True)
+        assert os.listdir(cache.DEFAULT_CACHE_DIR) == []
+
+    def test_absent(self, api, module_shim):
+        f5os_config_snapshot.run_module(module_shim(f5os_config_snapshot))
+        f5os_config_snapshot.run_module(
+            module_shim(f5os_config_snapshot, state="absent")
+        )
+        result = f5os_config_snapshot.run_module(module_shim(f5os_config_snapshot))
+        assert result["taken"] is True
+
+
+class Test_f5os_restconf_config_snapshot:
+    uri = "/api/data/openconfig-vlan:vlans/vlan=30"
+
+    def test_compare_against_snapshot(self, api, module_shim):
+        for name in ["vlan30", "renamed"]:
+            f5os_restconf_config.run_module(
+                module_shim(
+                    f5os_restconf_config,
+                    uri=self.uri,
+                    config=vlan(30, name),
+                    snapshot=True,
+                )
+            )
+        assert api.paths() == [
+            # the first task takes the snapshot
+            ("GET", "/api/data?content=config"),
+            # unchanged vlan30 is answered from the snapshot, renaming it is written
+            ("PUT", self.uri),
+        ]
+
+    def test_written_resource_is_read_again(self, api, module_shim):
+        module = module_shim(
+            f5os_restconf_config,
+            uri=self.uri,
+            config=vlan(30, "renamed"),
+            snapshot=True,
+        )
+        assert f5os_restconf_config.run_module(module)["changed"] is True
+        assert f5os_restconf_config.run_module(module)["changed"] is False
+        assert api.paths() == [
+            ("GET", "/api/data?content=config"),
+            ("PUT", self.uri),
+            ("GET", f"{self.uri}?content=config"),
+        ]
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.modules import f5os_facts
+from ansible_collections.f5_ps_ansible.f5os.plugins.modules.f5os_facts import (
+    FACT_SUBSETS,
+    run_module,
+    select_subsets,
+)
+
+
+@pytest.fixture
+def api(api):
+    def _respond(method, path, headers, payload):
+        if path.endswith("f5-tenants:tenants"):
+            return {"code": 404, "contents": {}}
+        if path.endswith("openconfig-system:system/ntp"):
+            return {"code": 500, "contents": {}}
+        return {
+            "code": 200,
+            "contents": {
+                path.rsplit("/", 1)[-1]: {
+                    "config": {"mtu": 9000},
+                    "state": {"mtu": 9000, "counters": {}},
+                }
+            },
+        }
+
+    api.respond = _respond
+    return api
+
+
+@pytest.fixture
+def module(module_shim):
+    def _module(**params):
+        return module_shim(f5os_facts, **params)
+
+    return _module
+
+
+class Test_select_subsets:
+    def test_all(self):
+        assert select_subsets(["all"]) == list(FACT_SUBSETS)
+
+    def test_exclude(self):
+        assert select_subsets(["!interfaces", "!tenants"]) == [
+            s for s in FACT_SUBSETS if s not in ("interfaces", "tenants")
+        ]
+
+    def test_include(self):
+        assert select_subsets(["dns", "version"]) == ["version", "dns"]
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            select_subsets(["unknown"])
+
+
+class Test_run_module:
+    def test_facts(self, api, module):
+        result = run_module(module(gather_subset=["version", "vlans", "tenants"]))
+        facts = result["ansible_facts"]
+        assert result["failed"] is False
+        assert facts["f5os_gather_subset"] == ["version", "vlans", "tenants"]
+        # the contents are returned as is, including the state
+        assert facts["f5os_vlans"] == {
+            "openconfig-vlan:vlans": {
+                "config": {"mtu": 9000},
+                "state": {"mtu": 9000, "counters": {}},
+            }
+        }
+        assert facts["f5os_tenants"] == {}
+        assert sorted(path for _, path in api.paths()) == [
+            "/api/data/f5-tenants:tenants",
+            "/api/data/openconfig-system:system/f5os-system-version:version",
+            "/api/data/openconfig-vlan:vlans",
+        ]
+
+    def test_failed_subset(self, api, module):
+        result = run_module(
+            module(gather_subset=["ntp", "dns"], api_prefix="/restconf/")
+        )
+        assert result["failed"] is True
+        assert "ntp" in result["msg"]
+        assert "f5os_dns" in result["ansible_facts"]
+        assert "/restconf/data/openconfig-system:system/dns" in [
+            path for _, path in api.paths()
+        ]
+
+    @pytest.mark.parametrize(
+        "options, api_prefix",
+        [(None, "/api"), ({"port": 443}, "/api"), ({"port": "8888"}, "/restconf")],
+    )
+    def test_api_prefix(self, api, module, options, api_prefix):
+        api.options = options
+        run_module(module(gather_subset=["dns"]))
+        assert api.paths() == [
+            ("GET", f"{api_prefix}/data/openconfig-system:system/dns"),
+        ]
@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+import pytest
+from ansible.module_utils.connection import ConnectionError
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.modules import (
+    f5os_restconf_config,
+)
+
+URI = "/api/data/openconfig-system:system/dns/config"
+
+
+class Device:
+    """Answers GET requests with the written config and its ETag, conditional GETs with 304."""
+
+    def __init__(self):
+        self.config = {"openconfig-system:config": {"search": ["example.net"]}}
+        self.etag = 1
+
+    def respond(self, method, path, headers, payload):
+        etag = f'"{self.etag}"'
+        if method == "GET":
+            if headers.get("If-None-Match") == etag:
+                return {"code": 304, "contents": {}}
+            return {"code": 200, "contents": self.config, "headers": {"ETag": etag}}
+        self.config = payload
+        self.etag += 1
+        return {"code": 204, "contents": {}, "headers": {"ETag": f'"{self.etag}"'}}
+
+
+@pytest.fixture
+def device(api):
+    device = Device()
+    api.respond = device.respond
+    return device
+
+
+@pytest.fixture
+def module(module_shim):
+    def _module(**params):
+        return module_shim(f5os_restconf_config, **params)
+
+    return _module
+
+
+def requests(api):
+    return [
+        (method, headers.get("If-None-Match")) for method, _, headers, _ in api.requests
+    ]
+
+
+def dns(search):
+    return {"openconfig-system:config": {"search": [search]}}
+
+
+class Test_fingerprint:
+    def test_unchanged(self, api, device, module):
+        for _ in range(2):
+            result = f5os_restconf_config.run_module(
+                module(uri=URI, config=dns("example.net"), fingerprint=True)
+            )
+            assert result["changed"] is False
+        assert result["fingerprint"] == "unchanged"
+        assert requests(api) == [("GET", None), ("GET", '"1"')]
+
+    def test_applied(self, api, device, module):
+        for _ in range(2):
+            result = f5os_restconf_config.run_module(
+                module(uri=URI, config=dns("example.com"), fingerprint=True)
+            )
+        assert result["changed"] is False
+        # the validator of the write response is recorded
+        assert requests(api) == [
+            ("GET", None),
+            ("PUT", None),
+            ("GET", '"2"'),
+        ]
+
+    def test_device_changed(self, api, device, module):
+        f5os_restconf_config.run_module(
+            module(uri=URI, config=dns("example.net"), fingerprint=True)
+        )
+        # changed outside of this collection
+        device.config = dns("example.org")
+        device.etag = 5
+        result = f5os_restconf_config.run_module(
+            module(uri=URI, config=dns("example.net"), fingerprint=True)
+        )
+        assert result["changed"] is True
+        assert "fingerprint" not in result
+        assert requests(api) == [
+            ("GET", None),
+            ("GET", '"1"'),
+            ("PUT", None),
+        ]
+
+    def test_desired_config_changed(self, api, device, module):
+        for search in ["example.net", "example.com"]:
+            result = f5os_restconf_config.run_module(
+                module(uri=URI, config=dns(search), fingerprint=True)
+            )
+        assert result["changed"] is True
+        assert requests(api) == [("GET", None), ("GET", None), ("PUT", None)]
+
+
+class Test_timings:
+    def test_timings(self, api, device, module):
+        result = f5os_restconf_config.run_module(
+            module(uri=URI, config=dns("example.com"), timings=True)
+        )
+        timings = result["timings"]
+        assert [
+            (c["method"], c["status"], c["source"]) for c in timings["api_calls"]
+        ] == [
+            ("GET", 200, "api"),
+            ("PUT", 204, "api"),
+        ]
+        assert {"normalize", "read", "compare", "write", "diff"} <= set(
+            timings["phases"]
+        )
+
+    def test_disabled(self, api, device, module):
+        result = f5os_restconf_config.run_module(
+            module(uri=URI, config=dns("example.com"))
+        )
+        assert "timings" not in result
+
+
+VLANS = "/api/data/openconfig-vlan:vlans"
+
+
+def vlan(vlan_id, name, description=None):
+    config = {"vlan-id": vlan_id, "name": name}
+    if description:
+        config["description"] = description
+    return {"openconfig-vlan:vlan": [{"vlan-id": vlan_id, "config": config}]}
+
+
+def item(vlan_id, **params):
+    return dict(
+        dict.fromkeys(f5os_restconf_config.ITEM_SPEC),
+        uri=f"{VLANS}/vlan={vlan_id}",
+        **params,
+    )
+
+
+@pytest.fixture
+def vlans(api):
+    # vlan 20 is absent
+    api.responses = {
+        f"{VLANS}/vlan={vlan_id}": {
+            "code": 200,
+            "contents": vlan(vlan_id, f"vlan{vlan_id}", "device"),
+        }
+        for vlan_id in [30, 40]
+    }
+
+
+@pytest.mark.usefixtures("vlans")
+class Test_prefetch:
+    def test_failed(self, api, module):
+        """a failed prefetch does not answer the reads of the children"""
+        api.responses[VLANS] = {"code": 500, "contents": {}}
+        result = f5os_restconf_config.run_module(
+            module(uri=f"{VLANS}/vlan=30", prefetch_uri=VLANS, state="absent")
+        )
+        assert (result["changed"], result["failed"]) == (True, False)
+        assert api.paths() == [
+            ("GET", f"{VLANS}?content=config"),
+            ("GET", f"{VLANS}/vlan=30?content=config"),
+            ("DELETE", f"{VLANS}/vlan=30"),
+        ]
+
+    def test_parent_absent(self, api, module):
+        """the children of an absent parent are absent"""
+        result = f5os_restconf_config.run_module(
+            module(uri=f"{VLANS}/vlan=30", prefetch_uri=VLANS, state="absent")
+        )
+        assert (result["changed"], result["failed"]) == (False, False)
+        assert api.paths() == [("GET", f"{VLANS}?content=config")]
+
+
+@pytest.mark.usefixtures("vlans")
+class Test_items:
+    def test_mixed_states(self, api, module):
+        result = f5os_restconf_config.run_module(
+            module(
+                items=[
+                    item(20, config=vlan(20, "vlan20")),
+                    item(30, state="absent"),
+                    item(40, config=vlan(40, "vlan40", "device")),
+                ]
+            )
+        )
+        assert [r["changed"] for r in result["results"]] == [True, True, False]
+        assert [r["uri"] for r in result["results"]] == [
+            f"{VLANS}/vlan={vlan_id}" for vlan_id in [20, 30, 40]
+        ]
+        assert (result["changed"], result["failed"]) == (True, False)
+        assert api.paths("PUT", "DELETE") == [
+            ("PUT", f"{VLANS}/vlan=20"),
+            ("DELETE", f"{VLANS}/vlan=30"),
+        ]
+
+    def test_unchanged(self, api, module):
+        result = f5os_restconf_config.run_module(
+            module(
+                items=[
+                    item(20),
+                    item(40, config=vlan(40, "vlan40", "device"), state="present"),
+                ],
+                state="absent",
+            )
+        )
+        assert [r["changed"] for r in result["results"]] == [False, False]
+        assert (result["changed"], result["failed"]) == (False, False)
+        assert "msg" not in result
+        assert api.paths("PUT", "DELETE") == []
+
+    def test_inherited_options(self, api, module):
+        # the description is only set on the device
+        result = f5os_restconf_config.run_module(
+            module(
+                items=[
+                    item(30, config=vlan(30, "vlan30")),
+                    item(40, config=vlan(40, "vlan40"), method="PUT"),
+                ],
+                method="PATCH",
+                keys_ignore=["description"],
+            )
+        )
+        assert [r["changed"] for r in result["results"]] == [False, False]
+        assert [r["keys_ignore"] for r in result["results"]] == [["description"]] * 2
+
+        result = f5os_restconf_config.run_module(
+            module(
+                items=[item(30, config={"vlan-id": 30, "name": "vlan30"})],
+                config_query='"openconfig-vlan:vlan"[0].config',
+                keys_ignore=["description"],
+            )
+        )
+        assert result["results"][0]["changed"] is False
+        assert result["results"][0]["config_query"] == (
+            '"openconfig-vlan:vlan"[0].config'
+        )
+
+    def test_item_overrides(self, api, module):
+        result = f5os_restconf_config.run_module(
+            module(
+                items=[
+                    item(30, config=vlan(30, "vlan30"), keys_ignore=[]),
+                    item(40, config=vlan(40, "renamed"), method="PUT"),
+                ],
+                method="PATCH",
+                keys_ignore=["description"],
+            )
+        )
+        assert [r["changed"] for r in result["results"]] == [True, True]
+        assert [r["keys_ignore"] for r in result["results"]] == [[], ["description"]]
+
+        result = f5os_restconf_config.run_module(
+            module(
+                items=[
+                    item(30, config=vlan(30, "vlan30", "device"), state="present"),
+                    item(40),
+                ],
+                state="absent",
+            )
+        )
+        assert [r["changed"] for r in result["results"]] == [False, True]
+        assert api.paths("PUT", "PATCH", "DELETE") == [
+            ("PATCH", f"{VLANS}/vlan=30"),
+            ("PUT", f"{VLANS}/vlan=40"),
+            ("DELETE", f"{VLANS}/vlan=40"),
+        ]
+
+    def test_partial_failure(self, api, module):
+        api.responses[f"{VLANS}/vlan=30"] = ConnectionError("connection reset")
+        result = f5os_restconf_config.run_module(
+            module(
+                items=[
+                    item(30, config=vlan(30, "renamed")),
+                    item(40, config=vlan(40, "renamed")),
+                    item(20, config=vlan(20, "vlan20")),
+                ]
+            )
+        )
+        assert [(r["changed"], r["failed"]) for r in result["results"]] == [
+            (False, True),
+            (True, False),
+            (True, False),
+        ]
+        assert result["results"][0]["msg"] == "connection reset"
+        # the remaining items are processed
+        assert (result["changed"], result["failed"]) == (True, True)
+        assert result["msg"] == "One or more items failed."
+        assert api.paths("PUT") == [
+            ("PUT", f"{VLANS}/vlan=40"),
+            ("PUT", f"{VLANS}/vlan=20"),
+        ]
+
+
+def patches(api):
+    return [
+        (path, headers["Content-Type"], payload["ietf-yang-patch:yang-patch"]["edit"])
+        for method, path, headers, payload in api.requests
+        if method == "PATCH"
+    ]
+
+
+@pytest.mark.usefixtures("vlans")
+class Test_yang_patch:
+    items = [
+        item(20, config=vlan(20, "vlan20")),
+        item(30, state="absent"),
+        item(40, config=vlan(40, "vlan40", "device")),
+        item(50, config=vlan(50, "vlan50"), method="PATCH"),
+    ]
+
+    def test_single_request(self, api, module):
+        result = f5os_restconf_config.run_module(
+            module(items=self.items, yang_patch=True)
+        )
+        assert [r["changed"] for r in result["results"]] == [True, True, False, True]
+        assert (result["changed"], result["failed"]) == (True, False)
+        # the changes of all items are applied with one YANG-PATCH of the datastore
+        ((path, content_type, edits),) = patches(api)
+        assert (path, content_type) == ("/api/data", "application/yang-patch+json")
+        assert [(e["edit-id"], e["operation"], e["target"]) for e in edits] == [
+            ("1", "replace", "/openconfig-vlan:vlans/vlan=20"),
+            ("2", "delete", "/openconfig-vlan:vlans/vlan=30"),
+            ("3", "merge", "/openconfig-vlan:vlans/vlan=50"),
+        ]
+        assert api.paths("PUT", "DELETE") == []
+
+    def test_request_per_datastore(self, api, module):
+        items = [
+            item(20, config=vlan(20, "vlan20")),
+            dict(
+                item(20, config=vlan(20, "vlan20")),
+                uri="/restconf/data/openconfig-vlan:vlans/vlan=20",
+            ),
+        ]
+        f5os_restconf_config.run_module(module(items=items, yang_patch=True))
+        assert [(path, len(edits)) for path, _, edits in patches(api)] == [
+            ("/api/data", 1),
+            ("/restconf/data", 1),
+        ]
+
+    @pytest.mark.parametrize(
+        "response, msg",
+        [
+            (
+                {
+                    "code": 409,
+                    "contents": {
+                        "ietf-yang-patch:yang-patch-status": {
+                            "patch-id": "f5_ps_ansible.f5os",
+                            "errors": {"error": [{"error-tag": "data-exists"}]},
+                        }
+                    },
+                },
+                None,
+            ),
+            (
+                {
+                    "code": 200,
+                    "contents": {
+                        "ietf-yang-patch:yang-patch-status": {
+                            "patch-id": "f5_ps_ansible.f5os",
+                            "edit-status": {
+                                "edit": [
+                                    {"edit-id": "1", "ok": [None]},
+                                    {"edit-id": "2", "errors": {"error": []}},
+                                ]
+                            },
+                        }
+                    },
+                },
+                None,
+            ),
+            (ConnectionError("connection reset"), "connection reset"),
+        ],
+    )
+    def test_failed(self, api, module, response, msg):
+        respond = api.respond
+
+        def _respond(method, path, headers, payload):
+            if method != "PATCH":
+                return respond(method, path, headers, payload)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        api.respond = _respond
+        result = f5os_restconf_config.run_module(
+            module(items=self.items, yang_patch=True, diff=True)
+        )
+        # the YANG-PATCH is atomic, all edits failed and the unchanged item did not
+        assert [(r["changed"], r["failed"]) for r in result["results"]] == [
+            (False, True),
+            (False, True),
+            (False, False),
+            (False, True),
+        ]
+        assert [r.get("msg") for r in result["results"]] == [msg, msg, None, msg]
+        assert [r["changes"] for r in result["results"]] == [{}] * 4
+        assert (result["changed"], result["failed"]) == (False, True)
+        assert result["msg"] == "One or more items failed."
+
+    def test_check_mode(self, api, module):
+        result = f5os_restconf_config.run_module(
+            module(items=self.items, yang_patch=True, check_mode=True)
+        )
+        assert [r["changed"] for r in result["results"]] == [True, True, False, True]
+        assert api.paths("PATCH", "PUT", "DELETE") == []
+
+    def test_invalidates_cache(self, api, module):
+        items = [item(30, config=vlan(30, "renamed"))]
+        for _ in range(2):
+            f5os_restconf_config.run_module(
+                module(items=items, yang_patch=True, cache=True)
+            )
+        # the cached response of the patched resource is dropped and read again
+        assert (
+            api.paths()
+            == [
+                ("GET", f"{VLANS}/vlan=30?content=config"),
+                ("PATCH", "/api/data"),
+            ]
+            * 2
+        )
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.module_utils.normalize import (
+    normalize,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.modules import f5os_restconf_list
+from ansible_collections.f5_ps_ansible.f5os.plugins.modules.f5os_restconf_list import (
+    reconcile,
+    run_module,
+)
+
+VLANS_URI = "/api/data/openconfig-vlan:vlans/vlan"
+TRUNK_URI = "/api/data/openconfig-interfaces:interfaces/interface=lag1/openconfig-if-aggregate:aggregation/openconfig-vlan:switched-vlan/config/trunk-vlans"
+
+
+def vlan(vlan_id, name=None, members=None):
+    entry = {
+        "vlan-id": vlan_id,
+        "config": {"vlan-id": vlan_id, "name": name or f"vlan{vlan_id}"},
+    }
+    if members:
+        entry["members"] = members
+    return entry
+
+
+@pytest.fixture(autouse=True)
+def api(api):
+    api.responses = {
+        VLANS_URI: {
+            "code": 200,
+            "contents": {
+                "openconfig-vlan:vlan": [
+                    vlan(10, members={"member": [{"interface": "lag1"}]}),
+                    vlan(20),
+                    vlan(30),
+                ]
+            },
+        },
+        TRUNK_URI: {"code": 200, "contents": {"openconfig-vlan:trunk-vlans": [10, 20]}},
+    }
+    return api
+
+
+@pytest.fixture
+def module(module_shim):
+    def _module(check_mode=False, diff=False, **params):
+        return module_shim(f5os_restconf_list, check_mode, diff, **params)
+
+    return _module
+
+
+def writes(api):
+    return [
+        (method, path.split("?", 1)[0], payload)
+        for method, path, _, payload in api.requests
+        if method != "GET"
+    ]
+
+
+class Test_reconcile:
+    def test_leaf_list(self):
+        added, changed, removed = reconcile(["1", "2"], ["2", "3"], [], None, True, [])
+        assert (added, changed, removed) == (["3"], [], ["1"])
+
+    def test_list(self):
+        current = [{"id": "1", "v": "a"}, {"id": "2", "v": "b"}]
+        desired = [{"id": "2", "v": "c"}, {"id": "3", "v": "d"}]
+        added, changed, removed = reconcile(
+            current, desired, [{"id": "1"}], ["id"], False, []
+        )
+        assert added == [{"id": "3", "v": "d"}]
+        assert changed == [({"id": "2", "v": "b"}, {"id": "2", "v": "c"})]
+        assert removed == [{"id": "1", "v": "a"}]
+
+
+class Test_run_module:
+    def test_unchanged(self, api, module):
+        result = run_module(
+            module(uri=VLANS_URI, entries=[vlan(10), vlan(20)], keys_ignore=["members"])
+        )
+        assert result["changed"] is False
+        assert writes(api) == []
+        assert len(api.requests) == 1
+
+    def test_content_config_unsupported(self, api, module):
+        entry = vlan(10)
+        entry["state"] = {"vlan-id": 10, "status": "ACTIVE"}
+        api.responses = {
+            f"{VLANS_URI}?content=config": {"code": 400, "contents": {}},
+            VLANS_URI: {"code": 200, "contents": {"openconfig-vlan:vlan": [entry]}},
+        }
+        result = run_module(module(uri=VLANS_URI, entries=[vlan(10)]))
+        assert result["changed"] is False
+        assert api.paths() == [
+            ("GET", f"{VLANS_URI}?content=config"),
+            ("GET", VLANS_URI),
+        ]
+
+    def test_purge_single_patch(self, api, module):
+        result = run_module(
+            module(
+                uri=VLANS_URI,
+                entries=[vlan(10), vlan(20, "renamed"), vlan(40)],
+                keys_ignore=["members"],
+                purge=True,
+            )
+        )
+        assert result["changed"] is True
+        assert result["failed"] is False
+        assert [e["vlan-id"] for e in result["changes"]["added"]] == ["40"]
+        assert [e["vlan-id"] for e in result["changes"]["removed"]] == ["30"]
+        assert writes(api) == [
+            (
+                "PATCH",
+                "/api/data/openconfig-vlan:vlans",
+                {
+                    "openconfig-vlan:vlans": {
+                        "vlan": normalize([vlan(40), vlan(20, "renamed")])
+                    }
+                },
+            ),
+            ("DELETE", f"{VLANS_URI}=30", None),
+        ]
+
+    def test_yang_patch(self, api, module):
+        result = run_module(
+            module(
+                uri=VLANS_URI,
+                entries=[vlan(40)],
+                absent_entries=[{"vlan-id": 10}],
+                yang_patch=True,
+            )
+        )
+        assert result["failed"] is False
+        ((method, path, payload),) = writes(api)
+        assert (method, path) == ("PATCH", "/api/data")
+        edits = payload["ietf-yang-patch:yang-patch"]["edit"]
+        assert [(e["operation"], e["target"]) for e in edits] == [
+            ("merge", "/openconfig-vlan:vlans/vlan=40"),
+            ("delete", "/openconfig-vlan:vlans/vlan=10"),
+        ]
+
+    def test_leaf_list(self, api, module):
+        result = run_module(module(uri=TRUNK_URI, entries=[30], absent_entries=[10]))
+        assert result["changes"] == {"added": ["30"], "removed": ["10"], "changed": []}
+        assert writes(api) == [
+            (
+                "PATCH",
+                TRUNK_URI.rsplit("/", 1)[0],
+                {"openconfig-vlan:config": {"trunk-vlans": ["30"]}},
+            ),
+            ("DELETE", f"{TRUNK_URI}=10", None),
+        ]
+
+    def test_check_mode_diff(self, api, module):
+        result = run_module(
+            module(check_mode=True, diff=True, uri=TRUNK_URI, entries=[30], purge=True)
+        )
+        assert result["changed"] is True
+        assert writes(api) == []
+        assert result["diff"] == {
+            "before": {"openconfig-vlan:trunk-vlans": ["10", "20"]},
+            "after": {"openconfig-vlan:trunk-vlans": ["30"]},
+        }
+
+    def test_empty_list(self, api, module):
+        result = run_module(
+            module(
+                uri="/api/data/openconfig-system:system/dns/servers/server",
+                entries=[{"address": "9.9.9.9"}],
+            )
+        )
+        assert result["changes"]["added"] == [{"address": "9.9.9.9"}]
+
+    @pytest.mark.parametrize("entries", [[], None])
+    def test_no_entries_purge(self, api, module, entries):
+        result = run_module(module(uri=VLANS_URI, entries=entries, purge=True))
+        assert result["failed"] is False
+        assert [e["vlan-id"] for e in result["changes"]["removed"]] == [
+            "10",
+            "20",
+            "30",
+        ]
+        assert writes(api) == [
+            ("DELETE", f"{VLANS_URI}={vlan_id}", None) for vlan_id in [10, 20, 30]
+        ]
+
+    def test_uri_with_keys(self, api, module):
+        result = run_module(module(uri=f"{VLANS_URI}=10"))
+        assert result["failed"] is True
+        assert api.requests == []
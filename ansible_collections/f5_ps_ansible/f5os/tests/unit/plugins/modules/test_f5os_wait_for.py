@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import pytest
+from ansible.module_utils.connection import ConnectionError
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.modules import f5os_wait_for
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def status(code):
+    return {"code": code, "contents": {}}
+
+
+@pytest.fixture
+def clock(monkeypatch, api):
+    clock = FakeClock()
+    monkeypatch.setattr(f5os_wait_for.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(f5os_wait_for.time, "sleep", clock.sleep)
+    return clock
+
+
+@pytest.fixture
+def module(module_shim):
+    def _module(**params):
+        return module_shim(
+            f5os_wait_for, **dict(dict(uris=["/api/a", "/api/b"], jitter=0), **params)
+        )
+
+    return _module
+
+
+class Test_f5os_wait_for:
+    def test_backoff_intervals(self):
+        intervals = f5os_wait_for.backoff_intervals(1, 5, 2, 0)
+        assert [next(intervals) for _ in range(5)] == [1, 2, 4, 5, 5]
+        intervals = f5os_wait_for.backoff_intervals(10, 10, 2, 0.5)
+        assert all(5 <= next(intervals) <= 10 for _ in range(100))
+
+    def test_ready(self, api, clock, module):
+        api.responses = {
+            "/api/a": [ConnectionError("reset"), status(503), status(200)],
+            "/api/b": status(200),
+        }
+        result = f5os_wait_for.run_module(module(delay=5))
+        assert result["failed"] is False
+        assert result["attempts"] == 3
+        assert clock.sleeps == [5, 1, 2]
+        assert [p["ready"] for p in result["probes"]] == [True, True]
+
+    def test_consecutive_successes(self, api, clock, module):
+        api.responses = {
+            "/api/a": [status(200), status(503), status(200)],
+            "/api/b": status(200),
+        }
+        result = f5os_wait_for.run_module(module(consecutive_successes=2))
+        assert result["failed"] is False
+        assert result["attempts"] == 4
+
+    def test_timeout(self, api, clock, module):
+        api.responses = {"/api/a": status(503), "/api/b": status(200)}
+        result = f5os_wait_for.run_module(module(timeout=20))
+        assert result["failed"] is True
+        assert "/api/a" in result["msg"] and "/api/b" not in result["msg"]
+        assert clock.now <= 20
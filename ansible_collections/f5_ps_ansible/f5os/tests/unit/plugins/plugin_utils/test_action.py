@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from ansible_collections.f5_ps_ansible.f5os.plugins.modules import (
+    f5os_restconf_config,
+    f5os_restconf_get,
+)
+from ansible_collections.f5_ps_ansible.f5os.plugins.plugin_utils.action import (
+    run_in_process,
+)
+
+URI = "/api/data/openconfig-system:system/config"
+
+
+@pytest.fixture(autouse=True)
+def api(api):
+    api.responses = {
+        URI: {"code": 200, "contents": {"openconfig-system:config": {"hostname": "a"}}}
+    }
+    return api
+
+
+class Test_run_in_process:
+    def test_get(self, socket_path):
+        result = run_in_process(f5os_restconf_get, "get", {"uri": URI}, socket_path)
+        assert result["failed"] is False
+        assert result["api_response"]["contents"] == {
+            "openconfig-system:config": {"hostname": "a"}
+        }
+        assert result["invocation"]["module_args"]["cache_ttl"] == 300
+
+    def test_config_changed_no_log(self, socket_path):
+        args = {
+            "uri": URI,
+            "config": {"openconfig-system:config": {"hostname": "b", "pw": "s3cr3t"}},
+            "secrets": ["s3cr3t"],
+        }
+        result = run_in_process(f5os_restconf_config, "config", args, socket_path)
+        assert result["changed"] is True
+        assert "s3cr3t" not in str(result)
+
+    def test_config_check_mode(self, socket_path):
+        args = {"uri": URI, "config": {"openconfig-system:config": {"hostname": "b"}}}
+        result = run_in_process(
+            f5os_restconf_config, "config", args, socket_path, check_mode=True
+        )
+        assert result["changed"] is True
+        assert "api_response" not in result
+
+    def test_invalid_arguments(self, socket_path):
+        result = run_in_process(f5os_restconf_config, "config", {}, socket_path)
+        assert result["failed"] is True
+        assert "uri" in result["msg"]
@@ -130,6 +130,10 @@ RELATIVE_MODULE_PATHS = [
     "./ansible_collections/f5_ps_ansible/f5os/plugins/modules/f5os_restconf_config.py",
     "./ansible_collections/f5_ps_ansible/f5os/plugins/modules/f5os_restconf_get.py",
     "./ansible_collections/f5_ps_ansible/f5os/plugins/modules/f5os_restconf_post.py",
+    "./ansible_collections/f5_ps_ansible/f5os/plugins/modules/f5os_facts.py",
+    "./ansible_collections/f5_ps_ansible/f5os/plugins/modules/f5os_wait_for.py",
+    "./ansible_collections/f5_ps_ansible/f5os/plugins/modules/f5os_restconf_list.py",
+    "./ansible_collections/f5_ps_ansible/f5os/plugins/modules/f5os_config_snapshot.py",
 ]
 
 MODULE_DOC_BASEPATH = "./docs/f5os/ansible_modules_doc/"